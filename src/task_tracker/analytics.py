@@ -0,0 +1,188 @@
+"""Flow metrics over the whole task set: throughput, cycle time, WIP and aging.
+
+Tasks are read into a columnar ``TaskTable`` (ids, status codes and epoch
+microsecond timestamps in ``array`` columns), without building ``Task``
+objects. With NumPy installed those columns are viewed as arrays without
+copying and each metric is one vectorized pass; without it the same
+metrics come from sorted lists and ``bisect``, with the same results.
+
+A done task counts as completed at its ``updatedAt`` (the rule
+``TaskCounters`` uses) and its cycle time is ``updatedAt - createdAt``.
+``TaskService.history()`` has the exact transition times, but reading it
+per task would replace the single pass over the columns with one lookup
+per task; the two differ only when a done task is edited afterwards.
+Ages count from ``createdAt``.
+"""
+import bisect
+import heapq
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from .constants import STATUS_CODES, STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
+from .models.task_table import TaskTable
+from .utils.time import iso_to_micros, micros_to_iso, now_iso
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - the pure-Python kernels are used instead
+    np = None
+
+ENGINE_NUMPY = "numpy"
+ENGINE_PYTHON = "python"
+
+DAY_US = 86_400 * 1_000_000
+PERCENTILES = (50, 85, 95)
+# Aging buckets in days: [0, 1), [1, 7), [7, 30), [30, 90), [90, ...)
+AGE_BOUNDS = (1, 7, 30, 90)
+AGE_LABELS = ("<1d", "1-7d", "7-30d", "30-90d", ">=90d")
+OPEN_STATUSES = (STATUS_TODO, STATUS_IN_PROGRESS)
+
+DONE = STATUS_CODES[STATUS_DONE]
+IN_PROGRESS = STATUS_CODES[STATUS_IN_PROGRESS]
+
+
+@dataclass(slots=True)
+class Report:
+    days: List[str]                        # UTC days of the window, oldest first
+    throughput: List[int]                  # tasks completed on each day
+    wip: List[int]                         # tasks not done at the end of each day
+    cycle_time: Dict[str, float]           # "p50", "p85", "p95" in days; empty without completions
+    aging: Dict[str, List[int]]            # open status -> tasks per AGE_LABELS bucket
+    oldest: List[Tuple[int, float, str]]   # (id, age in days, description) of in-progress tasks
+    engine: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "days": self.days,
+            "throughput": self.throughput,
+            "wip": self.wip,
+            "cycle_time_days": self.cycle_time,
+            "aging": {status: dict(zip(AGE_LABELS, counts)) for status, counts in self.aging.items()},
+            "oldest_in_progress": [
+                {"id": task_id, "age_days": age, "description": description}
+                for task_id, age, description in self.oldest
+            ],
+            "engine": self.engine,
+        }
+
+
+# (throughput, wip, cycle time percentiles, aging, oldest in-progress as (row, createdAt))
+Metrics = Tuple[List[int], List[int], List[float], Dict[str, List[int]], List[Tuple[int, int]]]
+
+
+@dataclass(slots=True)
+class _Window:
+    now_us: int
+    start_us: int     # midnight UTC of the first day
+    ends: List[int]   # exclusive end of each day
+    n_oldest: int
+
+
+def _percentile(ordered: List[int], q: float) -> float:
+    # Linear interpolation between closest ranks, as numpy.percentile
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+# ---------- kernels ----------
+def _numpy_metrics(table: TaskTable, w: _Window) -> Metrics:
+    codes = np.frombuffer(table.status_codes, dtype=np.int8)
+    created = np.frombuffer(table.created_us, dtype=np.int64)
+    updated = np.frombuffer(table.updated_us, dtype=np.int64)
+    ends = np.array(w.ends, dtype=np.int64)
+
+    done = codes == DONE
+    closed = updated[done]
+    recent = (closed >= w.start_us) & (closed < ends[-1])
+    throughput = np.bincount((closed[recent] - w.start_us) // DAY_US, minlength=len(ends))
+    cycle = closed[recent] - created[done][recent]
+    percentiles = np.percentile(cycle, PERCENTILES).tolist() if cycle.size else []
+    # Open at the end of a day: created before it, minus those completed before it
+    wip = np.searchsorted(np.sort(created), ends) - np.searchsorted(np.sort(closed), ends)
+
+    bounds = np.array(AGE_BOUNDS, dtype=np.int64) * DAY_US
+    aging = {}
+    for status in OPEN_STATUSES:
+        ages = w.now_us - created[codes == STATUS_CODES[status]]
+        buckets = np.searchsorted(bounds, ages, side="right")
+        aging[status] = np.bincount(buckets, minlength=len(AGE_LABELS)).tolist()
+
+    rows = np.flatnonzero(codes == IN_PROGRESS)
+    k = min(w.n_oldest, rows.size)
+    oldest = []
+    if k:
+        rows = rows[np.argpartition(created[rows], k - 1)[:k]]
+        rows = rows[np.lexsort((rows, created[rows]))]
+        oldest = [(int(row), int(created[row])) for row in rows]
+    return throughput.tolist(), wip.tolist(), percentiles, aging, oldest
+
+
+def _python_metrics(table: TaskTable, w: _Window) -> Metrics:
+    end_us = w.ends[-1]
+    bounds = [b * DAY_US for b in AGE_BOUNDS]
+    throughput = [0] * len(w.ends)
+    cycle: List[int] = []
+    closed: List[int] = []
+    aging = {status: [0] * len(AGE_LABELS) for status in OPEN_STATUSES}
+    by_code = {STATUS_CODES[status]: aging[status] for status in OPEN_STATUSES}
+    in_progress: List[Tuple[int, int]] = []  # (createdAt, row)
+    for row, (code, c, u) in enumerate(zip(table.status_codes, table.created_us, table.updated_us)):
+        if code == DONE:
+            closed.append(u)
+            if w.start_us <= u < end_us:
+                throughput[(u - w.start_us) // DAY_US] += 1
+                cycle.append(u - c)
+            continue
+        by_code[code][bisect.bisect_right(bounds, w.now_us - c)] += 1
+        if code == IN_PROGRESS:
+            in_progress.append((c, row))
+
+    created = sorted(table.created_us)
+    closed.sort()
+    wip = [bisect.bisect_left(created, end) - bisect.bisect_left(closed, end) for end in w.ends]
+    cycle.sort()
+    percentiles = [_percentile(cycle, q) for q in PERCENTILES] if cycle else []
+    oldest = [(row, c) for c, row in heapq.nsmallest(w.n_oldest, in_progress)]
+    return throughput, wip, percentiles, aging, oldest
+
+
+# ---------- public API ----------
+def report(
+    table: TaskTable,
+    days: int = 30,
+    oldest: int = 10,
+    now: Optional[str] = None,
+    engine: Optional[str] = None,
+) -> Report:
+    """Metrics for the ``days`` UTC days ending today (or the day of ``now``).
+
+    ``engine`` forces ``"numpy"`` or ``"python"``; by default NumPy is used
+    when installed.
+    """
+    if engine is None:
+        engine = ENGINE_NUMPY if np is not None else ENGINE_PYTHON
+    if engine == ENGINE_NUMPY and np is None:
+        raise RuntimeError("NumPy não está instalado")
+    now_us = iso_to_micros(now or now_iso())
+    first = now_us // DAY_US - days + 1
+    w = _Window(
+        now_us=now_us,
+        start_us=first * DAY_US,
+        ends=[(first + i + 1) * DAY_US for i in range(days)],
+        n_oldest=oldest,
+    )
+    kernel = _numpy_metrics if engine == ENGINE_NUMPY and len(table) else _python_metrics
+    throughput, wip, percentiles, aging, rows = kernel(table, w)
+    return Report(
+        days=[micros_to_iso((first + i) * DAY_US)[:10] for i in range(days)],
+        throughput=throughput,
+        wip=wip,
+        cycle_time={f"p{q}": round(v / DAY_US, 3) for q, v in zip(PERCENTILES, percentiles)},
+        aging=aging,
+        oldest=[
+            (table.ids[row], round((now_us - created) / DAY_US, 3), table.descriptions[row])
+            for row, created in rows
+        ],
+        engine=engine,
+    )
@@ -0,0 +1 @@
+"""Benchmarks for the task tracker (run as ``python -m task_tracker.benchmarks.<name>``)."""
@@ -0,0 +1,77 @@
+"""Save/load time and file size of each task file format.
+
+Writes the same synthetic tasks with every serializer and reads them back,
+as ``JsonStorage`` does::
+
+    python -m task_tracker.benchmarks.formats --sizes 100000 1000000
+"""
+import argparse
+import gc
+import json
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List
+
+from ..storage.serializers import FORMATS, serializer_for
+from .memory import synthetic_records
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(n: int, formats: List[str], repeat: int = 1) -> List[Dict[str, Any]]:
+    records = synthetic_records(n)
+    results = []
+    with TemporaryDirectory() as tmp:
+        for name in formats:
+            serializer = serializer_for(Path(tmp), name)
+            path = Path(tmp) / f"tasks.{name}"
+
+            def save() -> None:
+                with path.open("wb") as f:
+                    serializer.dump(records, f)
+
+            def load() -> None:
+                with path.open("rb") as f:
+                    serializer.load(f)
+
+            save_s = _best_of(repeat, save)
+            load_s = _best_of(repeat, load)
+            results.append({
+                "format": name,
+                "tasks": n,
+                "save_s": round(save_s, 4),
+                "load_s": round(load_s, 4),
+                "size_mb": round(path.stat().st_size / (1024 * 1024), 2),
+            })
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="task_tracker.benchmarks.formats")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--repeat", type=int, default=1, help="Melhor de N execuções")
+    parser.add_argument("--json", action="store_true", help="Emitir resultados em JSON")
+    args = parser.parse_args(argv)
+
+    results = [r for n in args.sizes for r in measure(n, args.formats, args.repeat)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'format':<13} {'tasks':>9} {'save_s':>8} {'load_s':>8} {'size_mb':>8}")
+    for r in results:
+        print(f"{r['format']:<13} {r['tasks']:>9} {r['save_s']:>8} {r['load_s']:>8} {r['size_mb']:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+"""Memory footprint and load time of the in-memory task representations.
+
+Compares a list of ``Task`` objects built with ``from_dict`` against the
+columnar ``TaskTable``, both built from the parsed JSON text::
+
+    python -m task_tracker.benchmarks.memory --sizes 100000 1000000
+"""
+import argparse
+import gc
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List
+
+from ..constants import CODE_STATUSES
+from ..models.task import Task
+from ..models.task_table import TaskTable
+from ..utils.time import micros_to_iso
+
+BASE_MICROS = 1_757_000_000_000_000
+
+
+def synthetic_records(n: int) -> List[Dict[str, Any]]:
+    """Deterministic records shaped like ``tasks.json`` entries."""
+    return [
+        {
+            "id": i,
+            "description": f"Task {i} — revisar item {i % 97}",
+            "status": CODE_STATUSES[i % 3],
+            "createdAt": micros_to_iso(BASE_MICROS + i * 1_000_003),
+            "updatedAt": micros_to_iso(BASE_MICROS + i * 1_000_003 + 59_000_000),
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def _build_tasks(records: List[Dict[str, Any]]) -> Any:
+    return [Task.from_dict(d) for d in records]
+
+
+def _build_table(records: List[Dict[str, Any]]) -> Any:
+    return TaskTable.from_records(records)
+
+
+REPRESENTATIONS: Dict[str, Callable[[List[Dict[str, Any]]], Any]] = {
+    "list[Task]": _build_tasks,
+    "TaskTable": _build_table,
+}
+
+
+def _current_rss_mb() -> float | None:
+    """Resident set size right now (Linux); None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return pages * resource.getpagesize() / (1024 * 1024)
+
+
+def _measure(name: str, n: int) -> Dict[str, Any]:
+    # Runs in a fresh process so RSS growth belongs to this representation only.
+    # Parsing is part of the measured load, as in JsonStorage + TaskService.
+    text = json.dumps(synthetic_records(n))
+    build = REPRESENTATIONS[name]
+    gc.collect()
+    rss_before = _current_rss_mb()
+    start = time.perf_counter()
+    built = build(json.loads(text))
+    seconds = time.perf_counter() - start
+    gc.collect()
+    rss_after = _current_rss_mb()
+    del built
+    # Second build under tracemalloc (which slows allocation) just for the size
+    gc.collect()
+    tracemalloc.start()
+    built = build(json.loads(text))
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+    rss_growth = None
+    if rss_before is not None and rss_after is not None:
+        rss_growth = round(rss_after - rss_before, 1)
+    return {
+        "representation": name,
+        "tasks": n,
+        "load_s": round(seconds, 4),
+        "retained_mb": round(retained / (1024 * 1024), 2),
+        "rss_growth_mb": rss_growth,
+    }
+
+
+def run(sizes: List[int]) -> List[Dict[str, Any]]:
+    ctx = get_context("spawn")
+    results = []
+    with ctx.Pool(1, maxtasksperchild=1) as pool:
+        for n in sizes:
+            for name in REPRESENTATIONS:
+                results.append(pool.apply(_measure, (name, n)))
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="task_tracker.benchmarks.memory")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--json", action="store_true", help="Emitir resultados em JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'representation':<12} {'tasks':>9} {'load_s':>8} {'retained_mb':>12} {'rss_growth_mb':>14}")
+    for r in results:
+        print(f"{r['representation']:<12} {r['tasks']:>9} {r['load_s']:>8} "
+              f"{r['retained_mb']:>12} {str(r['rss_growth_mb']):>14}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,23 @@
+"""Command-line options of the benchmark suite.
+
+Kept apart from ``suite`` so ``task-cli`` can register ``bench`` without
+importing the service, the storages or the timing machinery.
+"""
+import argparse
+from pathlib import Path
+
+DEFAULT_SIZES = [1_000, 10_000]
+DEFAULT_OPS = 20
+BACKEND_NAMES = ["json", "cached", "wal", "sqlite", "mmap", "sharded"]
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Quantidades de tasks (ex.: 1000 10000 100000 1000000)")
+    parser.add_argument("--backends", nargs="+", choices=BACKEND_NAMES, default=BACKEND_NAMES,
+                        help="Backends de armazenamento a medir")
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS,
+                        help="Execuções por operação (list usa ops/5)")
+    parser.add_argument("--json", action="store_true", help="Emitir resultados em JSON")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Gravar o JSON neste arquivo (para comparar execuções)")
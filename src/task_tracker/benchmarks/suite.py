@@ -0,0 +1,181 @@
+"""Scaling benchmark for ``TaskService`` operations over each storage backend.
+
+For every (backend, size) pair a synthetic task file is generated in a temp
+directory, then each operation is timed individually::
+
+    python -m task_tracker.benchmarks --sizes 1000 10000 100000 --json
+    task-cli bench --backends json sqlite --ops 50
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, List
+from ..services.task_service import TaskService
+from ..storage.cached_storage import CachedJsonStorage
+from ..storage.json_storage import JsonStorage
+from ..storage.mmap_storage import MmapStorage
+from ..storage.sharded_storage import ShardedStorage
+from ..storage.sqlite_storage import SqliteStorage
+from ..storage.wal_storage import WalStorage
+from .memory import synthetic_records
+from .options import add_arguments
+
+OPERATIONS = ("add", "update", "set_status", "delete", "list")
+
+
+def _seed_json(directory: Path, records: List[Dict[str, Any]]) -> Path:
+    path = directory / "tasks.json"
+    path.write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def _open_json(directory: Path, records: List[Dict[str, Any]]):
+    return JsonStorage(file_path=_seed_json(directory, records))
+
+
+def _open_cached(directory: Path, records: List[Dict[str, Any]]):
+    return CachedJsonStorage(file_path=_seed_json(directory, records))
+
+
+def _open_wal(directory: Path, records: List[Dict[str, Any]]):
+    return WalStorage(file_path=_seed_json(directory, records))
+
+
+def _open_sqlite(directory: Path, records: List[Dict[str, Any]]):
+    storage = SqliteStorage(file_path=directory / "tasks.db")
+    storage.import_json(_seed_json(directory, records))
+    return storage
+
+
+def _open_mmap(directory: Path, records: List[Dict[str, Any]]):
+    storage = MmapStorage(file_path=directory / "tasks.rec")
+    with storage.batch():
+        for d in records:
+            storage.insert(d)
+    return storage
+
+
+def _open_sharded(directory: Path, records: List[Dict[str, Any]]):
+    # 10-20 shards at any size, so the fan-out shows at small sizes too
+    storage = ShardedStorage(file_path=directory / "tasks.shards", shard_size=max(2, len(records) // 10))
+    storage.save_all(records)
+    return storage
+
+
+# name -> factory(directory, records) returning a seeded storage; the names are
+# also listed in options.BACKEND_NAMES for the command line
+BACKENDS: Dict[str, Callable[[Path, List[Dict[str, Any]]], Any]] = {
+    "json": _open_json,
+    "cached": _open_cached,
+    "wal": _open_wal,
+    "sqlite": _open_sqlite,
+    "mmap": _open_mmap,
+    "sharded": _open_sharded,
+}
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summarize(backend: str, size: int, op: str, samples: List[float], peak: int) -> Dict[str, Any]:
+    total = sum(samples)
+    return {
+        "backend": backend,
+        "size": size,
+        "op": op,
+        "runs": len(samples),
+        "ops_per_sec": round(len(samples) / total, 1) if total else None,
+        "p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "peak_mb": round(peak / (1024 * 1024), 2),
+    }
+
+
+def _calls(service: TaskService, size: int, ops: int, rng: random.Random) -> Dict[str, List[Callable[[], Any]]]:
+    ids = rng.sample(range(1, size + 1), min(size, ops * 3))
+    update_ids, status_ids, delete_ids = ids[0::3], ids[1::3], ids[2::3]
+    return {
+        "add": [lambda i=i: service.add(f"bench {i}") for i in range(ops)],
+        "update": [lambda t=t: service.update(t, "bench update") for t in update_ids],
+        "set_status": [lambda t=t: service.mark_done(t) for t in status_ids],
+        "delete": [lambda t=t: service.delete(t) for t in delete_ids],
+        "list": [lambda: service.list("done") for _ in range(max(1, ops // 5))],
+    }
+
+
+def bench_backend(backend: str, size: int, ops: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Time every operation for one backend at one dataset size."""
+    rng = random.Random(seed)
+    results = []
+    with TemporaryDirectory() as tmp:
+        storage = BACKENDS[backend](Path(tmp), synthetic_records(size))
+        service = TaskService(storage)
+        try:
+            for op, calls in _calls(service, size, ops, rng).items():
+                if not calls:
+                    continue
+                # First call runs under tracemalloc (slow) for the peak only
+                tracemalloc.start()
+                calls[0]()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                samples = []
+                for call in calls[1:] or calls[:1]:
+                    start = time.perf_counter()
+                    call()
+                    samples.append(time.perf_counter() - start)
+                results.append(_summarize(backend, size, op, samples, peak))
+        finally:
+            service.close()
+            close = getattr(storage, "close", None)
+            if close is not None:
+                close()
+    return results
+
+
+def run(sizes: List[int], backends: List[str], ops: int) -> Dict[str, Any]:
+    results = []
+    for size in sizes:
+        for backend in backends:
+            results.extend(bench_backend(backend, size, ops))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ops": ops,
+        },
+        "results": results,
+    }
+
+
+def report(args: argparse.Namespace) -> int:
+    data = run(args.sizes, args.backends, args.ops)
+    if args.output is not None:
+        args.output.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    if args.json:
+        print(json.dumps(data, indent=2))
+        return 0
+    print(f"{'backend':<8} {'size':>8} {'op':<10} {'ops/s':>10} {'p50_ms':>9} {'p99_ms':>9} {'peak_mb':>8}")
+    for r in data["results"]:
+        print(f"{r['backend']:<8} {r['size']:>8} {r['op']:<10} {str(r['ops_per_sec']):>10} "
+              f"{r['p50_ms']:>9} {r['p99_ms']:>9} {r['peak_mb']:>8}")
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="task_tracker.benchmarks")
+    add_arguments(parser)
+    return report(parser.parse_args(argv if argv is not None else sys.argv[1:]))
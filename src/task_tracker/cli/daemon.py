@@ -0,0 +1,214 @@
+"""``task-cli serve``: keep task files hot in memory behind a Unix socket.
+
+Protocol: the client sends one JSON line ``{"argv": [...], "file": "/abs/tasks.json"}``
+and reads one JSON line back, ``{"code": 0, "out": "...", "err": "..."}``. The daemon parses
+``argv`` with the regular CLI parser and runs the same command code, so output
+and exit codes match a direct run.
+
+Only the client half (``socket_path``/``forward``) runs on every CLI call;
+the service and storages are imported by the server alone.
+"""
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Optional, Tuple
+
+SOCKET_ENV = "TASK_TRACKER_SOCKET"
+NO_DAEMON_ENV = "TASK_TRACKER_NO_DAEMON"
+SOCKET_NAME = "task-tracker.sock"
+REPLY_TIMEOUT = 30.0
+
+
+def socket_path() -> Path:
+    """Socket used by ``serve`` and the client (``$TASK_TRACKER_SOCKET`` overrides)."""
+    configured = os.environ.get(SOCKET_ENV)
+    if configured:
+        return Path(configured)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / SOCKET_NAME
+    return Path("/tmp") / f"task-tracker-{os.getuid()}.sock"
+
+
+def _recv_line(sock: socket.socket) -> bytes:
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks)
+
+
+# ---------- client ----------
+def forward(argv: list, file_path: Path, path: Optional[Path] = None) -> Optional[Tuple[int, str, str]]:
+    """Run ``argv`` on the daemon and return ``(code, stdout, stderr)``.
+
+    Returns ``None`` when no daemon is listening (or it is disabled through
+    ``$TASK_TRACKER_NO_DAEMON``) so the caller can run the command itself.
+    Raises ``ConnectionError`` if the daemon accepted the command but did not
+    reply: it may have been applied, so it must not be retried locally.
+    """
+    if os.environ.get(NO_DAEMON_ENV):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(str(path or socket_path()))
+        except OSError:
+            return None
+        sock.settimeout(REPLY_TIMEOUT)
+        request = {"argv": argv, "file": str(file_path)}
+        try:
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            reply = json.loads(_recv_line(sock))
+        except (OSError, ValueError) as e:
+            raise ConnectionError(f"Daemon não respondeu: {e}") from e
+        return int(reply["code"]), reply["out"], reply.get("err", "")
+    finally:
+        sock.close()
+
+
+# ---------- server ----------
+def _listening(path: Path) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            code, out, err = self.server.run(request["argv"], Path(request["file"]))
+        except (ValueError, KeyError, TypeError) as e:
+            code, out, err = 2, "", f"Requisição inválida: {e}\n"
+        reply = json.dumps({"code": code, "out": out, "err": err}, ensure_ascii=False)
+        self.wfile.write(reply.encode("utf-8") + b"\n")
+
+
+class TaskDaemon(socketserver.UnixStreamServer):
+    """Serves CLI commands from storages kept open between requests.
+
+    JSON files are opened as ``CachedJsonStorage``: the parsed records stay in
+    memory and are revalidated by ``stat`` on each request, so writes made by
+    processes not using the daemon are still picked up.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._storages = {}
+        self._indexes = {}
+        self._services = {}
+        self._lock = threading.Lock()
+        super().__init__(str(path), _Handler)
+        os.chmod(path, 0o600)
+
+    def storage_for(self, file_path: Path, backend: Optional[str], file_format: Optional[str] = None):
+        from ..storage.factory import BACKEND_JSON, backend_for, open_storage
+
+        if backend is None:
+            backend = backend_for(file_path)
+        key = (file_path, backend, file_format)
+        storage = self._storages.get(key)
+        if storage is None:
+            if backend == BACKEND_JSON:
+                from ..storage.cached_storage import CachedJsonStorage
+                storage = CachedJsonStorage(file_path=file_path, file_format=file_format)
+            else:
+                storage = open_storage(file_path, backend=backend, file_format=file_format)
+            self._storages[key] = storage
+        return storage
+
+    def index_for(self, file_path: Path):
+        from ..services.search_index import SearchIndex, index_path
+
+        index = self._indexes.get(file_path)
+        if index is None:
+            index = self._indexes[file_path] = SearchIndex.load(index_path(file_path))
+        return index
+
+    def service_for(self, file_path: Path, backend: Optional[str], file_format: Optional[str] = None):
+        """One ``TaskService`` per storage, so its sidecar files (events,
+        change feed, archive) are opened once rather than per request."""
+        from ..services.task_service import TaskService
+
+        storage = self.storage_for(file_path, backend, file_format)
+        service = self._services.get(storage)
+        if service is None:
+            service = TaskService(storage, index=self.index_for(file_path))
+            self._services[storage] = service
+        return service
+
+    def run(self, argv: list, file_path: Path) -> Tuple[int, str, str]:
+        from .main import build_parser, run_command
+
+        out, err = io.StringIO(), io.StringIO()
+        with self._lock, redirect_stdout(out), redirect_stderr(err):
+            try:
+                args = build_parser().parse_args(argv)
+            except SystemExit as e:
+                return int(e.code or 0), out.getvalue(), err.getvalue()
+            code = run_command(args, self.service_for(file_path, args.backend, args.file_format))
+        return code, out.getvalue(), err.getvalue()
+
+    def server_close(self) -> None:
+        super().server_close()
+        for service in self._services.values():
+            service.close()
+        self._services.clear()
+        for storage in self._storages.values():
+            close = getattr(storage, "close", None)
+            if close is not None:
+                close()
+        self._storages.clear()
+        for index in self._indexes.values():
+            try:
+                index.save()
+            except OSError:
+                pass
+        self._indexes.clear()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def serve(path: Optional[Path] = None) -> int:
+    """Run the daemon in the foreground until interrupted (Ctrl-C or SIGTERM)."""
+    path = path or socket_path()
+    if path.exists():
+        if _listening(path):
+            print(f"Daemon já em execução em {path}")
+            return 1
+        path.unlink()  # stale socket from a daemon that didn't exit cleanly
+    server = TaskDaemon(path)
+    signal.signal(signal.SIGTERM, _interrupt)
+    print(f"Servindo em {path} (Ctrl-C para encerrar)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
@@ -1,15 +1,58 @@
 import argparse
+import json
+import os
 import sys
+import time
 from pathlib import Path
-from ..constants import STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
-from ..exceptions import TaskNotFound, InvalidStatus
-from ..services.task_service import TaskService
-from ..storage.json_storage import JsonStorage
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, TextIO, Tuple
+from ..constants import ORDER_ASC, ORDER_DESC, SORT_FIELDS, STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO, TIME_FIELDS
+from ..exceptions import ConcurrentModification, InvalidCursor, TaskNotFound, InvalidStatus
+from ..storage.factory import BACKEND_WAL, BACKENDS
+from ..storage.serializers import FORMATS
+from ..utils import profiling
+
+if TYPE_CHECKING:
+    from ..services.task_service import TaskService
+
+# The service and storages are imported only by commands that run locally:
+# `--help`, `bench` and commands answered by the daemon never load them.
+
+# Commands the CLI hands to a running `task-cli serve` daemon
+FORWARDED = {"add", "update", "delete", "mark-in-progress", "mark-done", "list", "search", "stats", "report", "history"}
+
+# Set to "1" to print a cProfile report on stderr, or to a file path to
+# save it there (for pstats/snakeviz)
+TRACE_ENV = "TASK_TRACKER_TRACE"
+TRACE_LINES = 30
 
 # Exit codes
 SUCCESS = 0
 INVALID = 2
+PARTIAL = 3
 NOT_FOUND = 4
+CONFLICT = 5
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"deve ser positivo: {value}")
+    return number
+
+def duration(value: str):
+    from ..utils.time import parse_duration
+
+    try:
+        return parse_duration(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+def instant(value: str) -> int:
+    from ..utils.time import parse_instant
+
+    try:
+        return parse_instant(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -17,6 +60,39 @@ def build_parser() -> argparse.ArgumentParser:
         description="Task Tracker CLI (Python)",
     )
 
+    parser.add_argument(
+        "-f", "--file",
+        type=Path,
+        default=None,
+        help="Arquivo de tasks (.json, .db/.sqlite para SQLite, .rec para registros fixos "
+             "ou diretório .shards; padrão: ./tasks.json)",
+    )
+
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=None,
+        help="Backend de armazenamento (padrão: pela extensão do arquivo; "
+             "'wal' grava cada alteração em um log em vez de reescrever o arquivo; "
+             "'mmap' altera registros de tamanho fixo no lugar; "
+             "'sharded' divide as tasks por faixa de id em vários arquivos)",
+    )
+
+    parser.add_argument(
+        "--file-format",
+        choices=FORMATS,
+        default=None,
+        help="Formato do arquivo de tasks (padrão: pela extensão; .jsonl e .tbin "
+             "são JSON Lines e binário, o resto JSON indentado)",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Mostrar no stderr o tempo gasto em cada fase (parse, conversão, serviço, "
+             "serialização, replace); roda sem o daemon",
+    )
+
     sub = parser.add_subparsers(dest="command", required=True)
 
     # add
@@ -48,17 +124,285 @@ def build_parser() -> argparse.ArgumentParser:
         choices=[STATUS_TODO, STATUS_IN_PROGRESS, STATUS_DONE],
         help="Filtro por status (opcional)",
     )
+    p_list.add_argument("--sort", choices=SORT_FIELDS, default=None, help="Ordenar por campo")
+    p_list.add_argument("--order", choices=[ORDER_ASC, ORDER_DESC], default=ORDER_ASC)
+    p_list.add_argument("--limit", type=positive_int, default=None, help="Tasks por página")
+    p_list.add_argument(
+        "--after",
+        default=None,
+        metavar="CURSOR",
+        help="Continuar após o cursor impresso pela página anterior",
+    )
+    p_list.add_argument("--archived", action="store_true", help="Incluir as tasks arquivadas")
+    p_list.add_argument("--since", type=instant, default=None, metavar="DATA",
+                        help="Só a partir de DATA (ISO, ex. 2024-03-01 ou 2024-03-01T12:00, ou há quanto tempo: 7d)")
+    p_list.add_argument("--until", type=instant, default=None, metavar="DATA",
+                        help="Só antes de DATA (mesmos formatos de --since)")
+    p_list.add_argument("--time-field", choices=TIME_FIELDS, default="updatedAt",
+                        help="Data filtrada por --since/--until (padrão: updatedAt)")
+
+    # search
+    p_search = sub.add_parser("search", help="Buscar tasks por palavras da descrição")
+    p_search.add_argument("query", nargs="+", help="Palavras (sem acento/maiúsculas; aceita prefixos)")
+    p_search.add_argument(
+        "--status",
+        choices=[STATUS_TODO, STATUS_IN_PROGRESS, STATUS_DONE],
+        default=None,
+        help="Filtro por status (opcional)",
+    )
+    p_search.add_argument("--limit", type=positive_int, default=20, help="Máximo de resultados (padrão: 20)")
+
+    # stats
+    p_stats = sub.add_parser("stats", help="Contagem de tasks por status e por dia")
+    p_stats.add_argument(
+        "--days",
+        type=positive_int,
+        default=None,
+        help="Mostrar tasks criadas/concluídas por dia nos últimos N dias",
+    )
+    p_stats.add_argument("--json", action="store_true", help="Emitir em JSON (inclui todos os dias)")
+
+    # history
+    p_history = sub.add_parser("history", help="Mudanças de status de uma task")
+    p_history.add_argument("id", type=int, help="ID da task")
+
+    # archive
+    p_archive = sub.add_parser("archive", help="Mover tasks done antigas para o arquivo compactado")
+    p_archive.add_argument("--older-than", type=duration, required=True, metavar="DURAÇÃO",
+                           help="Sem alteração há mais de DURAÇÃO (ex.: 30d, 12h, 2w)")
+    p_archive.add_argument("--codec", choices=["gzip", "lzma"], default="gzip",
+                           help="Compressão do segmento (padrão: gzip)")
+
+    # report
+    p_report = sub.add_parser("report", help="Vazão, cycle time, tasks em aberto por dia e idade das tasks")
+    p_report.add_argument("--days", type=positive_int, default=30, help="Janela em dias até hoje (padrão: 30)")
+    p_report.add_argument("--oldest", type=int, default=10,
+                          help="Quantas tasks in-progress mais antigas listar (padrão: 10)")
+    p_report.add_argument("--json", action="store_true", help="Emitir em JSON")
+
+    # batch
+    p_batch = sub.add_parser("batch", help="Aplicar operações em lote lidas do stdin")
+    p_batch.add_argument(
+        "--format",
+        choices=["jsonl", "csv"],
+        default="jsonl",
+        help="Formato da entrada: JSON Lines ou CSV com cabeçalho op,id,description,status",
+    )
+
+    # bench
+    from ..benchmarks.options import add_arguments
+    p_bench = sub.add_parser("bench", help="Medir operações por backend em arquivos sintéticos")
+    add_arguments(p_bench)
+
+    # convert
+    p_conv = sub.add_parser("convert", help="Converter um arquivo de tasks para outro formato")
+    p_conv.add_argument("source", type=Path, help="Arquivo de origem")
+    p_conv.add_argument("target", type=Path, help="Arquivo de destino (sobrescrito)")
+    p_conv.add_argument("--from", dest="source_format", choices=FORMATS, default=None,
+                        help="Formato da origem (padrão: pela extensão)")
+    p_conv.add_argument("--to", dest="target_format", choices=FORMATS, default=None,
+                        help="Formato do destino (padrão: pela extensão)")
+
+    # export / import
+    p_export = sub.add_parser("export", help="Exportar as tasks em CSV, JSON Lines ou JSON nativo")
+    p_export.add_argument("-o", "--output", type=Path, default=None,
+                          help="Arquivo de destino (padrão: stdout)")
+    p_export.add_argument("--format", choices=["csv", "jsonl", "native"], default=None,
+                          help="Formato (padrão: pela extensão do destino; JSON nativo no stdout)")
+    p_export.add_argument("--status", choices=[STATUS_TODO, STATUS_IN_PROGRESS, STATUS_DONE], default=None)
+
+    p_import = sub.add_parser("import", help="Importar tasks de CSV, JSON Lines ou JSON nativo")
+    p_import.add_argument("source", type=Path, help="Arquivo de origem ('-' para stdin)")
+    p_import.add_argument("--format", choices=["csv", "jsonl", "native"], default=None,
+                          help="Formato (padrão: pela extensão; .csv, .jsonl, senão JSON nativo)")
+    p_import.add_argument(
+        "--ids",
+        choices=["keep", "renumber"],
+        default="keep",
+        help="keep: mantém os ids livres e renumera só os já usados; renumber: numera todas "
+             "depois das tasks existentes",
+    )
+    p_import.add_argument("--workers", type=positive_int, default=None,
+                          help="Processos para validar (padrão: todos os CPUs acima de 16 MB, senão 1)")
+
+    # serve
+    p_serve = sub.add_parser(
+        "serve",
+        help="Manter as tasks em memória e atender o CLI por um socket Unix",
+    )
+    p_serve.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Caminho do socket (padrão: $TASK_TRACKER_SOCKET ou um por usuário)",
+    )
 
     return parser
 
-def main(argv: list[str] | None = None) -> int:
-    argv = argv if argv is not None else sys.argv[1:]
-    parser = build_parser()
-    args = parser.parse_args(argv)
+def read_ops(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], str]]:
+    """Yield ``(line, op, error)`` from JSON Lines or CSV input.
+
+    ``line`` is the physical input line, so results can be matched back to
+    the source even when headers or blank lines are skipped.
+    """
+    if fmt == "csv":
+        import csv
+
+        reader = csv.DictReader(stream)
+        try:
+            reader.fieldnames  # read the header up front so line numbers line up
+        except csv.Error as e:
+            yield 1, None, f"CSV inválido: {e}"
+            return
+        while True:
+            line = reader.line_num
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                # The reader already skipped the bad record; keep going
+                yield line + 1, None, f"CSV inválido: {e}"
+                continue
+            op = {k: v for k, v in row.items() if k and v not in (None, "")}
+            yield reader.line_num, op, ""
+    for n, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            op = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield n, None, f"JSON inválido: {e}"
+            continue
+        if not isinstance(op, dict):
+            yield n, None, "Operação inválida: esperado um objeto JSON"
+            continue
+        yield n, op, ""
+
+def run_batch(service: "TaskService", stream: TextIO, fmt: str) -> int:
+    """Stream ops into a single service batch, printing one JSON result per op."""
+    failed = 0
+    with service.batch():
+        for n, op, error in read_ops(stream, fmt):
+            result = service.apply(op) if op is not None else {"op": None, "ok": False, "error": error}
+            failed += not result["ok"]
+            print(json.dumps({"line": n, **result}, ensure_ascii=False))
+    return SUCCESS if not failed else PARTIAL
+
+def format_task(t) -> str:
+    return (
+        f"{t.id}\t[{t.status}]\t{t.description}\t"
+        f"(created: {t.createdAt} | updated: {t.updatedAt})"
+    )
+
+def print_stats(stats: Dict[str, Any], days: Optional[int], as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(stats, ensure_ascii=False))
+        return
+    for status, n in stats["by_status"].items():
+        print(f"{status}: {n}")
+    print(f"total: {stats['total']}")
+    if days:
+        from datetime import datetime, timedelta, timezone
+
+        today = datetime.now(timezone.utc).date()
+        print()
+        print("day\tcreated\tcompleted")
+        for offset in range(days - 1, -1, -1):
+            day = (today - timedelta(days=offset)).isoformat()
+            created = stats["created_per_day"].get(day, 0)
+            completed = stats["completed_per_day"].get(day, 0)
+            print(f"{day}\t{created}\t{completed}")
+
+def print_report(report, as_json: bool) -> None:
+    from ..analytics import AGE_LABELS
+
+    if as_json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False))
+        return
+    days = len(report.days)
+    completed = sum(report.throughput)
+    print(f"concluídas nos últimos {days} dias: {completed} ({completed / days:.1f}/dia)")
+    if report.cycle_time:
+        print("cycle time (dias): " + "  ".join(f"{q} {v:.1f}" for q, v in report.cycle_time.items()))
+    print()
+    print("dia\tconcluídas\tem aberto")
+    for day, done, wip in zip(report.days, report.throughput, report.wip):
+        print(f"{day}\t{done}\t{wip}")
+    print()
+    print("idade\t" + "\t".join(report.aging))
+    for i, label in enumerate(AGE_LABELS):
+        print(label + "\t" + "\t".join(str(counts[i]) for counts in report.aging.values()))
+    if report.oldest:
+        print()
+        print(f"{STATUS_IN_PROGRESS} mais antigas:")
+        for task_id, age, description in report.oldest:
+            print(f"{task_id}\t{age:.1f} dias\t{description}")
 
-    storage = JsonStorage(file_path=Path.cwd() / "tasks.json")
-    service = TaskService(storage)
+def convert(source: Path, target: Path, source_format: Optional[str], target_format: Optional[str]) -> int:
+    from ..storage.json_storage import JsonStorage
+    from ..storage.serializers import serializer_for
 
+    try:
+        reader = serializer_for(source, source_format)
+        with source.open("rb") as f:
+            records = reader.load(f)
+        storage = JsonStorage(file_path=target, file_format=target_format)
+        storage.save_all(records)
+    except FileNotFoundError as e:
+        print(f"Arquivo não encontrado: {e.filename}")
+        return NOT_FOUND
+    except ValueError as e:
+        print(f"Não foi possível converter {source}: {e}")
+        return INVALID
+    except ConcurrentModification as e:
+        print(str(e))
+        return CONFLICT
+    print(
+        f"{len(records)} tasks convertidas: {source} ({reader.name}, {source.stat().st_size} bytes) -> "
+        f"{target} ({storage.serializer.name}, {target.stat().st_size} bytes)"
+    )
+    return SUCCESS
+
+def run_export(service: "TaskService", target: Optional[Path], fmt: Optional[str], status: Optional[str]) -> int:
+    from ..services.transfer import FORMAT_NATIVE, export_tasks, format_for
+
+    # Records go straight from the storage to the writer, without Task objects
+    records = service.storage.iter(status)
+    if target is None:
+        n = export_tasks(records, sys.stdout, fmt or FORMAT_NATIVE)
+    else:
+        with target.open("w", encoding="utf-8", newline="") as f:
+            n = export_tasks(records, f, fmt or format_for(target))
+    print(f"{n} tasks exportadas", file=sys.stderr)
+    return SUCCESS
+
+def run_import(service: "TaskService", source: Path, fmt: Optional[str], ids: str, workers: Optional[int]) -> int:
+    from ..services.transfer import PARALLEL_BYTES, format_for, import_tasks
+
+    if source == Path("-"):
+        stream = sys.stdin.buffer
+        workers = workers or 1
+    else:
+        try:
+            stream = source.open("rb")
+        except FileNotFoundError as e:
+            print(f"Arquivo não encontrado: {e.filename}")
+            return NOT_FOUND
+        if workers is None:
+            workers = (os.cpu_count() or 1) if source.stat().st_size > PARALLEL_BYTES else 1
+    with stream:
+        result = import_tasks(service, stream, fmt or format_for(source), mode=ids, workers=workers)
+    for n, error in result.errors:
+        print(f"linha {n}: {error}")
+    print(
+        f"{result.imported} tasks importadas ({result.remapped} ids remapeados, "
+        f"{result.duplicates} duplicadas ignoradas, {len(result.errors)} inválidas)"
+    )
+    return SUCCESS if not result.errors else PARTIAL
+
+def run_command(args: argparse.Namespace, service: "TaskService") -> int:
+    """Run a task command against ``service`` and return the exit code."""
     try:
         if args.command == "add":
             task = service.add(args.description)
@@ -85,27 +429,182 @@ def main(argv: list[str] | None = None) -> int:
             print(f"Task {task.id} marked as done")
             return SUCCESS
 
+        if args.command == "batch":
+            return run_batch(service, sys.stdin, args.format)
+
+        if args.command == "export":
+            return run_export(service, args.output, args.format, args.status)
+
+        if args.command == "import":
+            return run_import(service, args.source, args.format, args.ids, args.workers)
+
+        if args.command == "list" and (args.sort or args.limit or args.after or args.order != ORDER_ASC):
+            page = service.page(
+                args.status,
+                sort_by=args.sort or "id",
+                order=args.order,
+                limit=args.limit,
+                cursor=args.after,
+                include_archived=args.archived,
+                since=args.since,
+                until=args.until,
+                time_field=args.time_field,
+            )
+            for t in page.tasks:
+                print(format_task(t))
+            if not page.tasks:
+                print("No tasks found")
+            if page.next_cursor:
+                print(f"Próxima página: --after {page.next_cursor}", file=sys.stderr)
+            return SUCCESS
+
         if args.command == "list":
-            tasks = service.list(status=args.status)
-            if not tasks:
+            # Print while streaming: first line and memory don't grow with the file
+            found = False
+            if args.archived or args.since is not None or args.until is not None:
+                tasks = service.list(
+                    args.status,
+                    include_archived=args.archived,
+                    since=args.since,
+                    until=args.until,
+                    time_field=args.time_field,
+                )
+            else:
+                tasks = service.iter(args.status)
+            for t in tasks:
+                found = True
+                print(format_task(t))
+            if not found:
                 print("No tasks found")
-                return SUCCESS
+            return SUCCESS
+
+        if args.command == "stats":
+            print_stats(service.stats(), args.days, args.json)
+            return SUCCESS
+
+        if args.command == "history":
+            for t in service.history(args.id):
+                print(f"{t.at}\t{t.from_status or '(criada)'} -> {t.to_status or '(removida)'}")
+            return SUCCESS
+
+        if args.command == "archive":
+            entry = service.archive_done(args.older_than, codec=args.codec)
+            if entry is None:
+                print("Nenhuma task done para arquivar")
+            else:
+                print(f"{entry['count']} tasks arquivadas em {service.archive.path / entry['file']}")
+            return SUCCESS
+
+        if args.command == "report":
+            from ..analytics import report
+
+            print_report(report(service.list(lazy=True), days=args.days, oldest=args.oldest), args.json)
+            return SUCCESS
+
+        if args.command == "search":
+            tasks = service.search(" ".join(args.query), status=args.status, limit=args.limit)
             for t in tasks:
-                print(
-                    f"{t.id}\t[{t.status}]\t{t.description}\t"
-                    f"(created: {t.createdAt} | updated: {t.updatedAt})"
-                )
+                print(format_task(t))
+            if not tasks:
+                print("No tasks found")
             return SUCCESS
 
     except TaskNotFound as e:
         print(str(e))
         return NOT_FOUND
-    except InvalidStatus as e:
+    except (InvalidStatus, InvalidCursor) as e:
         print(str(e))
         return INVALID
+    except ConcurrentModification as e:
+        print(str(e))
+        return CONFLICT
     except Exception as e:
         print(f"Unexpected error: {e}")
         return 1
 
+def main(argv: list[str] | None = None) -> int:
+    argv = argv if argv is not None else sys.argv[1:]
+    trace = os.environ.get(TRACE_ENV)
+    if not trace:
+        return _main(argv)
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(_main, argv)
+    finally:
+        if trace == "1":
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(TRACE_LINES)
+        else:
+            profiler.dump_stats(trace)
+            print(f"Perfil salvo em {trace}", file=sys.stderr)
+
+def _main(argv: list[str]) -> int:
+    start = time.perf_counter()
+    args = build_parser().parse_args(argv)
+    if not args.profile:
+        return dispatch(args, argv)
+    with profiling.hooked(profiling.PhaseStats()) as stats:
+        try:
+            return dispatch(args, argv)
+        finally:
+            print(stats.format(time.perf_counter() - start), file=sys.stderr)
+
+def dispatch(args: argparse.Namespace, argv: list[str]) -> int:
+    """Run the parsed command: locally, or through the daemon when one runs."""
+    if args.command == "bench":
+        # Works on its own temp files; never touches --file
+        from ..benchmarks.suite import report
+        return report(args)
+
+    if args.command == "serve":
+        from .daemon import serve
+        return serve(args.socket)
+
+    if args.command == "convert":
+        return convert(args.source, args.target, args.source_format, args.target_format)
+
+    file_path = Path.cwd() / (args.file or "tasks.json")
+
+    # WAL keeps its own in-memory state per process, so it always runs locally;
+    # so do profiled runs, whose phases must be measured in this process
+    if args.command in FORWARDED and args.backend != BACKEND_WAL and not args.profile:
+        from .daemon import forward
+        try:
+            reply = forward(argv, file_path)
+        except ConnectionError as e:
+            print(str(e))
+            return 1
+        if reply is not None:
+            code, out, err = reply
+            sys.stdout.write(out)
+            sys.stderr.write(err)
+            return code
+
+    with profiling.phase("cli.open"):
+        from ..services.task_service import TaskService
+        from ..storage.factory import open_storage
+
+        index = None
+        if args.command == "search":
+            from ..services.search_index import SearchIndex, index_path
+            index = SearchIndex.load(index_path(file_path))
+
+        storage = open_storage(file_path, backend=args.backend, file_format=args.file_format)
+    service = TaskService(storage, index=index)
+    try:
+        return run_command(args, service)
+    finally:
+        service.close()
+        if index is not None:
+            try:
+                index.save()
+            except OSError:
+                pass  # the index is only a cache; the next search rebuilds it
+        close = getattr(storage, "close", None)
+        if close is not None:
+            close()
+
 if __name__ == "__main__":
     raise SystemExit(main())
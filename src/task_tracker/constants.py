@@ -6,3 +6,14 @@ STATUS_DONE: Literal["done"] = "done"
 
 ALL_STATUSES = {STATUS_TODO, STATUS_IN_PROGRESS, STATUS_DONE}
 DEFAULT_STATUS = STATUS_TODO
+
+# Fields tasks can be sorted (and paged) by
+SORT_FIELDS = ("id", "createdAt", "updatedAt")
+# Timestamp fields (time-range filters: since <= value < until)
+TIME_FIELDS = ("createdAt", "updatedAt")
+ORDER_ASC = "asc"
+ORDER_DESC = "desc"
+
+# Compact codes for columnar/binary representations (order = board order)
+STATUS_CODES = {STATUS_TODO: 0, STATUS_IN_PROGRESS: 1, STATUS_DONE: 2}
+CODE_STATUSES = (STATUS_TODO, STATUS_IN_PROGRESS, STATUS_DONE)
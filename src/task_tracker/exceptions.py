@@ -8,3 +8,11 @@ class TaskNotFound(TaskError):
 
 class InvalidStatus(TaskError):
     """Raised when an invalid task status is provided."""
+
+
+class InvalidCursor(TaskError):
+    """Raised when a pagination cursor can't be decoded (or is for another sort)."""
+
+
+class ConcurrentModification(TaskError):
+    """Raised when the task file changed under a writer (or its lock timed out)."""
@@ -1,3 +1,7 @@
 from .task import Task
+from .task_changes import TaskChanges
+from .task_page import TaskPage
+from .task_table import TaskTable
+from .transition import Transition
 
-__all__ = ["Task"]
+__all__ = ["Task", "TaskChanges", "TaskPage", "TaskTable", "Transition"]
@@ -0,0 +1,17 @@
+from dataclasses import dataclass, field
+from typing import List
+from .task import Task
+
+
+@dataclass(slots=True)
+class TaskChanges:
+    """What changed after a given change sequence number.
+
+    ``tasks`` holds the current version of tasks added or modified and
+    ``removed`` the ids of deleted ones. With ``reset`` the delta is unknown
+    and the consumer should reload everything. Pass ``seq`` back next time.
+    """
+    seq: int
+    tasks: List[Task] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    reset: bool = False
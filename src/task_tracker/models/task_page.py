@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+from .task import Task
+
+
+@dataclass(slots=True)
+class TaskPage:
+    """One page of a sorted listing; pass ``next_cursor`` back for the next one
+    (``None`` on the last page)."""
+    tasks: List[Task] = field(default_factory=list)
+    next_cursor: Optional[str] = None
@@ -0,0 +1,99 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, overload
+from ..constants import CODE_STATUSES, STATUS_CODES
+from ..utils.time import is_canonical_iso, iso_to_micros, micros_to_iso
+from .task import Task
+
+
+class TaskTable(Sequence[Task]):
+    """Columnar, read-only collection of tasks.
+
+    ids and timestamps live in ``array('q')`` columns (timestamps as epoch
+    microseconds), statuses as small int codes (``STATUS_CODES``), and only
+    descriptions stay Python strings. ``Task`` objects are built on access,
+    so iterating a large table never holds more than one at a time.
+
+    Timestamps that do not round-trip through ``micros_to_iso`` (e.g. a
+    trailing ``Z``) are kept verbatim on the side so ``Task`` output matches
+    the stored data exactly.
+    """
+
+    __slots__ = ("ids", "status_codes", "created_us", "updated_us", "descriptions", "_raw_times")
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.status_codes = array("b")
+        self.created_us = array("q")
+        self.updated_us = array("q")
+        self.descriptions: List[str] = []
+        self._raw_times: Dict[Tuple[int, int], str] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], status: Optional[str] = None) -> "TaskTable":
+        table = cls()
+        for d in records:
+            if status is None or d["status"] == status:
+                table.append(d)
+        return table
+
+    # ---------- internals ----------
+    def _encode_time(self, row: int, column: int, value: str) -> int:
+        try:
+            micros = iso_to_micros(value)
+        except ValueError:
+            self._raw_times[(row, column)] = value
+            return 0
+        if not is_canonical_iso(value):
+            self._raw_times[(row, column)] = value
+        return micros
+
+    def _decode_time(self, row: int, column: int, micros: int) -> str:
+        raw = self._raw_times.get((row, column))
+        return raw if raw is not None else micros_to_iso(micros)
+
+    # ---------- building ----------
+    def append(self, data: Dict[str, Any]) -> None:
+        row = len(self.ids)
+        self.ids.append(int(data["id"]))
+        self.status_codes.append(STATUS_CODES[data["status"]])
+        self.created_us.append(self._encode_time(row, 0, str(data["createdAt"])))
+        self.updated_us.append(self._encode_time(row, 1, str(data["updatedAt"])))
+        self.descriptions.append(str(data["description"]))
+
+    # ---------- Sequence ----------
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @overload
+    def __getitem__(self, index: int) -> Task: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TaskTable": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TaskTable.from_records(self.row(i) for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TaskTable index out of range")
+        return Task(
+            id=self.ids[index],
+            description=self.descriptions[index],
+            status=CODE_STATUSES[self.status_codes[index]],
+            createdAt=self._decode_time(index, 0, self.created_us[index]),
+            updatedAt=self._decode_time(index, 1, self.updated_us[index]),
+        )
+
+    def __iter__(self) -> Iterator[Task]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return self[index].to_dict()
+
+    def filter(self, status: str) -> "TaskTable":
+        code = STATUS_CODES[status]
+        return TaskTable.from_records(
+            self.row(i) for i, c in enumerate(self.status_codes) if c == code
+        )
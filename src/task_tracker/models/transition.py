@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import Optional
+
+# from_status of the first change recorded for a task older than the history
+STATUS_UNKNOWN = "?"
+
+
+@dataclass(slots=True)
+class Transition:
+    """One status change of a task.
+
+    ``from_status`` is None when the change created the task (and
+    ``STATUS_UNKNOWN`` when the task predates the history); ``to_status``
+    is None when it was deleted. ``at`` is the ``updatedAt`` it wrote.
+    """
+    task_id: int
+    from_status: Optional[str]
+    to_status: Optional[str]
+    at: str
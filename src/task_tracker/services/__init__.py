@@ -1,3 +1,14 @@
+from importlib import import_module
 from .task_service import TaskService
 
-__all__ = ["TaskService"]
+# AsyncTaskService pulls in asyncio, so it is imported on first access only
+_LAZY = {"AsyncTaskService": ".async_task_service"}
+
+__all__ = ["TaskService", "AsyncTaskService"]
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
@@ -0,0 +1,154 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from ..exceptions import ConcurrentModification
+from ..models.task import Task
+from ..models.task_changes import TaskChanges
+from ..models.task_page import TaskPage
+from ..models.transition import Transition
+from ..storage.base import CONFLICT_RETRIES
+from .search_index import SearchIndex
+from .task_service import TaskService
+
+Call = Tuple[Callable[[TaskService], Any], bool]
+Outcome = Tuple[bool, Any]
+
+
+class AsyncTaskService:
+    """Awaitable ``TaskService`` for asyncio code.
+
+    Every call runs on a single worker thread, so the storage is only ever
+    used from one thread and its file I/O stays off the event loop.
+
+    Calls made in the same loop tick are queued and run together as one
+    group. When the group contains writes it runs inside one
+    ``TaskService.batch()``: for ``JsonStorage`` that is a single load and a
+    single save for all of them. Each caller still gets its own result or
+    exception. A group whose save hits ``ConcurrentModification`` is re-run
+    on fresh data, like single writes in ``ListStorageAdapter``.
+    """
+
+    def __init__(
+        self,
+        storage,
+        index: Optional[SearchIndex] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.service = TaskService(storage, index=index)
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-service")
+        self._owns_executor = executor is None
+        self._pending: List[Tuple[Callable[[TaskService], Any], bool, asyncio.Future]] = []
+        self._running: List[asyncio.Future] = []
+        self.groups = 0  # number of groups run, e.g. to observe coalescing
+
+    # ---------- internals ----------
+    def _submit(self, fn: Callable[[TaskService], Any], write: bool) -> "asyncio.Future[Any]":
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((fn, write, future))
+        if len(self._pending) == 1:
+            # Runs after the callbacks already queued for this tick, so calls
+            # started together (e.g. by asyncio.gather) land in the same group
+            loop.call_soon(self._flush, loop)
+        return future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        group, self._pending = self._pending, []
+        calls = [(fn, write) for fn, write, _ in group]
+        job = loop.run_in_executor(self._executor, self._run_group, calls)
+        self._running.append(job)
+        job.add_done_callback(lambda job: self._resolve(group, job))
+
+    def _resolve(self, group, job: "asyncio.Future[List[Outcome]]") -> None:
+        self._running.remove(job)
+        error = job.exception()
+        outcomes = job.result() if error is None else [(False, error)] * len(group)
+        for (_, _, future), (ok, value) in zip(group, outcomes):
+            if future.done():  # caller cancelled
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    @staticmethod
+    def _call(service: TaskService, fn: Callable[[TaskService], Any]) -> Outcome:
+        try:
+            return True, fn(service)
+        except Exception as e:
+            return False, e
+
+    def _run_group(self, calls: List[Call]) -> List[Outcome]:
+        """Worker thread: run a group, sharing one batch when it writes."""
+        self.groups += 1
+        service = self.service
+        if not any(write for _, write in calls):
+            return [self._call(service, fn) for fn, _ in calls]
+        for attempt in range(CONFLICT_RETRIES):
+            try:
+                with service.batch():
+                    return [self._call(service, fn) for fn, _ in calls]
+            except ConcurrentModification:
+                if attempt == CONFLICT_RETRIES - 1:
+                    raise
+        raise AssertionError("unreachable")
+
+    # ---------- public API ----------
+    async def get(self, task_id: int) -> Task:
+        return await self._submit(lambda s: s.get(task_id), write=False)
+
+    async def add(self, description: str) -> Task:
+        return await self._submit(lambda s: s.add(description), write=True)
+
+    async def update(self, task_id: int, description: str) -> Task:
+        return await self._submit(lambda s: s.update(task_id, description), write=True)
+
+    async def delete(self, task_id: int) -> None:
+        return await self._submit(lambda s: s.delete(task_id), write=True)
+
+    async def set_status(self, task_id: int, status: str) -> Task:
+        return await self._submit(lambda s: s.set_status(task_id, status), write=True)
+
+    async def mark_in_progress(self, task_id: int) -> Task:
+        return await self._submit(lambda s: s.mark_in_progress(task_id), write=True)
+
+    async def mark_done(self, task_id: int) -> Task:
+        return await self._submit(lambda s: s.mark_done(task_id), write=True)
+
+    async def apply_many(self, ops: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        ops = list(ops)
+        return await self._submit(lambda s: [s.apply(op) for op in ops], write=True)
+
+    async def list(self, status: Optional[str] = None, **kwargs: Any) -> List[Task]:
+        """Same options as ``TaskService.list`` (always materialized)."""
+        return await self._submit(lambda s: list(s.list(status, **kwargs)), write=False)
+
+    async def page(self, status: Optional[str] = None, **kwargs: Any) -> TaskPage:
+        return await self._submit(lambda s: s.page(status, **kwargs), write=False)
+
+    async def search(self, query: str, **kwargs: Any) -> List[Task]:
+        return await self._submit(lambda s: s.search(query, **kwargs), write=False)
+
+    async def stats(self) -> Dict[str, Any]:
+        return await self._submit(lambda s: s.stats(), write=False)
+
+    async def changes_since(self, seq: Optional[int]) -> TaskChanges:
+        return await self._submit(lambda s: s.changes_since(seq), write=False)
+
+    async def history(self, task_id: int) -> List[Transition]:
+        return await self._submit(lambda s: s.history(task_id), write=False)
+
+    async def close(self) -> None:
+        """Wait for queued calls, then stop the worker thread (if owned)."""
+        while self._pending or self._running:
+            await asyncio.gather(*self._running, *(f for _, _, f in self._pending),
+                                 return_exceptions=True)
+        if self._owns_executor:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self.service.close()
+
+    async def __aenter__(self) -> "AsyncTaskService":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
@@ -0,0 +1,191 @@
+import bisect
+import heapq
+import json
+import math
+import os
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..utils.text import tokenize
+
+INDEX_VERSION = 1
+
+# A query token that is only a prefix of a term scores less than an exact match
+PREFIX_WEIGHT = 0.5
+
+
+def index_path(file_path: Path) -> Path:
+    """Where the index of a tasks file is persisted (``tasks.json.idx``)."""
+    return file_path.with_name(file_path.name + ".idx")
+
+
+def _stamp(record: Dict[str, Any]) -> int:
+    """Checksum of the indexed fields, to spot records changed elsewhere."""
+    return zlib.crc32(f"{record['status']}\0{record['description']}".encode("utf-8"))
+
+
+class SearchIndex:
+    """Inverted index over task descriptions with accent folding and prefixes.
+
+    Terms map to ``{task_id: term frequency}``. Each query token matches the
+    term itself and every term it prefixes (via a sorted term list), and a
+    task must match all query tokens; scores are tf-idf sums.
+
+    The index keeps each task's status and a checksum (stamp) of its
+    description and status. ``sync()`` compares stamps with the storage, so
+    only records changed by someone else are re-tokenized; it is skipped
+    entirely while the storage ``signature()`` stays the same (see
+    ``TaskService.search``).
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self.signature: Any = None
+        self.dirty = False
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._docs: Dict[int, Tuple[str, ...]] = {}
+        self._status: Dict[int, str] = {}
+        self._stamps: Dict[int, int] = {}
+        self._terms: Optional[List[str]] = None
+
+    # ---------- internals ----------
+    def _index(self, task_id: int, status: str, stamp: int, tokens: Tuple[str, ...]) -> None:
+        self._docs[task_id] = tokens
+        self._status[task_id] = status
+        self._stamps[task_id] = stamp
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._terms = None
+            postings[task_id] = postings.get(task_id, 0) + 1
+
+    def _unindex(self, task_id: int) -> bool:
+        tokens = self._docs.pop(task_id, None)
+        if tokens is None:
+            return False
+        del self._status[task_id]
+        del self._stamps[task_id]
+        for token in set(tokens):
+            postings = self._postings[token]
+            del postings[task_id]
+            if not postings:
+                del self._postings[token]
+                self._terms = None
+        return True
+
+    def _expand(self, token: str) -> List[str]:
+        """Index terms starting with ``token`` (the exact term included)."""
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        start = bisect.bisect_left(self._terms, token)
+        end = bisect.bisect_left(self._terms, token + "\U0010ffff", start)
+        return self._terms[start:end]
+
+    # ---------- updates ----------
+    def put(self, record: Dict[str, Any]) -> bool:
+        """Index (or re-index) a task record; False if it was already current."""
+        task_id = int(record["id"])
+        stamp = _stamp(record)
+        if self._stamps.get(task_id) == stamp:
+            return False
+        self._unindex(task_id)
+        self._index(task_id, record["status"], stamp, tuple(tokenize(record["description"])))
+        self.dirty = True
+        return True
+
+    def remove(self, task_id: int) -> None:
+        if self._unindex(task_id):
+            self.dirty = True
+
+    def sync(self, records: Iterable[Dict[str, Any]], signature: Any = None) -> int:
+        """Bring the index in line with ``records``; returns how many changed.
+
+        ``signature`` is the storage signature taken before reading ``records``;
+        callers compare it with ``self.signature`` to skip needless syncs.
+        """
+        changed = 0
+        seen = set()
+        for record in records:
+            task_id = int(record["id"])
+            seen.add(task_id)
+            changed += self.put(record)
+        for task_id in [i for i in self._stamps if i not in seen]:
+            self.remove(task_id)
+            changed += 1
+        self.signature = signature
+        return changed
+
+    # ---------- queries ----------
+    def search(
+        self, query: str, status: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Return ``(task_id, score)`` pairs, best first (ties by id)."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        total = len(self._docs)
+        scores: Optional[Dict[int, float]] = None
+        for token in dict.fromkeys(tokens):
+            matched: Dict[int, float] = {}
+            for term in self._expand(token):
+                postings = self._postings[term]
+                weight = math.log(1 + total / len(postings))
+                if term != token:
+                    weight *= PREFIX_WEIGHT
+                for task_id, tf in postings.items():
+                    if scores is not None and task_id not in scores:
+                        continue
+                    score = weight * tf
+                    if score > matched.get(task_id, 0.0):
+                        matched[task_id] = score
+            if scores is None:
+                scores = matched
+            else:
+                scores = {task_id: scores[task_id] + s for task_id, s in matched.items()}
+            if not scores:
+                return []
+        if status is not None:
+            scores = {i: s for i, s in scores.items() if self._status[i] == status}
+        key = lambda item: (-item[1], item[0])
+        if limit is None:
+            return sorted(scores.items(), key=key)
+        return heapq.nsmallest(limit, scores.items(), key=key)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ---------- persistence ----------
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        """Load a saved index; a missing or unreadable file gives an empty one."""
+        index = cls(path)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return index
+            for task_id, status, stamp, text in data["docs"]:
+                index._index(int(task_id), status, int(stamp), tuple(text.split()))
+        except (FileNotFoundError, ValueError, KeyError, TypeError, AttributeError):
+            return cls(path)
+        return index
+
+    def save(self) -> None:
+        """Write the index to ``path`` (atomically) if it changed since loading."""
+        if self.path is None or not self.dirty:
+            return
+        docs = [
+            [task_id, self._status[task_id], self._stamps[task_id], " ".join(tokens)]
+            for task_id, tokens in self._docs.items()
+        ]
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "docs": docs}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.dirty = False
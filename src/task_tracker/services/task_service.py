@@ -1,72 +1,265 @@
 from __future__ import annotations
-from typing import List, Optional, Dict, Any
-from ..constants import ALL_STATUSES, DEFAULT_STATUS, STATUS_DONE, STATUS_IN_PROGRESS
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple, Union
+from ..constants import (
+    ALL_STATUSES,
+    DEFAULT_STATUS,
+    ORDER_ASC,
+    ORDER_DESC,
+    SORT_FIELDS,
+    STATUS_DONE,
+    STATUS_IN_PROGRESS,
+    TIME_FIELDS,
+)
 from ..exceptions import TaskNotFound, InvalidStatus
 from ..models.task import Task
-from ..utils.time import now_iso
+from ..models.task_changes import TaskChanges
+from ..models.task_page import TaskPage
+from ..models.task_table import TaskTable
+from ..models.transition import Transition
+from ..storage.archive import CODEC_GZIP, Archive, archive_path
+from ..storage.base import ListStorageAdapter, as_task_storage, between_records, page_records
+from ..storage.changes import ChangeFeed, changes_path
+from ..storage.events import Change, EventStore, events_path
+from ..storage.record_set import sort_key
+from ..storage.stats import TaskCounters
+from ..utils import profiling
+from ..utils.cursor import decode_cursor, encode_cursor
+from ..utils.time import iso_to_micros, now_iso
+from .search_index import SearchIndex
 
 class TaskService:
     """Business logic for managing tasks."""
 
-    def __init__(self, storage) -> None:
-        # storage must expose list() -> List[dict] and save_all(List[dict]) -> None
-        self.storage = storage
+    def __init__(
+        self,
+        storage,
+        index: Optional[SearchIndex] = None,
+        feed: Optional[ChangeFeed] = None,
+        events: Optional[EventStore] = None,
+        archive: Optional[Archive] = None,
+    ) -> None:
+        # storage should implement storage.base.TaskStorage; list()/save_all()
+        # storages are wrapped in ListStorageAdapter
+        self.storage = as_task_storage(storage)
+        # optional search index, kept current by this service's mutations
+        self.index = index
+        # change feed for changes_since(); file-backed storages share theirs
+        # with every process writing through a TaskService
+        file_path = getattr(storage, "file_path", None)
+        if feed is None:
+            feed = ChangeFeed(changes_path(file_path) if file_path is not None else None)
+        self.feed = feed
+        # status transitions for history(), stored next to the tasks file
+        if events is None:
+            events = EventStore(events_path(file_path) if file_path is not None else None)
+        self.events = events
+        # done tasks moved out of the storage by archive_done()
+        if archive is None:
+            archive = Archive(archive_path(file_path) if file_path is not None else None)
+        self.archive = archive
+        self._batch_depth = 0
+        self._changed: List[int] = []
+        self._transitions: List[Change] = []
 
     # ---------- internals ----------
-    def _load(self) -> List[Task]:
-        return [Task.from_dict(d) for d in self.storage.list()]
+    def _record(self, task_id: int) -> None:
+        # Inside a batch the ids wait for the commit, so a reader never gets
+        # a seq whose change it cannot see yet
+        if self._batch_depth:
+            self._changed.append(task_id)
+        else:
+            self.feed.record([task_id])
 
-    def _save(self, tasks: List[Task]) -> None:
-        self.storage.save_all([t.to_dict() for t in tasks])
+    def _transition(self, task_id: int, status: Optional[str], at: str, created: bool = False) -> None:
+        # Same rule as _record: written once the batch is committed
+        change = (task_id, status, iso_to_micros(at), created)
+        if self._batch_depth:
+            self._transitions.append(change)
+        else:
+            self.events.append([change])
 
-    def _next_id(self, tasks: List[Task]) -> int:
-        return (max((t.id for t in tasks), default=0) + 1)
+    def _next_id(self) -> int:
+        # Above the archived ids too, so an id is never given out twice
+        return max(self.storage.max_id(), self.archive.max_id()) + 1
 
-    def _find(self, tasks: List[Task], task_id: int) -> Task:
-        for t in tasks:
-            if t.id == task_id:
-                return t
-        raise TaskNotFound(f"Task {task_id} não encontrada")
+    @staticmethod
+    def _with_archived(
+        records: Iterable[Dict[str, Any]], archived: Iterable[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """``records`` followed by the ``archived`` ones; a task still in the
+        storage (archiving interrupted before removing it) wins."""
+        hot = list(records)
+        ids = {int(d["id"]) for d in hot}
+        return hot + [d for d in archived if int(d["id"]) not in ids]
+
+    def _select(
+        self,
+        status: Optional[str],
+        include_archived: bool,
+        since: Optional[int],
+        until: Optional[int],
+        time_field: str,
+    ) -> Iterable[Dict[str, Any]]:
+        """Records of ``status`` with ``since <= time_field < until`` (sorted by
+        it when a bound is given), then the archived ones if asked."""
+        if time_field not in TIME_FIELDS:
+            raise ValueError(f"Campo de data inválido: {time_field}")
+        ranged = since is not None or until is not None
+        if not ranged:
+            records = self.storage.iter(status)
+        else:
+            between = getattr(self.storage, "between", None)
+            if between is not None:
+                records = between(time_field, since, until, status)
+            else:
+                records = between_records(self.storage.iter(status), time_field, since, until)
+        if include_archived:
+            archived = self.archive.iter(status)
+            if ranged:
+                archived = between_records(archived, time_field, since, until)
+            records = self._with_archived(records, archived)
+        return records
+
+    def _patch(self, task_id: int, fields: Dict[str, Any]) -> Task:
+        data = self.storage.patch(task_id, fields)
+        if data is None:
+            raise TaskNotFound(f"Task {task_id} não encontrada")
+        if self.index is not None:
+            self.index.put(data)
+        self._record(task_id)
+        return Task.from_dict(data)
+
+    def _page_records(
+        self,
+        status: Optional[str],
+        sort_by: str,
+        order: str,
+        limit: Optional[int],
+        cursor: Optional[str],
+        include_archived: bool = False,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        time_field: str = "updatedAt",
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        if status is not None and status not in ALL_STATUSES:
+            raise InvalidStatus(f"Status inválido: {status}")
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Campo de ordenação inválido: {sort_by}")
+        if order not in (ORDER_ASC, ORDER_DESC):
+            raise ValueError(f"Ordem inválida: {order}")
+        if limit is not None and limit < 1:
+            raise ValueError("limit deve ser positivo")
+        after = decode_cursor(cursor, sort_by) if cursor else None
+        descending = order == ORDER_DESC
+        # one extra row tells whether there is a next page
+        fetch = None if limit is None else limit + 1
+        page = getattr(self.storage, "page", None)
+        if include_archived or since is not None or until is not None:
+            records = page_records(
+                self._select(status, include_archived, since, until, time_field), sort_by, descending, fetch, after
+            )
+        elif page is not None:
+            records = page(status, sort_by, descending, fetch, after)
+        else:
+            records = page_records(self.storage.iter(status), sort_by, descending, fetch, after)
+        if limit is None or len(records) <= limit:
+            return records, None
+        records = records[:limit]
+        return records, encode_cursor(sort_by, sort_key(records[-1], sort_by))
+
+    @staticmethod
+    def _tasks(records: Iterable[Dict[str, Any]]) -> Iterator[Task]:
+        """``Task.from_dict`` over ``records``; when profiling, the conversion
+        alone is timed (not the storage producing the records)."""
+        if not profiling.enabled():
+            yield from map(Task.from_dict, records)
+            return
+        clock = time.perf_counter
+        spent = 0.0
+        n = 0
+        try:
+            for d in records:
+                start = clock()
+                task = Task.from_dict(d)
+                spent += clock() - start
+                n += 1
+                yield task
+        finally:
+            profiling.record("task.from_dict", spent)
+            profiling.count("tasks.converted", n)
+
+    def _fetch(self, ids: List[int]) -> List[Task]:
+        """Tasks for ``ids``, in that order (missing ids are skipped)."""
+        if isinstance(self.storage, ListStorageAdapter) and len(ids) > 1:
+            # get() rereads the whole file here; one pass serves every id
+            wanted = set(ids)
+            found = {int(d["id"]): d for d in self.storage.iter() if int(d["id"]) in wanted}
+            records = [found.get(i) for i in ids]
+        else:
+            records = [self.storage.get(i) for i in ids]
+        return list(self._tasks(d for d in records if d is not None))
+
+    @staticmethod
+    def _text(op: Dict[str, Any], key: str) -> str:
+        value = op.get(key)
+        if not isinstance(value, str):
+            raise ValueError(f"campo '{key}' deve ser texto")
+        return value
 
     # ---------- public API ----------
+    @profiling.timed("service.get")
+    def get(self, task_id: int) -> Task:
+        data = self.storage.get(task_id)
+        if data is None:
+            raise TaskNotFound(f"Task {task_id} não encontrada")
+        return Task.from_dict(data)
+
+    @profiling.timed("service.add")
     def add(self, description: str) -> Task:
-        tasks = self._load()
         now = now_iso()
-        new = Task(
-            id=self._next_id(tasks),
-            description=description,
-            status=DEFAULT_STATUS,
-            createdAt=now,
-            updatedAt=now,
-        )
-        tasks.append(new)
-        self._save(tasks)
-        return new
+        record = {
+            "id": None,
+            "description": description,
+            "status": DEFAULT_STATUS,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        if self.archive.max_id():
+            # the storage only knows its own ids: pick one above the archive's
+            with self.batch():
+                data = self.storage.insert({**record, "id": self._next_id()})
+        else:
+            data = self.storage.insert(record)
+        if self.index is not None:
+            self.index.put(data)
+        self._record(int(data["id"]))
+        self._transition(int(data["id"]), DEFAULT_STATUS, now, created=True)
+        return Task.from_dict(data)
 
+    @profiling.timed("service.update")
     def update(self, task_id: int, description: str) -> Task:
-        tasks = self._load()
-        t = self._find(tasks, task_id)
-        t.description = description
-        t.updatedAt = now_iso()
-        self._save(tasks)
-        return t
+        return self._patch(task_id, {"description": description, "updatedAt": now_iso()})
 
+    @profiling.timed("service.delete")
     def delete(self, task_id: int) -> None:
-        tasks = self._load()
-        new_tasks = [t for t in tasks if t.id != task_id]
-        if len(new_tasks) == len(tasks):
+        if not self.storage.remove(task_id):
             raise TaskNotFound(f"Task {task_id} não encontrada")
-        self._save(new_tasks)
+        if self.index is not None:
+            self.index.remove(task_id)
+        self._record(task_id)
+        self._transition(task_id, None, now_iso())
 
+    @profiling.timed("service.set_status")
     def set_status(self, task_id: int, status: str) -> Task:
         if status not in ALL_STATUSES:
             raise InvalidStatus(f"Status inválido: {status}")
-        tasks = self._load()
-        t = self._find(tasks, task_id)
-        t.status = status
-        t.updatedAt = now_iso()
-        self._save(tasks)
-        return t
+        now = now_iso()
+        task = self._patch(task_id, {"status": status, "updatedAt": now})
+        self._transition(task_id, status, now)
+        return task
 
     def mark_in_progress(self, task_id: int) -> Task:
         return self.set_status(task_id, STATUS_IN_PROGRESS)
@@ -74,10 +267,236 @@ class TaskService:
     def mark_done(self, task_id: int) -> Task:
         return self.set_status(task_id, STATUS_DONE)
 
-    def list(self, status: Optional[str] = None) -> List[Task]:
-        tasks = self._load()
-        if status is None:
-            return tasks
-        if status not in ALL_STATUSES:
+    @profiling.timed("service.list")
+    def list(
+        self,
+        status: Optional[str] = None,
+        lazy: bool = False,
+        sort_by: Optional[str] = None,
+        order: str = ORDER_ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_archived: bool = False,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        time_field: str = "updatedAt",
+    ) -> Union[List[Task], TaskTable]:
+        """List tasks; ``lazy=True`` returns a columnar ``TaskTable`` that
+        builds ``Task`` objects only on access (for very large task sets).
+
+        With ``sort_by``, ``limit``, ``cursor`` or a descending ``order`` the
+        result is one sorted page (see ``page()``); otherwise tasks come in
+        storage order. Archived tasks are left out unless ``include_archived``
+        (they then follow the stored ones).
+
+        ``since``/``until`` (epoch microseconds, see ``utils.time.parse_instant``)
+        keep the tasks with ``since <= time_field < until``; unsorted, these
+        come ordered by ``time_field``.
+        """
+        if sort_by is None and limit is None and cursor is None and order == ORDER_ASC:
+            if status is not None and status not in ALL_STATUSES:
+                raise InvalidStatus(f"Status inválido: {status}")
+            records = self._select(status, include_archived, since, until, time_field)
+        else:
+            records, _ = self._page_records(
+                status, sort_by or "id", order, limit, cursor, include_archived, since, until, time_field
+            )
+        if lazy:
+            return TaskTable.from_records(records)
+        return list(self._tasks(records))
+
+    @profiling.timed("service.page")
+    def page(
+        self,
+        status: Optional[str] = None,
+        sort_by: str = "id",
+        order: str = ORDER_ASC,
+        limit: Optional[int] = 50,
+        cursor: Optional[str] = None,
+        include_archived: bool = False,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        time_field: str = "updatedAt",
+    ) -> TaskPage:
+        """One page of tasks sorted by ``sort_by`` (ties by id).
+
+        Pagination is keyset-based: ``next_cursor`` encodes the last task's
+        position, so pages stay consistent while tasks are added or removed.
+        Filters are the same as in ``list()``.
+        """
+        records, next_cursor = self._page_records(
+            status, sort_by, order, limit, cursor, include_archived, since, until, time_field
+        )
+        return TaskPage(list(self._tasks(records)), next_cursor)
+
+    def iter(self, status: Optional[str] = None) -> Iterator[Task]:
+        """Like ``list`` but yields tasks as the storage produces them."""
+        if status is not None and status not in ALL_STATUSES:
             raise InvalidStatus(f"Status inválido: {status}")
-        return [t for t in tasks if t.status == status]
+        yield from self._tasks(self.storage.iter(status))
+
+    @profiling.timed("service.stats")
+    def stats(self) -> Dict[str, Any]:
+        """Task counts: ``total``, ``by_status`` and the ``created_per_day`` /
+        ``completed_per_day`` histograms (see ``TaskCounters``).
+
+        Backends keep these counters up to date as tasks change, so this does
+        not scan the tasks; storages without ``stats()`` are counted once.
+        """
+        stats = getattr(self.storage, "stats", None)
+        if stats is not None:
+            return stats()
+        return TaskCounters(self.storage.iter()).to_dict()
+
+    @profiling.timed("service.search")
+    def search(self, query: str, status: Optional[str] = None, limit: Optional[int] = 20) -> List[Task]:
+        """Tasks whose description matches every word of ``query``, best first.
+
+        Matching ignores case and accents, and words may be prefixes
+        (``"rev rel"`` finds "Revisar relatório"). Without an index the
+        service builds one in memory on first use.
+        """
+        if status is not None and status not in ALL_STATUSES:
+            raise InvalidStatus(f"Status inválido: {status}")
+        if self.index is None:
+            self.index = SearchIndex()
+        signature = getattr(self.storage, "signature", None)
+        current = signature() if signature is not None else None
+        if current is None or current != self.index.signature:
+            self.index.sync(self.storage.iter(), current)
+        hits = self.index.search(query, status=status, limit=limit)
+        return self._fetch([task_id for task_id, _ in hits])
+
+    @profiling.timed("service.changes_since")
+    def changes_since(self, seq: Optional[int]) -> TaskChanges:
+        """Tasks added, modified or deleted after change number ``seq``.
+
+        Call with ``None`` before a full load to get the current ``seq``
+        (``reset`` is set), then pass the returned ``seq`` back each time to
+        fetch only the delta. Changes made without a ``TaskService`` (e.g.
+        editing the file by hand) are not in the feed.
+        """
+        latest, ids = self.feed.since(seq)
+        if ids is None:
+            return TaskChanges(latest, reset=True)
+        tasks = self._fetch(ids)
+        found = {t.id for t in tasks}
+        return TaskChanges(latest, tasks=tasks, removed=[i for i in ids if i not in found])
+
+    @profiling.timed("service.history")
+    def history(self, task_id: int) -> List[Transition]:
+        """Status transitions of a task, oldest first: its creation, each
+        status change and its deletion. Deleted tasks keep their history
+        until their id is given to a new task."""
+        transitions = self.events.history(task_id)
+        if not transitions and self.storage.get(task_id) is None and self.archive.get(task_id) is None:
+            raise TaskNotFound(f"Task {task_id} não encontrada")
+        return transitions
+
+    @profiling.timed("service.archive")
+    def archive_done(self, older_than: timedelta, codec: str = CODEC_GZIP) -> Optional[Dict[str, Any]]:
+        """Move done tasks not updated for ``older_than`` to a new archive
+        segment; returns its manifest entry (None if no task qualified).
+
+        The segment is written before the tasks leave the storage, in one
+        batch. Archived tasks keep their ids and their history.
+        """
+        cutoff = iso_to_micros(now_iso()) - older_than // timedelta(microseconds=1)
+        with self.batch():
+            records = [dict(d) for d in self._select(STATUS_DONE, False, None, cutoff, "updatedAt")]
+            entry = self.archive.write(records, codec)
+            for d in records:
+                task_id = int(d["id"])
+                self.storage.remove(task_id)
+                if self.index is not None:
+                    self.index.remove(task_id)
+                self._record(task_id)
+        return entry
+
+    # ---------- batch API ----------
+    @contextmanager
+    def batch(self) -> Iterator["TaskService"]:
+        """Group mutations so the storage loads and commits only once.
+
+        Falls back to per-call commits for storages without ``batch()``.
+        """
+        storage_batch = getattr(self.storage, "batch", None)
+        self._batch_depth += 1
+        try:
+            if storage_batch is None:
+                yield self
+            else:
+                with storage_batch():
+                    yield self
+        except BaseException:
+            if self.index is not None:
+                self.index.signature = None  # rolled back: resync on next search
+            if storage_batch is not None and self._batch_depth == 1:
+                # rolled back: nothing changed
+                self._changed = []
+                self._transitions = []
+            raise
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._changed:
+                changed, self._changed = self._changed, []
+                self.feed.record(changed)
+            if self._batch_depth == 0 and self._transitions:
+                transitions, self._transitions = self._transitions, []
+                self.events.append(transitions)
+
+    def apply(self, op: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply one op dict and report the outcome instead of raising.
+
+        Ops mirror the CLI commands: ``{"op": "add", "description": ...}``,
+        ``update`` (id, description), ``delete`` (id), ``mark-in-progress``,
+        ``mark-done`` (id) and ``status`` (id, status).
+        """
+        kind = op.get("op")
+        try:
+            if kind == "add":
+                task = self.add(self._text(op, "description"))
+            elif kind == "update":
+                task = self.update(int(op["id"]), self._text(op, "description"))
+            elif kind == "delete":
+                self.delete(int(op["id"]))
+                return {"op": kind, "ok": True, "id": int(op["id"])}
+            elif kind == "mark-in-progress":
+                task = self.mark_in_progress(int(op["id"]))
+            elif kind == "mark-done":
+                task = self.mark_done(int(op["id"]))
+            elif kind == "status":
+                task = self.set_status(int(op["id"]), self._text(op, "status"))
+            else:
+                return {"op": kind, "ok": False, "error": f"Operação desconhecida: {kind}"}
+        except (TaskNotFound, InvalidStatus) as e:
+            return {"op": kind, "ok": False, "error": str(e)}
+        except (KeyError, TypeError, ValueError) as e:
+            return {"op": kind, "ok": False, "error": f"Operação inválida: {e}"}
+        return {"op": kind, "ok": True, "id": task.id}
+
+    @profiling.timed("service.import_records")
+    def import_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert complete records (ids included) in one batch; returns how
+        many. ``services.transfer`` validates them and picks the ids."""
+        n = 0
+        with self.batch():
+            for d in records:
+                data = self.storage.insert(d)
+                if self.index is not None:
+                    self.index.put(data)
+                self._record(int(data["id"]))
+                self._transition(int(data["id"]), data["status"], data["createdAt"], created=True)
+                n += 1
+        return n
+
+    @profiling.timed("service.apply_many")
+    def apply_many(self, ops: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply many ops inside a single ``batch()``."""
+        with self.batch():
+            return [self.apply(op) for op in ops]
+
+    def close(self) -> None:
+        """Release the files held open by the event store. The storage is
+        closed by whoever opened it."""
+        self.events.close()
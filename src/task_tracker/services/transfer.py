@@ -0,0 +1,248 @@
+"""Bulk export/import of tasks as CSV, JSON Lines or the native JSON array.
+
+Both directions stream in chunks of ``CHUNK_SIZE`` records. On import each
+chunk is validated through ``Task.from_dict`` (plus status and timestamp
+checks); large inputs spread that work, and the JSON Lines parsing, over a
+process pool with a bounded number of chunks in flight. Valid records are
+then inserted in a single ``TaskService.batch()``, i.e. one write.
+"""
+import csv
+import io
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+from ..constants import ALL_STATUSES, DEFAULT_STATUS
+from ..models.task import Task
+from ..storage.json_stream import iter_json_array
+from ..utils.time import now_iso
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_NATIVE = "native"  # a JSON array, as in tasks.json
+TRANSFER_FORMATS = (FORMAT_CSV, FORMAT_JSONL, FORMAT_NATIVE)
+SUFFIXES = {".csv": FORMAT_CSV, ".jsonl": FORMAT_JSONL}
+
+IDS_KEEP = "keep"          # keep incoming ids, remapping only those already taken
+IDS_RENUMBER = "renumber"  # number every imported task after the existing ones
+ID_MODES = (IDS_KEEP, IDS_RENUMBER)
+
+CSV_FIELDS = ("id", "description", "status", "createdAt", "updatedAt")
+CHUNK_SIZE = 5_000
+PARALLEL_BYTES = 16 * 1024 * 1024  # inputs above this are validated in a process pool
+
+# (position in the input, raw record or JSON Lines text)
+Item = Tuple[int, Any]
+# (position, validated record or None, error)
+Checked = Tuple[int, Optional[Dict[str, Any]], str]
+
+
+@dataclass(slots=True)
+class ImportResult:
+    imported: int = 0
+    remapped: int = 0    # tasks stored under another id than the one in the input
+    duplicates: int = 0  # same description and createdAt as a task already there
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+
+def format_for(path: Path) -> str:
+    return SUFFIXES.get(path.suffix, FORMAT_NATIVE)
+
+
+def _chunks(items: Iterable[Item], size: int) -> Iterator[List[Item]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ---------- export ----------
+def export_tasks(records: Iterable[Dict[str, Any]], stream: TextIO, fmt: str) -> int:
+    """Write ``records`` to ``stream`` chunk by chunk; returns how many."""
+    n = 0
+    if fmt == FORMAT_CSV:
+        writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for chunk in _chunks(enumerate(records), CHUNK_SIZE):
+            writer.writerows(d for _, d in chunk)
+            n += len(chunk)
+        return n
+    if fmt == FORMAT_JSONL:
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        for chunk in _chunks(enumerate(records), CHUNK_SIZE):
+            stream.write("".join(dumps(d) + "\n" for _, d in chunk))
+            n += len(chunk)
+        return n
+    # Native: the same indented array JsonStorage writes
+    stream.write("[")
+    for chunk in _chunks(enumerate(records), CHUNK_SIZE):
+        items = (json.dumps(d, ensure_ascii=False, indent=2).replace("\n", "\n  ") for _, d in chunk)
+        stream.write(("," if n else "") + ",".join("\n  " + item for item in items))
+        n += len(chunk)
+    stream.write("\n]" if n else "]")
+    return n
+
+
+# ---------- import ----------
+def read_items(stream: BinaryIO, fmt: str) -> Iterator[Item]:
+    """Raw records with their line (CSV, JSON Lines) or index (native).
+
+    JSON Lines are yielded as text, so parsing happens with validation.
+    Unreadable input is yielded as a ``ValueError`` in place of the record.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="" if fmt == FORMAT_CSV else None)
+    if fmt == FORMAT_CSV:
+        reader = csv.DictReader(text)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield reader.line_num, ValueError(f"CSV inválido: {e}")
+                continue
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in (None, "")}
+    elif fmt == FORMAT_JSONL:
+        for n, line in enumerate(text, start=1):
+            if line.strip():
+                yield n, line
+    else:
+        try:
+            for n, d in enumerate(iter_json_array(text), start=1):
+                yield n, d
+        except ValueError as e:
+            yield 0, ValueError(f"JSON inválido: {e}")
+
+
+def _check(raw: Any) -> Dict[str, Any]:
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    if not isinstance(raw, dict):
+        raise ValueError("esperado um objeto")
+    data = dict(raw)
+    task_id = data.get("id")
+    data.setdefault("status", DEFAULT_STATUS)
+    data.setdefault("createdAt", now_iso())
+    data.setdefault("updatedAt", data["createdAt"])
+    if task_id in (None, ""):
+        data["id"] = 0
+    record = Task.from_dict(data).to_dict()
+    if record["status"] not in ALL_STATUSES:
+        raise ValueError(f"Status inválido: {record['status']}")
+    for key in ("createdAt", "updatedAt"):
+        try:
+            datetime.fromisoformat(record[key])
+        except ValueError:
+            raise ValueError(f"{key} inválido: {record[key]}") from None
+    if task_id in (None, ""):
+        record["id"] = None  # gets the next free id
+    elif record["id"] < 1:
+        raise ValueError(f"id inválido: {record['id']}")
+    return record
+
+
+def validate_chunk(items: List[Item]) -> List[Checked]:
+    """Parse and validate one chunk (runs in worker processes)."""
+    checked = []
+    for n, raw in items:
+        if isinstance(raw, ValueError):
+            checked.append((n, None, str(raw)))
+            continue
+        try:
+            checked.append((n, _check(raw), ""))
+        except json.JSONDecodeError as e:
+            checked.append((n, None, f"JSON inválido: {e}"))
+        except KeyError as e:
+            checked.append((n, None, f"campo obrigatório ausente: {e}"))
+        except (TypeError, ValueError) as e:
+            checked.append((n, None, str(e)))
+    return checked
+
+
+def validated(chunks: Iterable[List[Item]], workers: int) -> Iterator[List[Checked]]:
+    """``validate_chunk`` over ``chunks`` in order, with ``workers`` processes
+    (in this process when ``workers <= 1``). At most two chunks per worker
+    are in flight, so memory stays bounded on any input size."""
+    if workers <= 1:
+        for chunk in chunks:
+            yield validate_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for chunk in chunks:
+            window.append(pool.submit(validate_chunk, chunk))
+            if len(window) >= 2 * workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+class IdAllocator:
+    """Decides the id of each imported task against the tasks already stored."""
+
+    def __init__(self, existing: Iterable[Dict[str, Any]], next_id: int, mode: str = IDS_KEEP) -> None:
+        self.mode = mode
+        self.used: Set[int] = set()
+        self.keys: Set[Tuple[str, str]] = set()
+        for d in existing:
+            self.used.add(int(d["id"]))
+            self.keys.add((d["description"], d["createdAt"]))
+        self.next_id = max(next_id, max(self.used, default=0) + 1)
+
+    def assign(self, record: Dict[str, Any], result: ImportResult) -> Optional[Dict[str, Any]]:
+        """The record to insert, with its final id, or None for a duplicate."""
+        key = (record["description"], record["createdAt"])
+        if key in self.keys:
+            result.duplicates += 1
+            return None
+        self.keys.add(key)
+        task_id = record["id"]
+        if self.mode == IDS_RENUMBER or task_id is None or task_id in self.used:
+            if task_id is not None:
+                result.remapped += 1
+            task_id = self.next_id
+        self.used.add(task_id)
+        self.next_id = max(self.next_id, task_id + 1)
+        return {**record, "id": task_id}
+
+
+def import_tasks(
+    service,
+    stream: BinaryIO,
+    fmt: str,
+    mode: str = IDS_KEEP,
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> ImportResult:
+    """Import every valid record of ``stream`` in one ``service`` batch.
+
+    Invalid records are skipped and listed in ``result.errors``.
+    """
+    result = ImportResult()
+
+    def accepted() -> Iterator[Dict[str, Any]]:
+        # First run inside import_records' batch, so the ids in use are read
+        # under the same lock as the inserts. Archived tasks keep their ids:
+        # never reuse them, nor import them twice
+        allocator = IdAllocator(
+            chain(service.storage.iter(), service.archive.iter()),
+            max(service.storage.max_id(), service.archive.max_id()) + 1,
+            mode,
+        )
+        for chunk in validated(_chunks(read_items(stream, fmt), chunk_size), workers):
+            for n, record, error in chunk:
+                if record is None:
+                    result.errors.append((n, error))
+                    continue
+                record = allocator.assign(record, result)
+                if record is not None:
+                    yield record
+
+    result.imported = service.import_records(accepted())
+    return result
@@ -1,3 +1,27 @@
-from .json_storage import JsonStorage
+from importlib import import_module
 
-__all__ = ["JsonStorage"]
+# Backends are imported on first access so that importing one storage module
+# (e.g. ``storage.factory`` from the CLI) doesn't pull in sqlite3 and friends.
+_EXPORTS = {
+    "TaskStorage": ".base",
+    "ListStorageAdapter": ".base",
+    "as_task_storage": ".base",
+    "open_storage": ".factory",
+    "JsonStorage": ".json_storage",
+    "CachedJsonStorage": ".cached_storage",
+    "GroupCommitStorage": ".group_commit",
+    "RecordSet": ".record_set",
+    "SqliteStorage": ".sqlite_storage",
+    "MmapStorage": ".mmap_storage",
+    "ShardedStorage": ".sharded_storage",
+    "WalStorage": ".wal_storage",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
@@ -0,0 +1,142 @@
+"""Cold storage for done tasks: compressed, write-once archive segments.
+
+``tasks.json.archive/`` holds one ``segment-NNNN.jsonl.gz`` (or ``.xz``)
+per ``task-cli archive`` run, with the archived records as JSON Lines, and
+``manifest.json`` listing the segments with their id range and the
+highest id ever archived. Segments are never rewritten; the manifest is
+replaced atomically after the segment is complete, so a crash leaves at
+most an unlisted segment file.
+"""
+import gzip
+import json
+import lzma
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from .json_storage import Signature, stat_signature
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run without the file lock
+    fcntl = None
+
+MANIFEST_NAME = "manifest.json"
+
+CODEC_GZIP = "gzip"
+CODEC_LZMA = "lzma"
+CODECS = {CODEC_GZIP: (gzip, ".jsonl.gz"), CODEC_LZMA: (lzma, ".jsonl.xz")}
+
+
+def archive_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + ".archive")
+
+
+class Archive:
+    """Archived tasks, in a directory or (``path=None``) in memory."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._segments: List[Dict[str, Any]] = []
+        self._max_id = 0
+        self._signature: Optional[Signature] = None
+        self._memory: List[List[Dict[str, Any]]] = []  # records per segment, in memory
+        if path is not None:
+            self.manifest_path = path / MANIFEST_NAME
+            self.lock_path = path / (MANIFEST_NAME + ".lock")
+
+    # ---------- internals ----------
+    @contextmanager
+    def _manifest_lock(self) -> Iterator[None]:
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # also releases the flock
+
+    def _refresh(self) -> None:
+        """Reload the manifest if another process changed it."""
+        if self.path is None:
+            return
+        signature = stat_signature(self.manifest_path)
+        if signature == self._signature:
+            return
+        if signature is None:
+            self._segments, self._max_id = [], 0
+        else:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            self._segments, self._max_id = data["segments"], int(data["max_id"])
+        self._signature = signature
+
+    def _read(self, segment: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        module, _ = CODECS[segment["codec"]]
+        with module.open(self.path / segment["file"], "rt", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    # ---------- public API ----------
+    def max_id(self) -> int:
+        """Highest id ever archived (0 without an archive)."""
+        self._refresh()
+        return self._max_id
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """Manifest entries: ``file``, ``codec``, ``count``, ``min_id``, ``max_id``."""
+        self._refresh()
+        return list(self._segments)
+
+    def iter(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Archived records, newest segment first."""
+        self._refresh()
+        for i in range(len(self._segments) - 1, -1, -1):
+            records = self._memory[i] if self.path is None else self._read(self._segments[i])
+            for d in records:
+                if status is None or d["status"] == status:
+                    yield d
+
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """Reads only the segments whose id range holds ``task_id``."""
+        self._refresh()
+        for i in range(len(self._segments) - 1, -1, -1):
+            segment = self._segments[i]
+            if segment["min_id"] <= task_id <= segment["max_id"]:
+                records = self._memory[i] if self.path is None else self._read(segment)
+                for d in records:
+                    if int(d["id"]) == task_id:
+                        return dict(d)
+        return None
+
+    def write(self, records: Iterable[Dict[str, Any]], codec: str = CODEC_GZIP) -> Optional[Dict[str, Any]]:
+        """Store ``records`` as a new segment; returns its manifest entry
+        (None when there was nothing to archive)."""
+        records = list(records)
+        if not records:
+            return None
+        ids = [int(d["id"]) for d in records]
+        entry = {"file": "", "codec": codec, "count": len(records), "min_id": min(ids), "max_id": max(ids)}
+        if self.path is None:
+            entry["file"] = f"segment-{len(self._segments) + 1:04d}"
+            self._memory.append([dict(d) for d in records])
+            self._segments.append(entry)
+            self._max_id = max(self._max_id, entry["max_id"])
+            return entry
+        module, suffix = CODECS[codec]
+        with self._manifest_lock():
+            self._refresh()
+            number = len(self._segments) + 1
+            entry["file"] = f"segment-{number:04d}{suffix}"
+            target = self.path / entry["file"]
+            with module.open(target, "wt", encoding="utf-8") as f:
+                for d in records:
+                    f.write(json.dumps(d, ensure_ascii=False, separators=(",", ":")) + "\n")
+            with target.open("rb") as f:
+                os.fsync(f.fileno())
+            data = {"version": 1, "max_id": max(self._max_id, entry["max_id"]), "segments": self._segments + [entry]}
+            tmp = self.manifest_path.with_name(MANIFEST_NAME + ".tmp")
+            tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp, self.manifest_path)
+            self._refresh()
+        return entry
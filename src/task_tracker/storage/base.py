@@ -0,0 +1,223 @@
+import heapq
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple, TypeVar, runtime_checkable
+from ..exceptions import ConcurrentModification
+from .record_set import RecordSet, SortKey, key_after, sort_key
+from .stats import TaskCounters
+
+CONFLICT_RETRIES = 3
+
+T = TypeVar("T")
+
+
+@runtime_checkable
+class TaskStorage(Protocol):
+    """Granular storage protocol used by ``TaskService``.
+
+    Records are plain dicts in the ``Task.to_dict()`` shape. ``insert`` with
+    ``id=None`` lets the backend allocate the next id atomically.
+
+    Backends may also offer a ``batch()`` context manager that groups
+    mutations into a single load/commit; ``TaskService.batch()`` uses it
+    when present. An optional ``signature()`` returns a value that changes
+    whenever the stored data changes (used to skip search index resyncs).
+    An optional ``page(status, sort_by, descending, limit, after)`` returns
+    one sorted page after a ``(value, id)`` key; ``page_records`` is the
+    fallback used for backends without it. An optional ``stats()`` returns
+    ``TaskCounters.to_dict()`` without scanning the tasks. An optional
+    ``between(field, since, until, status)`` returns the tasks whose
+    ``createdAt``/``updatedAt`` falls in ``[since, until)`` (epoch
+    microseconds, either bound may be None) sorted by it, from a sorted time
+    index; ``between_records`` is the fallback.
+    """
+
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]: ...
+
+    def insert(self, task: Dict[str, Any]) -> Dict[str, Any]: ...
+
+    def patch(self, task_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    def remove(self, task_id: int) -> bool: ...
+
+    def iter(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]: ...
+
+    def max_id(self) -> int: ...
+
+
+def page_records(
+    records: Iterable[Dict[str, Any]],
+    sort_by: str = "id",
+    descending: bool = False,
+    limit: Optional[int] = None,
+    after: Optional[SortKey] = None,
+) -> List[Dict[str, Any]]:
+    """Sort and page any record stream: one pass, ``O(n log limit)``."""
+    key = lambda d: sort_key(d, sort_by)
+    after = key_after(after)
+    if after is not None:
+        if descending:
+            records = (d for d in records if key(d) < after)
+        else:
+            records = (d for d in records if key(d) > after)
+    if limit is None:
+        return sorted(records, key=key, reverse=descending)
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    return pick(limit, records, key=key)
+
+
+def between_records(
+    records: Iterable[Dict[str, Any]],
+    field: str,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Filter any record stream to ``since <= field < until``, sorted by it."""
+    keyed = []
+    for d in records:
+        key = sort_key(d, field)
+        if (since is None or key[0] >= since) and (until is None or key[0] < until):
+            keyed.append((key, d))
+    keyed.sort(key=lambda item: item[0])
+    return [d for _, d in keyed]
+
+
+class ListStorageAdapter:
+    """Exposes ``TaskStorage`` over a ``list()``/``save_all()`` storage.
+
+    Every call still reads (and mutations rewrite) the whole dataset; this
+    keeps ``JsonStorage`` and other simple backends working unchanged.
+    Mutations run as a ``batch()``: the dataset is loaded once into a
+    ``RecordSet`` and saved once on exit, under the storage's ``lock()`` when
+    it has one. A single mutation that hits ``ConcurrentModification`` is
+    retried on fresh data; a multi-op batch fails fast instead.
+    """
+
+    def __init__(self, storage) -> None:
+        self.storage = storage
+        self._batch: Optional[RecordSet] = None
+        self._dirty = False
+
+    # ---------- internals ----------
+    def _mutate(self, fn: Callable[[RecordSet], Tuple[T, bool]]) -> T:
+        """Run ``fn`` on the loaded records; it returns ``(result, changed)``."""
+        if self._batch is not None:
+            result, changed = fn(self._batch)
+            self._dirty = self._dirty or changed
+            return result
+        for attempt in range(CONFLICT_RETRIES):
+            try:
+                with self.batch():
+                    return self._mutate(fn)
+            except ConcurrentModification:
+                if attempt == CONFLICT_RETRIES - 1:
+                    raise
+        raise AssertionError("unreachable")
+
+    # ---------- TaskStorage ----------
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        if self._batch is not None:
+            return self._batch.get(task_id)
+        for d in self.storage.list():
+            if int(d["id"]) == task_id:
+                return dict(d)
+        return None
+
+    def insert(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        return self._mutate(lambda records: (dict(records.insert(task)), True))
+
+    def patch(self, task_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        def apply(records: RecordSet) -> Tuple[Optional[Dict[str, Any]], bool]:
+            record = records.patch(task_id, fields)
+            return (dict(record), True) if record is not None else (None, False)
+        return self._mutate(apply)
+
+    def remove(self, task_id: int) -> bool:
+        def apply(records: RecordSet) -> Tuple[bool, bool]:
+            removed = records.pop(task_id) is not None
+            return removed, removed
+        return self._mutate(apply)
+
+    def iter(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        if self._batch is not None:
+            yield from self._batch.iter(status)
+            return
+        # Stream when the storage can (JsonStorage.iter_records)
+        iter_records = getattr(self.storage, "iter_records", None)
+        if iter_records is not None:
+            yield from iter_records(status)
+            return
+        for d in self.storage.list():
+            if status is None or d["status"] == status:
+                yield d
+
+    def page(
+        self,
+        status: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[SortKey] = None,
+    ) -> List[Dict[str, Any]]:
+        if self._batch is not None:
+            return self._batch.page(status, sort_by, descending, limit, after)
+        return page_records(self.iter(status), sort_by, descending, limit, after)
+
+    def between(
+        self,
+        field: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        if self._batch is not None:
+            return self._batch.between(field, since, until, status)
+        return between_records(self.iter(status), field, since, until)
+
+    def stats(self) -> Dict[str, Any]:
+        if self._batch is not None:
+            return self._batch.stats()
+        stats = getattr(self.storage, "stats", None)
+        if stats is not None:
+            return stats()
+        return TaskCounters(self.iter()).to_dict()
+
+    def max_id(self) -> int:
+        if self._batch is not None:
+            return self._batch.max_id()
+        return max((int(d["id"]) for d in self.storage.list()), default=0)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Load once, apply every mutation in memory, save once on success."""
+        if self._batch is not None:
+            yield
+            return
+        lock = getattr(self.storage, "lock", None)
+        with lock() if lock is not None else nullcontext():
+            self._batch = RecordSet(self.storage.list())
+            self._dirty = False
+            try:
+                yield
+                if self._dirty:
+                    self.storage.save_all(list(self._batch.iter()))
+            finally:
+                self._batch = None
+                self._dirty = False
+
+    def signature(self) -> Any:
+        signature = getattr(self.storage, "signature", None)
+        return signature() if signature is not None else None
+
+    # Legacy API passthrough
+    def list(self) -> List[Dict[str, Any]]:
+        return self.storage.list()
+
+    def save_all(self, tasks: List[Dict[str, Any]]) -> None:
+        self.storage.save_all(tasks)
+
+
+def as_task_storage(storage) -> TaskStorage:
+    """Return ``storage`` itself if it is granular, else wrap it in the adapter."""
+    if isinstance(storage, TaskStorage):
+        return storage
+    return ListStorageAdapter(storage)
@@ -0,0 +1,162 @@
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional
+from ..exceptions import ConcurrentModification
+from ..utils import profiling
+from .json_storage import DEFAULT_LOCK_TIMEOUT, DURABILITY_NONE, JsonStorage, Signature, stat_signature
+from .record_set import RecordSet, SortKey
+from .stats import TaskCounters
+
+
+class CachedJsonStorage(JsonStorage):
+    """``JsonStorage`` that keeps the parsed records in memory.
+
+    Each call revalidates the cache with a single ``os.stat``; the file is
+    only re-parsed when its signature changed (e.g. another process wrote
+    it). ``hits``/``misses`` count those revalidations. Mutations revalidate
+    while holding the file lock, so they always apply on the latest version.
+    """
+
+    def __init__(
+        self,
+        file_path: Path | None = None,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+        durability: str = DURABILITY_NONE,
+        file_format: Optional[str] = None,
+    ) -> None:
+        self._lock = threading.RLock()
+        self._records = RecordSet()
+        self._signature: Optional[Signature] = None
+        self._batch_depth = 0
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        super().__init__(file_path=file_path, lock_timeout=lock_timeout, durability=durability,
+                         file_format=file_format)
+
+    # ---------- internals ----------
+    def _revalidate(self) -> RecordSet:
+        if self._dirty:
+            # Uncommitted batch changes live only in memory; never reload over them
+            self.hits += 1
+            return self._records
+        signature = stat_signature(self.file_path)
+        if signature is not None and signature == self._signature:
+            self.hits += 1
+            profiling.count("cache.hits")
+            return self._records
+        self.misses += 1
+        profiling.count("cache.misses")
+        self._records = RecordSet(self._read_all())
+        self._signature = self._etag
+        return self._records
+
+    def _write_all(self, tasks: List[Dict[str, Any]], counters: Optional[TaskCounters] = None) -> None:
+        # The etag is taken from our temp file, so a write by another process
+        # right after our replace() is not mistaken for ours
+        super()._write_all(tasks, counters)
+        self._signature = self._etag
+
+    def _flush(self) -> None:
+        if self._batch_depth:
+            self._dirty = True
+            return
+        if stat_signature(self.file_path) != self._signature:
+            # Someone wrote without taking the lock; keep their data
+            self._signature = None
+            raise ConcurrentModification(
+                f"{self.file_path} foi alterado por outro processo; tente novamente"
+            )
+        self._write_all(list(self._records.iter()), self._records.counters)
+
+    # ---------- TaskStorage ----------
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._revalidate().get(task_id)
+
+    def insert(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock, self.lock():
+            record = self._revalidate().insert(task)
+            self._flush()
+            return dict(record)
+
+    def patch(self, task_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock, self.lock():
+            record = self._revalidate().patch(task_id, fields)
+            if record is None:
+                return None
+            self._flush()
+            return dict(record)
+
+    def remove(self, task_id: int) -> bool:
+        with self._lock, self.lock():
+            records = self._revalidate()
+            if records.pop(task_id) is None:
+                return False
+            self._flush()
+            return True
+
+    def iter(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            return iter(list(self._revalidate().iter(status)))
+
+    def page(
+        self,
+        status: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[SortKey] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._revalidate().page(status, sort_by, descending, limit, after)
+
+    def between(
+        self,
+        field: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._revalidate().between(field, since, until, status)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._revalidate().stats()
+
+    def max_id(self) -> int:
+        with self._lock:
+            return self._revalidate().max_id()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Defer the file rewrite until the outermost batch exits."""
+        with self._lock, self.lock():
+            self._batch_depth += 1
+            try:
+                yield
+            except BaseException:
+                # Memory is ahead of the file now; force a reload next time
+                self._signature = None
+                self._dirty = False
+                raise
+            finally:
+                self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._dirty = False
+                self._flush()
+
+    def cache_info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._records)}
+
+    # Public API for service
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._revalidate().iter())
+
+    def save_all(self, tasks: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            super().save_all(tasks)
+            self._records = RecordSet(tasks)
@@ -0,0 +1,146 @@
+"""Change feed: a monotonically increasing sequence number per task change.
+
+``tasks.json.changes`` holds one ``"<seq> <id>"`` line per insert, update or
+delete, appended under an ``fcntl`` lock so writers in different processes
+never hand out the same ``seq``. Readers keep the entries parsed so far and
+only read what was appended since. Once the file passes about
+``max_entries`` lines its oldest half is dropped; a consumer that fell
+behind that point is told to reload everything.
+"""
+import bisect
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+from ..utils import profiling
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run without the file lock
+    fcntl = None
+
+DEFAULT_MAX_ENTRIES = 10_000
+LINE_BYTES = 16  # rough size of one line, to decide on compaction without reading the file
+TAIL_BYTES = 64
+
+Entry = Tuple[int, int]  # (seq, task id)
+
+
+def changes_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + ".changes")
+
+
+def _parse(data: bytes) -> List[Entry]:
+    entries = []
+    for line in data.splitlines():
+        seq, task_id = line.split()
+        entries.append((int(seq), int(task_id)))
+    return entries
+
+
+class ChangeFeed:
+    """Sequence of changed task ids, in a file or (``path=None``) in memory."""
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: List[Entry] = []
+        self._offset = 0  # bytes of the file already in _entries
+        self._inode: Optional[int] = None
+
+    # ---------- internals ----------
+    @staticmethod
+    def _last_seq(fd: int, size: int) -> int:
+        if size == 0:
+            return 0
+        n = min(size, TAIL_BYTES)
+        line = os.pread(fd, n, size - n).rstrip(b"\n").rsplit(b"\n", 1)[-1]
+        return int(line.split()[0])
+
+    def _compact(self, fd: int) -> None:
+        """Keep the newest half of the entries (file locked)."""
+        size = os.fstat(fd).st_size
+        entries = _parse(os.pread(fd, size, 0))[-(self.max_entries // 2):]
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_bytes("".join(f"{seq} {task_id}\n" for seq, task_id in entries).encode("ascii"))
+        os.replace(tmp, self.path)
+
+    def _load(self) -> None:
+        """Bring ``_entries`` up to date with the file."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._entries, self._offset, self._inode = [], 0, None
+            return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            # Replaced by a compaction (or recreated): parse it again
+            self._entries, self._offset, self._inode = [], 0, st.st_ino
+        if st.st_size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # a line still being written is read next time
+        self._entries += _parse(data[:end])
+        self._offset += end
+
+    # ---------- public API ----------
+    @profiling.timed("feed.record")
+    def record(self, task_ids: Iterable[int]) -> int:
+        """Append one entry per id and return the last ``seq`` handed out."""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return self.seq()
+        with self._lock:
+            if self.path is None:
+                last = self._entries[-1][0] if self._entries else 0
+                self._entries += [(last + i, task_id) for i, task_id in enumerate(task_ids, 1)]
+                if len(self._entries) > self.max_entries:
+                    del self._entries[:len(self._entries) - self.max_entries // 2]
+                return last + len(task_ids)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                if os.fstat(fd).st_ino != os.stat(self.path).st_ino:
+                    # Compacted by another process between our open() and flock()
+                    os.close(fd)
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                size = os.fstat(fd).st_size
+                last = self._last_seq(fd, size)
+                data = "".join(f"{last + i} {task_id}\n" for i, task_id in enumerate(task_ids, 1))
+                os.write(fd, data.encode("ascii"))
+                if size + len(data) > self.max_entries * LINE_BYTES:
+                    self._compact(fd)
+            finally:
+                os.close(fd)  # also releases the flock
+            return last + len(task_ids)
+
+    def seq(self) -> int:
+        """The newest ``seq`` (0 before the first change)."""
+        with self._lock:
+            if self.path is not None:
+                self._load()
+            return self._entries[-1][0] if self._entries else 0
+
+    def since(self, seq: Optional[int]) -> Tuple[int, Optional[List[int]]]:
+        """``(newest seq, ids changed after seq)``, each id once, oldest change
+        first. The ids are ``None`` when the feed cannot tell: ``seq`` is None,
+        older than the oldest kept entry, or newer than the feed (recreated)."""
+        with self._lock:
+            if self.path is not None:
+                self._load()
+            if not self._entries:
+                return 0, [] if seq == 0 else None
+            latest = self._entries[-1][0]
+            if seq is None or seq < self._entries[0][0] - 1 or seq > latest:
+                return latest, None
+            start = bisect.bisect_right(self._entries, (seq, float("inf")))
+            changed = {}
+            for _, task_id in self._entries[start:]:
+                changed.pop(task_id, None)
+                changed[task_id] = True
+            return latest, list(changed)
@@ -0,0 +1,248 @@
+"""Status transition history: an append-only log of fixed-size events.
+
+``tasks.json.events`` holds one ``EVENT`` per change (task id, time, status
+after it, whether it created the task). Writers only append, with a single
+``write()`` on an ``O_APPEND`` descriptor kept open, so recording a change
+costs no lock and no read.
+
+Readers index the log incrementally, as ``ChangeFeed`` readers do:
+``tasks.json.events.idx`` (memory-mapped) maps each task id to its newest
+event number, ``tasks.json.events.links`` holds for every event the number
+of the previous event of the same task, and a header says how many events
+are indexed. A task's history is then one lookup plus one hop per event;
+only events appended since the last ``history()`` call, by any process,
+are read to update the index. The status before a change is the status
+after the task's previous event. The walk stops at the task's newest
+``created`` event, so a reused id starts a fresh history.
+"""
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from ..constants import CODE_STATUSES, STATUS_CODES
+from ..models.transition import STATUS_UNKNOWN, Transition
+from ..utils import profiling
+from ..utils.time import micros_to_iso
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run without the file lock
+    fcntl = None
+
+# task id, time in epoch microseconds, status after (0 = deleted, else
+# STATUS_CODES + 1), 1 if the change created the task
+EVENT = struct.Struct("<qqBB")
+# previous event of the same task (event numbers start at 1; 0 = none)
+LINK = struct.Struct("<q")
+# events indexed so far, inode of the log they came from
+HEADER = struct.Struct("<qq")
+HEADER_SIZE = 16
+# newest event of the task (0 = none)
+SLOT = struct.Struct("<q")
+INITIAL_SLOTS = 1024
+
+# (task id, status after or None when deleted, time in epoch microseconds,
+# whether the change creates the task)
+Change = Tuple[int, Optional[str], int, bool]
+# (task id, time, status code after, created) as stored
+Event = Tuple[int, int, int, int]
+
+
+def events_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + ".events")
+
+
+def _encode(changes: Iterable[Change]) -> bytes:
+    return b"".join(
+        EVENT.pack(task_id, at, 0 if status is None else STATUS_CODES[status] + 1, created)
+        for task_id, status, at, created in changes
+    )
+
+
+def _transitions(events: List[Event]) -> List[Transition]:
+    """Transitions from one task's events, oldest first; changes to the
+    status the task already had are dropped."""
+    transitions = []
+    before: Optional[str] = STATUS_UNKNOWN
+    for task_id, at, code, created in events:
+        if created:
+            before = None
+        after = None if code == 0 else CODE_STATUSES[code - 1]
+        if after is not None and after == before:
+            continue
+        transitions.append(Transition(task_id, before, after, micros_to_iso(at)))
+        before = after
+    return transitions
+
+
+class EventStore:
+    """Transitions per task, in files or (``path=None``) in memory."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # in memory: events and their links, newest event per task
+        self._events: List[Event] = []
+        self._links: List[int] = []
+        self._slots: Dict[int, int] = {}
+        # on disk: kept open between calls
+        self._log_fd: Optional[int] = None
+        self._index_fd: Optional[int] = None
+        self._links_fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        if path is not None:
+            self.index_path = path.with_name(path.name + ".idx")
+            self.links_path = path.with_name(path.name + ".links")
+
+    # ---------- internals ----------
+    def _open_log(self) -> int:
+        fd = self._log_fd
+        if fd is not None and os.fstat(fd).st_nlink:
+            return fd
+        if fd is not None:
+            self.close()  # deleted under us
+        fd = self._log_fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.fstat(fd).st_size % EVENT.size:
+            # A crash tore the last event; drop it before appending after it
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                size = os.fstat(fd).st_size
+                os.ftruncate(fd, size - size % EVENT.size)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+        return fd
+
+    @contextmanager
+    def _index_locked(self) -> Iterator[None]:
+        if self._index_fd is None:
+            self._index_fd = os.open(self.index_path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._links_fd = os.open(self.links_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._index_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._index_fd, fcntl.LOCK_UN)
+
+    def _remap(self) -> None:
+        """Map the whole index file (it only ever grows)."""
+        size = os.fstat(self._index_fd).st_size
+        if self._map is not None:
+            if len(self._map) == size:
+                return
+            self._map.close()
+        self._map = mmap.mmap(self._index_fd, size) if size else None
+
+    def _grow(self, task_id: int) -> None:
+        need = HEADER_SIZE + (task_id + 1) * SLOT.size
+        if self._map is None or len(self._map) < need:
+            self._remap()
+        if self._map is None or len(self._map) < need:
+            current = len(self._map) if self._map is not None else 0
+            os.ftruncate(self._index_fd, max(need, 2 * current, HEADER_SIZE + INITIAL_SLOTS * SLOT.size))
+            self._remap()
+
+    def _slot(self, task_id: int) -> int:
+        at = HEADER_SIZE + task_id * SLOT.size
+        if self._map is None or len(self._map) < at + SLOT.size:
+            return 0
+        return SLOT.unpack_from(self._map, at)[0]
+
+    def _sync(self, log_fd: int) -> None:
+        """Index the events appended since the last call (index locked)."""
+        self._grow(0)
+        st = os.fstat(log_fd)
+        end = st.st_size // EVENT.size  # a torn last event is left out
+        indexed, inode = HEADER.unpack_from(self._map)
+        if indexed == end and inode == st.st_ino:
+            return
+        if indexed > end or inode != st.st_ino:
+            # log recreated: index it again from the start
+            # (zeroed, not shrunk, as other processes may have it mapped)
+            self._map[:] = bytes(len(self._map))
+            indexed = 0
+        data = os.pread(log_fd, (end - indexed) * EVENT.size, indexed * EVENT.size)
+        links = bytearray()
+        newest: Dict[int, int] = {}
+        written = None  # links left by an indexing pass that did not finish
+        for n, (task_id, _, _, _) in enumerate(EVENT.iter_unpack(data), start=indexed + 1):
+            previous = newest.get(task_id) or self._slot(task_id)
+            if previous >= n:
+                # slot already moved by the unfinished pass; its links are valid
+                if written is None:
+                    written = os.pread(self._links_fd, (end - indexed) * LINK.size, indexed * LINK.size)
+                previous = LINK.unpack_from(written, (n - indexed - 1) * LINK.size)[0]
+            links += LINK.pack(previous)
+            newest[task_id] = n
+        # links, then slots, then the header: a crash in between is redone
+        os.pwrite(self._links_fd, links, indexed * LINK.size)
+        for task_id, n in newest.items():
+            self._grow(task_id)
+            SLOT.pack_into(self._map, HEADER_SIZE + task_id * SLOT.size, n)
+        HEADER.pack_into(self._map, 0, end, st.st_ino)
+
+    def _chain(self, task_id: int) -> List[Event]:
+        """The task's events, newest first, back to its newest creation: an id
+        reused after a deletion does not inherit the deleted task's events."""
+        events = []
+        if self.path is None:
+            n = self._slots.get(task_id, 0)
+            while n:
+                events.append(self._events[n - 1])
+                if events[-1][3]:
+                    break
+                n = self._links[n - 1]
+            return events
+        n = self._slot(task_id)
+        while n:
+            events.append(EVENT.unpack(os.pread(self._log_fd, EVENT.size, (n - 1) * EVENT.size)))
+            if events[-1][3]:
+                break
+            n = LINK.unpack(os.pread(self._links_fd, LINK.size, (n - 1) * LINK.size))[0]
+        return events
+
+    # ---------- public API ----------
+    @profiling.timed("events.append")
+    def append(self, changes: Iterable[Change]) -> None:
+        """Record ``(task id, new status or None, epoch micros, created)`` changes."""
+        data = _encode(changes)
+        if not data:
+            return
+        with self._lock:
+            if self.path is None:
+                for event in EVENT.iter_unpack(data):
+                    self._events.append(event)
+                    self._links.append(self._slots.get(event[0], 0))
+                    self._slots[event[0]] = len(self._events)
+                return
+            # One write on an O_APPEND descriptor: concurrent appends never interleave
+            os.write(self._open_log(), data)
+
+    def history(self, task_id: int) -> List[Transition]:
+        """Transitions of ``task_id``, oldest first."""
+        with self._lock:
+            if self.path is not None:
+                if not self.path.exists():
+                    return []
+                log_fd = self._open_log()
+                with self._index_locked():
+                    self._sync(log_fd)
+            events = self._chain(task_id)
+        events.reverse()
+        return _transitions(events)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        for fd in (self._log_fd, self._index_fd, self._links_fd):
+            if fd is not None:
+                os.close(fd)
+        self._log_fd = self._index_fd = self._links_fd = None
+        self._map = None
@@ -0,0 +1,51 @@
+from pathlib import Path
+from typing import Optional
+
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+MMAP_SUFFIXES = {".rec"}
+SHARDED_SUFFIXES = {".shards"}
+
+BACKEND_JSON = "json"
+BACKEND_WAL = "wal"
+BACKEND_SQLITE = "sqlite"
+BACKEND_MMAP = "mmap"
+BACKEND_SHARDED = "sharded"
+BACKENDS = (BACKEND_JSON, BACKEND_WAL, BACKEND_SQLITE, BACKEND_MMAP, BACKEND_SHARDED)
+
+
+def backend_for(file_path: Path) -> str:
+    """Backend implied by the file extension (JSON unless .db/.sqlite, .rec or
+    a ``.shards`` directory)."""
+    if file_path.suffix in SQLITE_SUFFIXES:
+        return BACKEND_SQLITE
+    if file_path.suffix in MMAP_SUFFIXES:
+        return BACKEND_MMAP
+    if file_path.suffix in SHARDED_SUFFIXES:
+        return BACKEND_SHARDED
+    return BACKEND_JSON
+
+
+def open_storage(file_path: Path, backend: Optional[str] = None, file_format: Optional[str] = None):
+    """Open ``file_path`` with ``backend``, or pick one from the file extension.
+
+    ``file_format`` (see ``serializers.FORMATS``) applies to the JSON backend,
+    which otherwise also picks it from the extension (``.jsonl``, ``.tbin``).
+    """
+    if backend is None:
+        backend = backend_for(file_path)
+    if backend == BACKEND_SQLITE:
+        from .sqlite_storage import SqliteStorage
+        return SqliteStorage(file_path=file_path)
+    if backend == BACKEND_WAL:
+        from .wal_storage import WalStorage
+        return WalStorage(file_path=file_path)
+    if backend == BACKEND_MMAP:
+        from .mmap_storage import MmapStorage
+        return MmapStorage(file_path=file_path)
+    if backend == BACKEND_SHARDED:
+        from .sharded_storage import ShardedStorage
+        return ShardedStorage(file_path=file_path)
+    if backend == BACKEND_JSON:
+        from .json_storage import JsonStorage
+        return JsonStorage(file_path=file_path, file_format=file_format)
+    raise ValueError(f"Backend desconhecido: {backend}")
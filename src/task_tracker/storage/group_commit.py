@@ -0,0 +1,140 @@
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ..exceptions import ConcurrentModification
+from .cached_storage import CachedJsonStorage
+from .json_storage import DEFAULT_LOCK_TIMEOUT, DURABILITY_FLUSH, Signature, stat_signature
+
+DEFAULT_COMMIT_INTERVAL = 0.1
+DEFAULT_MAX_PENDING = 1000
+
+
+class GroupCommitStorage(CachedJsonStorage):
+    """``CachedJsonStorage`` that writes mutations to disk in groups.
+
+    A mutation is applied in memory and returns; the file is rewritten once
+    ``max_pending`` mutations have accumulated or ``interval`` seconds after
+    the first one, whichever comes first, and on ``flush()``/``close()``. A
+    burst of N ``set_status`` calls thus costs one rewrite (and one fsync
+    with ``durability``) instead of N.
+
+    The file lock is held from the first mutation of a group until its
+    commit, so other processes wait at most about ``interval`` and never
+    write in between. Until then they read the previous version, and a crash
+    loses the open group. Errors of a background commit are raised by the
+    next ``flush()``.
+    """
+
+    def __init__(
+        self,
+        file_path: Path | None = None,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+        durability: str = DURABILITY_FLUSH,
+        interval: float = DEFAULT_COMMIT_INTERVAL,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        file_format: Optional[str] = None,
+    ) -> None:
+        self.interval = interval
+        self.max_pending = max_pending
+        self.pending = 0
+        self.commits = 0
+        self._version = 0
+        self._timer: Optional[threading.Timer] = None
+        self._error: Optional[Exception] = None
+        super().__init__(file_path=file_path, lock_timeout=lock_timeout, durability=durability,
+                         file_format=file_format)
+
+    # ---------- locking ----------
+    def _acquire(self) -> None:
+        if self._lock_fd is None:  # otherwise still held by the open group
+            super()._acquire()
+
+    def _release(self) -> None:
+        if not self.pending:
+            super()._release()
+
+    # ---------- internals ----------
+    def _revalidate(self):
+        if self.pending:
+            # Memory is ahead of the file, and the lock keeps others out
+            self.hits += 1
+            return self._records
+        return super()._revalidate()
+
+    def _flush(self) -> None:
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self.pending += 1
+        self._version += 1
+        if self.pending >= self.max_pending:
+            self._commit()
+        elif self._timer is None:
+            # Not a daemon thread: the last group is still written at exit
+            self._timer = threading.Timer(self.interval, self._commit_in_background)
+            self._timer.start()
+
+    def _commit(self) -> None:
+        """Write the open group, if any (caller holds ``self._lock``)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self.pending:
+            return
+        try:
+            super()._flush()
+        except ConcurrentModification:
+            # Someone wrote without the lock; the group is dropped for their data
+            self._end_group()
+            raise
+        # On OSError the group stays open and the next mutation re-arms the timer
+        self.commits += 1
+        self._end_group()
+
+    def _end_group(self) -> None:
+        with self._thread_lock:
+            self.pending = 0
+            if self._lock_depth == 0:
+                super()._release()
+
+    def _commit_in_background(self) -> None:
+        with self._lock:
+            self._timer = None
+            try:
+                self._commit()
+            except Exception as e:
+                self._error = e
+
+    # ---------- public API ----------
+    def flush(self) -> None:
+        """Write the open group now; raises a pending background error."""
+        with self._lock:
+            error, self._error = self._error, None
+            self._commit()
+            if error is not None:
+                raise error
+
+    def close(self) -> None:
+        self.flush()
+
+    def signature(self) -> Tuple[Optional[Signature], int]:
+        """Also changes with mutations not yet written to the file."""
+        with self._lock:
+            return (stat_signature(self.file_path), self._version)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Like ``CachedJsonStorage.batch``; the whole batch counts as one
+        pending mutation. An open group is written first, so a failed batch
+        rolls back only its own changes."""
+        with self._lock:
+            if self._batch_depth == 0:
+                self._commit()
+            with super().batch():
+                yield
+
+    def save_all(self, tasks: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._commit()
+            super().save_all(tasks)
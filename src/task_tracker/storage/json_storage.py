@@ -1,39 +1,244 @@
 import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from ..exceptions import ConcurrentModification
+from ..utils import profiling
+from .serializers import serializer_for
+from .stats import TaskCounters
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run without the file lock
+    fcntl = None
 
 DEFAULT_FILE_NAME = "tasks.json"
+DEFAULT_LOCK_TIMEOUT = 10.0
+
+# How far a write goes before save_all()/flush() returns
+DURABILITY_NONE = "none"    # left to the OS page cache
+DURABILITY_FLUSH = "flush"  # file data fsynced before the rename: never a torn tasks.json
+DURABILITY_FSYNC = "fsync"  # directory fsynced too: the rename itself survives a power cut
+DURABILITIES = (DURABILITY_NONE, DURABILITY_FLUSH, DURABILITY_FSYNC)
+
+Signature = Tuple[int, int, int]
+
+
+def stat_signature(path: Path) -> Optional[Signature]:
+    """Cheap change detector for a file: (mtime_ns, size, inode)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
 
 class JsonStorage:
-    """JSON file persistence in current working directory."""
+    """JSON file persistence in current working directory.
+
+    Writers from any process serialize on an ``fcntl`` lock over
+    ``tasks.json.lock`` (see ``lock()``) and write through unique temp files.
+    ``save_all`` also checks that the file is still the version this instance
+    last read or wrote (its etag) and raises ``ConcurrentModification`` if not.
+
+    Every write also stores the counters of ``stats()`` in ``tasks.json.stats``,
+    tagged with the etag, so stats are read without parsing the tasks.
 
-    def __init__(self, file_path: Path | None = None) -> None:
+    ``durability`` (one of ``DURABILITIES``) picks how much of each write is
+    fsynced; the default keeps the historical no-fsync behaviour.
+
+    The on-disk format comes from ``file_format`` or the file extension (see
+    ``serializers.serializer_for``); plain ``.json`` stays indented JSON.
+    """
+
+    def __init__(
+        self,
+        file_path: Path | None = None,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+        durability: str = DURABILITY_NONE,
+        file_format: Optional[str] = None,
+    ) -> None:
+        if durability not in DURABILITIES:
+            raise ValueError(f"Durabilidade desconhecida: {durability}")
+        self.durability = durability
         self.file_path = file_path or Path.cwd() / DEFAULT_FILE_NAME
+        self.serializer = serializer_for(self.file_path, file_format)
+        self.lock_path = self.file_path.with_name(self.file_path.name + ".lock")
+        self.stats_path = self.file_path.with_name(self.file_path.name + ".stats")
+        self.lock_timeout = lock_timeout
+        self._etag: Optional[Signature] = None
+        self._lock_fd: Optional[int] = None
+        self._lock_depth = 0
+        self._thread_lock = threading.RLock()
         if not self.file_path.exists():
-            self._write_all([])
+            with self.lock():
+                if not self.file_path.exists():
+                    self._write_all([])
+
+    # ---------- locking ----------
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the cross-process write lock (re-entrant within this instance)."""
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                self._acquire()
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    self._release()
 
+    @profiling.timed("storage.lock_wait")
+    def _acquire(self) -> None:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            deadline = time.monotonic() + self.lock_timeout
+            delay = 0.001
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        os.close(fd)
+                        raise ConcurrentModification(
+                            f"Tempo esgotado aguardando o lock de {self.file_path}"
+                        ) from None
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.05)
+        self._lock_fd = fd
+
+    def _release(self) -> None:
+        fd, self._lock_fd = self._lock_fd, None
+        if fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    # ---------- internals ----------
     def _read_all(self) -> List[Dict[str, Any]]:
         try:
-            with self.file_path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
+            self._etag = stat_signature(self.file_path)
+            with profiling.phase("storage.parse"), self.file_path.open("rb") as f:
+                profiling.count("storage.bytes_read", self._etag[1] if self._etag else 0)
+                return self.serializer.load(f)
         except FileNotFoundError:
             # If removed meanwhile, recreate as empty list
             self._write_all([])
             return []
-        except json.JSONDecodeError:
+        except ValueError:
             # If file is corrupted, do not crash the CLI; start fresh
             return []
 
-    def _write_all(self, tasks: List[Dict[str, Any]]) -> None:
-        tmp = self.file_path.with_suffix(".tmp")
-        with tmp.open("w", encoding="utf-8") as f:
-            json.dump(tasks, f, ensure_ascii=False, indent=2)
-        tmp.replace(self.file_path)
+    def _write_tmp(self, tasks: List[Dict[str, Any]]) -> Path:
+        # Unique name per writer, in the same directory so replace() is atomic
+        fd, name = tempfile.mkstemp(
+            dir=self.file_path.parent, prefix=self.file_path.name + ".", suffix=".tmp"
+        )
+        tmp = Path(name)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                with profiling.phase("storage.serialize"):
+                    self.serializer.dump(tasks, f)
+                    f.flush()
+                if self.durability != DURABILITY_NONE:
+                    with profiling.phase("storage.fsync"):
+                        os.fsync(f.fileno())
+            os.chmod(tmp, 0o644)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return tmp
+
+    def _write_all(self, tasks: List[Dict[str, Any]], counters: Optional[TaskCounters] = None) -> None:
+        tmp = self._write_tmp(tasks)
+        # rename keeps inode, size and mtime, so this is the etag of our write
+        signature = stat_signature(tmp)
+        profiling.count("storage.bytes_written", signature[1] if signature else 0)
+        with profiling.phase("storage.replace"):
+            tmp.replace(self.file_path)
+            if self.durability == DURABILITY_FSYNC:
+                self._fsync_dir()
+        self._etag = signature
+        with profiling.phase("storage.stats"):
+            self._write_stats(signature, counters if counters is not None else TaskCounters(tasks))
+
+    def _fsync_dir(self) -> None:
+        fd = os.open(self.file_path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _write_stats(self, signature: Optional[Signature], counters: TaskCounters) -> None:
+        """Best effort: a missing or stale stats file only costs a recount."""
+        data = {"signature": signature, "stats": counters.to_dict()}
+        try:
+            fd, name = tempfile.mkstemp(
+                dir=self.stats_path.parent, prefix=self.stats_path.name + ".", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(name, self.stats_path)
+        except OSError:
+            pass
 
     # Public API for service
     def list(self) -> List[Dict[str, Any]]:
         return self._read_all()
 
+    def iter_records(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream records from the file, filtering each one as it is parsed.
+
+        Same tolerance as ``list()``: a missing file is recreated empty and a
+        corrupted file ends the stream instead of raising.
+        """
+        return profiling.timed_iter("storage.parse", self._iter_records(status))
+
+    def _iter_records(self, status: Optional[str]) -> Iterator[Dict[str, Any]]:
+        try:
+            self._etag = stat_signature(self.file_path)
+            with self.file_path.open("rb") as f:
+                for d in self.serializer.iter(f):
+                    if isinstance(d, dict) and (status is None or d.get("status") == status):
+                        yield d
+        except FileNotFoundError:
+            self._write_all([])
+        except ValueError:
+            return
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts from ``tasks.json.stats`` when it matches the file; otherwise
+        one streaming pass over the tasks, which also refreshes it."""
+        signature = stat_signature(self.file_path)
+        try:
+            with self.stats_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if signature is not None and tuple(data["signature"]) == signature:
+                return data["stats"]
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass
+        counters = TaskCounters(self.iter_records())
+        # Tagged with the signature seen before reading: if the file changed
+        # meanwhile the tag no longer matches and the next call recounts
+        self._write_stats(signature, counters)
+        return counters.to_dict()
+
+    def signature(self) -> Optional[Signature]:
+        """Changes whenever the file is rewritten, by any process."""
+        return stat_signature(self.file_path)
+
     def save_all(self, tasks: List[Dict[str, Any]]) -> None:
-        self._write_all(tasks)
+        with self.lock():
+            if self._etag is not None and stat_signature(self.file_path) != self._etag:
+                raise ConcurrentModification(
+                    f"{self.file_path} foi alterado por outro processo; tente novamente"
+                )
+            self._write_all(tasks)
@@ -0,0 +1,415 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ..constants import CODE_STATUSES, SORT_FIELDS, STATUS_CODES, STATUS_DONE, TIME_FIELDS
+from ..utils.time import EPOCH, iso_to_micros, micros_to_iso
+from .record_set import SortKey, range_keys, slice_keys
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run without the file lock
+    fcntl = None
+
+DEFAULT_FILE_NAME = "tasks.rec"
+
+MAGIC = b"TTR\x01"
+# magic, format version, slots in use (= highest id ever allocated), change counter
+HEADER = struct.Struct("<4sIqq")
+HEADER_SIZE = 64
+SLOTS_AT = 8
+CHANGES_AT = 16
+
+# id, status (0 = free slot, else STATUS_CODES + 1), createdAt and updatedAt in
+# epoch microseconds, description offset and length in the heap file
+RECORD = struct.Struct("<qBqqqI")
+STATUS_AT = 8
+CREATED_AT = 9
+UPDATED_AT = 17
+DESCRIPTION_AT = 25
+TIME = struct.Struct("<q")
+DESCRIPTION = struct.Struct("<qI")
+
+INITIAL_SLOTS = 1024
+# explicit ids may leave at most this many empty slots above the highest id
+# (a 37 MB gap), so a typo cannot grow the file to gigabytes
+MAX_ID_GAP = 1 << 20
+FETCH_SIZE = 500
+DAY_US = 86_400_000_000
+
+FIELDS = ("description", "status", "createdAt", "updatedAt")
+
+
+def _day(micros: int) -> str:
+    return (EPOCH + timedelta(microseconds=micros - micros % DAY_US)).date().isoformat()
+
+
+class MmapStorage:
+    """Fixed-width task records in a memory-mapped file, addressed by id.
+
+    Task ``id`` lives in slot ``id - 1`` of ``tasks.rec``, so ``get`` and
+    ``patch`` touch one 37-byte record: a status change or ``mark_done`` is
+    an in-place write of the status byte and ``updatedAt``. Descriptions are
+    appended to ``tasks.rec.heap`` and the record points at them. Timestamps
+    are stored as int64 epoch microseconds and read back in ``now_iso()``
+    form. ``iter(status)`` scans the status bytes as one strided slice.
+
+    Freed slots and replaced descriptions are not reused. Like SQLite's
+    AUTOINCREMENT, ids of deleted tasks are never handed out again.
+
+    Writers from any process take an ``fcntl`` lock on the record file and
+    readers take a shared one. A header counter changes on every mutation,
+    which makes ``signature()``. Writes are single in-place stores ordered
+    so that a record goes live (status byte) last. ``batch()`` only holds
+    the lock across its mutations: there is no rollback.
+    """
+
+    def __init__(self, file_path: Path | None = None) -> None:
+        self.file_path = file_path or Path.cwd() / DEFAULT_FILE_NAME
+        self.heap_path = self.file_path.with_name(self.file_path.name + ".heap")
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._fd = os.open(self.file_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._heap_fd = os.open(self.heap_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._mm: Optional[mmap.mmap] = None
+        self._heap_mm: Optional[mmap.mmap] = None
+        self._capacity = 0
+        with self._locked(exclusive=True):
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, HEADER_SIZE + INITIAL_SLOTS * RECORD.size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, 1, 0, 0), 0)
+            self._map()
+            magic, version, _, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != 1:
+            self.close()
+            raise ValueError(f"{self.file_path} não é um arquivo de tasks de registros fixos")
+
+    # ---------- locking ----------
+    @contextmanager
+    def _locked(self, exclusive: bool = False) -> Iterator[None]:
+        """Thread lock plus the cross-process file lock (re-entrant)."""
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                if self._mm is not None:
+                    self._sync()
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    # ---------- internals ----------
+    def _map(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mmap.mmap(self._fd, 0)
+        self._capacity = (len(self._mm) - HEADER_SIZE) // RECORD.size
+
+    def _sync(self) -> None:
+        # Another process may have grown the file past our mapping
+        if self._slots() > self._capacity:
+            self._map()
+
+    def _slots(self) -> int:
+        return TIME.unpack_from(self._mm, SLOTS_AT)[0]
+
+    def _touch(self) -> None:
+        TIME.pack_into(self._mm, CHANGES_AT, TIME.unpack_from(self._mm, CHANGES_AT)[0] + 1)
+
+    def _grow(self, slots: int) -> None:
+        capacity = max(slots, self._capacity * 2)
+        os.ftruncate(self._fd, HEADER_SIZE + capacity * RECORD.size)
+        self._map()
+
+    @staticmethod
+    def _offset(task_id: int) -> int:
+        return HEADER_SIZE + (task_id - 1) * RECORD.size
+
+    def _status_column(self) -> bytes:
+        """One status byte per slot, copied out of the records in one slice."""
+        start = HEADER_SIZE + STATUS_AT
+        return self._mm[start:start + self._slots() * RECORD.size:RECORD.size]
+
+    def _description(self, offset: int, length: int) -> str:
+        if self._heap_mm is None or offset + length > len(self._heap_mm):
+            if self._heap_mm is not None:
+                self._heap_mm.close()
+            self._heap_mm = mmap.mmap(self._heap_fd, 0, access=mmap.ACCESS_READ)
+        return self._heap_mm[offset:offset + length].decode("utf-8")
+
+    def _append_description(self, text: str) -> Tuple[int, int]:
+        data = str(text).encode("utf-8")
+        offset = os.lseek(self._heap_fd, 0, os.SEEK_END)
+        os.pwrite(self._heap_fd, data, offset)
+        return offset, len(data)
+
+    def _read(self, task_id: int) -> Optional[Dict[str, Any]]:
+        if not 0 < task_id <= self._slots():
+            return None
+        _, status, created, updated, offset, length = RECORD.unpack_from(self._mm, self._offset(task_id))
+        if not status:
+            return None
+        return {
+            "id": task_id,
+            "description": self._description(offset, length) if length else "",
+            "status": CODE_STATUSES[status - 1],
+            "createdAt": micros_to_iso(created),
+            "updatedAt": micros_to_iso(updated),
+        }
+
+    @staticmethod
+    def _status_byte(status: str) -> int:
+        try:
+            return STATUS_CODES[status] + 1
+        except KeyError:
+            raise ValueError(f"Status inválido: {status}") from None
+
+    def _ids(self, status: Optional[str]) -> List[int]:
+        column = self._status_column()
+        if status is None:
+            return [i + 1 for i, b in enumerate(column) if b]
+        wanted = bytes([self._status_byte(status)])
+        ids = []
+        i = column.find(wanted)
+        while i != -1:
+            ids.append(i + 1)
+            i = column.find(wanted, i + 1)
+        return ids
+
+    def _time_keys(self, status: Optional[str], field: str) -> List[SortKey]:
+        """Sorted ``(micros, id)`` keys read straight from the records (the
+        timestamps are never formatted, the descriptions never read)."""
+        wanted = None if status is None else self._status_byte(status)
+        column = 2 if field == "createdAt" else 3  # in RECORD
+        with self._locked():
+            data = self._mm[HEADER_SIZE:HEADER_SIZE + self._slots() * RECORD.size]
+        return sorted(
+            (r[column], r[0]) for r in RECORD.iter_unpack(data)
+            if r[1] and (wanted is None or r[1] == wanted)
+        )
+
+    def _read_many(self, keys: List[SortKey]) -> List[Dict[str, Any]]:
+        with self._locked():
+            records = [self._read(task_id) for _, task_id in keys]
+        return [d for d in records if d is not None]
+
+    def _stream(self, ids: List[int]) -> Iterator[Dict[str, Any]]:
+        # The lock is taken per chunk, so callers can print while scanning
+        for start in range(0, len(ids), FETCH_SIZE):
+            with self._locked():
+                records = [self._read(i) for i in ids[start:start + FETCH_SIZE]]
+            yield from (d for d in records if d is not None)
+
+    # ---------- TaskStorage ----------
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        with self._locked():
+            return self._read(task_id)
+
+    def insert(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        status = self._status_byte(task["status"])
+        created = iso_to_micros(task["createdAt"])
+        updated = iso_to_micros(task["updatedAt"])
+        with self._locked(exclusive=True):
+            slots = self._slots()
+            task_id = slots + 1 if task.get("id") is None else int(task["id"])
+            if task_id < 1 or task_id > slots + MAX_ID_GAP:
+                raise ValueError(f"Id inválido: {task_id} (maior id: {slots})")
+            if task_id <= slots and self._mm[self._offset(task_id) + STATUS_AT]:
+                raise ValueError(f"Task {task_id} já existe")
+            if task_id > self._capacity:
+                self._grow(task_id)
+            offset, length = self._append_description(task["description"])
+            at = self._offset(task_id)
+            RECORD.pack_into(self._mm, at, task_id, 0, created, updated, offset, length)
+            self._mm[at + STATUS_AT] = status  # goes live last
+            if task_id > slots:
+                TIME.pack_into(self._mm, SLOTS_AT, task_id)
+            self._touch()
+            return self._read(task_id)
+
+    def patch(self, task_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        unknown = set(fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Campos inválidos: {', '.join(sorted(unknown))}")
+        status = self._status_byte(fields["status"]) if "status" in fields else None
+        times = [(CREATED_AT, iso_to_micros(fields["createdAt"])) if "createdAt" in fields else None,
+                 (UPDATED_AT, iso_to_micros(fields["updatedAt"])) if "updatedAt" in fields else None]
+        with self._locked(exclusive=True):
+            if not 0 < task_id <= self._slots():
+                return None
+            at = self._offset(task_id)
+            if not self._mm[at + STATUS_AT]:
+                return None
+            if "description" in fields:
+                DESCRIPTION.pack_into(self._mm, at + DESCRIPTION_AT, *self._append_description(fields["description"]))
+            for change in times:
+                if change is not None:
+                    TIME.pack_into(self._mm, at + change[0], change[1])
+            if status is not None:
+                self._mm[at + STATUS_AT] = status
+            self._touch()
+            return self._read(task_id)
+
+    def remove(self, task_id: int) -> bool:
+        with self._locked(exclusive=True):
+            if not 0 < task_id <= self._slots():
+                return False
+            at = self._offset(task_id) + STATUS_AT
+            if not self._mm[at]:
+                return False
+            self._mm[at] = 0
+            self._touch()
+            return True
+
+    def iter(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with self._locked():
+            ids = self._ids(status)
+        return self._stream(ids)
+
+    def page(
+        self,
+        status: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[SortKey] = None,
+    ) -> List[Dict[str, Any]]:
+        """By id this walks the slots directly; timestamps sort their int64
+        column and only the page's records are read."""
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Campo de ordenação inválido: {sort_by}")
+        if sort_by != "id":
+            return self._read_many(slice_keys(self._time_keys(status, sort_by), descending, limit, after))
+        with self._locked():
+            ids = self._ids(status)
+            if descending:
+                ids.reverse()
+            if after is not None:
+                ids = [i for i in ids if (i < after[1] if descending else i > after[1])]
+            return [self._read(i) for i in ids[:limit]]
+
+    def between(
+        self,
+        field: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Tasks with ``since <= field < until`` (epoch microseconds), sorted by it."""
+        if field not in TIME_FIELDS:
+            raise ValueError(f"Campo de data inválido: {field}")
+        return self._read_many(range_keys(self._time_keys(status, field), since, until))
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts from one pass over the packed records (descriptions unread)."""
+        by_status = [0] * len(CODE_STATUSES)
+        created: Dict[int, int] = {}
+        completed: Dict[int, int] = {}
+        done = STATUS_CODES[STATUS_DONE] + 1
+        with self._locked():
+            data = self._mm[HEADER_SIZE:HEADER_SIZE + self._slots() * RECORD.size]
+        for _, status, created_us, updated_us, _, _ in RECORD.iter_unpack(data):
+            if not status:
+                continue
+            by_status[status - 1] += 1
+            day = created_us // DAY_US
+            created[day] = created.get(day, 0) + 1
+            if status == done:
+                day = updated_us // DAY_US
+                completed[day] = completed.get(day, 0) + 1
+        return {
+            "total": sum(by_status),
+            "by_status": dict(zip(CODE_STATUSES, by_status)),
+            "created_per_day": {_day(d * DAY_US): n for d, n in sorted(created.items())},
+            "completed_per_day": {_day(d * DAY_US): n for d, n in sorted(completed.items())},
+        }
+
+    def max_id(self) -> int:
+        """Highest id ever allocated, deleted or not (the header's slot count)."""
+        with self._locked():
+            return self._slots()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Hold the write lock across several mutations (no rollback)."""
+        with self._locked(exclusive=True):
+            yield
+
+    def signature(self) -> int:
+        """The header change counter, bumped by every mutation in any process."""
+        with self._locked():
+            return TIME.unpack_from(self._mm, CHANGES_AT)[0]
+
+    def flush(self) -> None:
+        """Force the records and the description heap to disk."""
+        with self._lock:
+            self._mm.flush()
+            os.fsync(self._heap_fd)
+
+    def close(self) -> None:
+        with self._lock:
+            for m in (self._mm, self._heap_mm):
+                if m is not None:
+                    m.close()
+            self._mm = self._heap_mm = None
+            for fd in (self._fd, self._heap_fd):
+                os.close(fd)
+            self._fd = self._heap_fd = -1
+
+    # Public API for service (legacy)
+    def list(self) -> List[Dict[str, Any]]:
+        return list(self.iter())
+
+    def save_all(self, tasks: List[Dict[str, Any]]) -> None:
+        """Replace every record (and the heap) with ``tasks``, keeping ids."""
+        with self._locked(exclusive=True):
+            self._mm[HEADER_SIZE:] = bytes(len(self._mm) - HEADER_SIZE)
+            TIME.pack_into(self._mm, SLOTS_AT, 0)
+            os.ftruncate(self._heap_fd, 0)
+            if self._heap_mm is not None:
+                self._heap_mm.close()
+                self._heap_mm = None
+            for d in tasks:
+                self.insert(d)
+            self._touch()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """``python -m task_tracker.storage.mmap_storage tasks.json tasks.rec``"""
+    from .serializers import serializer_for
+
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        print("Uso: python -m task_tracker.storage.mmap_storage <tasks.json> <tasks.rec>",
+              file=sys.stderr)
+        return 2
+    source = Path(argv[0])
+    with source.open("rb") as f:
+        tasks = serializer_for(source).load(f)
+    storage = MmapStorage(file_path=Path(argv[1]))
+    try:
+        if next(storage.iter(), None) is not None:
+            print(f"{argv[1]} já contém tasks; nada foi importado", file=sys.stderr)
+            return 1
+        with storage.batch():
+            for d in tasks:
+                storage.insert(d)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        storage.close()
+    print(f"{len(tasks)} tasks importadas para {argv[1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
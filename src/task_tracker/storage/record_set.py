@@ -0,0 +1,174 @@
+import bisect
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from ..utils.time import sortable_micros
+from .stats import TaskCounters
+
+SortKey = Tuple[Any, int]
+
+
+def sort_key(record: Dict[str, Any], field: str) -> SortKey:
+    """Keyset position of ``record`` when sorting by ``field`` (ties by id).
+
+    Timestamps sort as epoch microseconds, so differently written instants
+    (``Z``, other offsets) still compare by time.
+    """
+    task_id = int(record["id"])
+    if field == "id":
+        return (task_id, task_id)
+    return (sortable_micros(record[field]), task_id)
+
+
+def key_after(after: Optional[SortKey]) -> Optional[SortKey]:
+    """``after`` with an ISO timestamp value (as in keys and cursors made
+    before timestamps sorted as integers) turned into epoch microseconds."""
+    if after is not None and isinstance(after[0], str):
+        return (sortable_micros(after[0]), after[1])
+    return after
+
+
+def range_keys(keys: List[SortKey], since: Optional[int], until: Optional[int]) -> List[SortKey]:
+    """The sorted ``(micros, id)`` keys with ``since <= micros < until``."""
+    start = 0 if since is None else bisect.bisect_left(keys, (since,))
+    end = len(keys) if until is None else bisect.bisect_left(keys, (until,))
+    return keys[start:end]
+
+
+def slice_keys(
+    keys: List[SortKey], descending: bool, limit: Optional[int], after: Optional[SortKey]
+) -> List[SortKey]:
+    """The page of sorted ``keys`` that follows ``after`` in the given order."""
+    after = key_after(after)
+    if descending:
+        end = len(keys) if after is None else bisect.bisect_left(keys, after)
+        start = 0 if limit is None else max(0, end - limit)
+        return keys[start:end][::-1]
+    start = 0 if after is None else bisect.bisect_right(keys, after)
+    return keys[start:] if limit is None else keys[start:start + limit]
+
+
+class RecordSet:
+    """In-memory tasks keyed by id, shared by the in-memory backends.
+
+    Holds the records as stored (dicts); callers get copies so the set can
+    only change through ``put``/``pop``.
+
+    ``page()`` keeps a sorted list of ``(value, id)`` keys per (status, field)
+    it was asked for; each list is built on first use and then updated by
+    every ``put``/``pop``. Timestamps are parsed to epoch microseconds once,
+    when their list is built, so ``between()`` is two bisections.
+    ``stats()`` is served from ``TaskCounters`` kept the same way.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()) -> None:
+        self._records: Dict[int, Dict[str, Any]] = {}
+        self._max_id = 0
+        self._sorted: Dict[Tuple[Optional[str], str], List[SortKey]] = {}
+        self.counters = TaskCounters()
+        for d in records:
+            self.put(d)
+
+    def _reindex(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        for (status, field), keys in self._sorted.items():
+            if old is not None and (status is None or old["status"] == status):
+                del keys[bisect.bisect_left(keys, sort_key(old, field))]
+            if new is not None and (status is None or new["status"] == status):
+                bisect.insort(keys, sort_key(new, field))
+
+    def _sorted_keys(self, status: Optional[str], field: str) -> List[SortKey]:
+        keys = self._sorted.get((status, field))
+        if keys is None:
+            keys = sorted(
+                sort_key(d, field)
+                for d in self._records.values()
+                if status is None or d["status"] == status
+            )
+            self._sorted[(status, field)] = keys
+        return keys
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._records
+
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        d = self._records.get(task_id)
+        return dict(d) if d is not None else None
+
+    def put(self, record: Dict[str, Any]) -> None:
+        task_id = int(record["id"])
+        record = dict(record)
+        old = self._records.get(task_id)
+        self._records[task_id] = record
+        if old is not None:
+            self.counters.discard(old)
+        self.counters.add(record)
+        if self._sorted:
+            self._reindex(old, record)
+        if task_id > self._max_id:
+            self._max_id = task_id
+
+    def pop(self, task_id: int) -> Optional[Dict[str, Any]]:
+        d = self._records.pop(task_id, None)
+        if d is not None:
+            self.counters.discard(d)
+        if d is not None and self._sorted:
+            self._reindex(d, None)
+        if d is not None and task_id == self._max_id:
+            self._max_id = max(self._records, default=0)
+        return d
+
+    def insert(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a new record, allocating the next id when ``id`` is None."""
+        record = dict(task)
+        if record.get("id") is None:
+            record["id"] = self._max_id + 1
+        elif int(record["id"]) in self._records:
+            raise ValueError(f"Task {record['id']} já existe")
+        self.put(record)
+        return record
+
+    def patch(self, task_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        current = self._records.get(task_id)
+        if current is None:
+            return None
+        record = {**current, **fields}
+        self.put(record)
+        return record
+
+    def ids(self) -> List[int]:
+        return list(self._records)
+
+    def iter(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        for d in list(self._records.values()):
+            if status is None or d["status"] == status:
+                yield dict(d)
+
+    def page(
+        self,
+        status: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[SortKey] = None,
+    ) -> List[Dict[str, Any]]:
+        """Records sorted by ``sort_by`` (then id), starting after key ``after``."""
+        keys = self._sorted_keys(status, sort_by)
+        return [dict(self._records[task_id]) for _, task_id in slice_keys(keys, descending, limit, after)]
+
+    def between(
+        self,
+        field: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Records with ``since <= field < until`` (epoch microseconds), sorted by it."""
+        keys = self._sorted_keys(status, field)
+        return [dict(self._records[task_id]) for _, task_id in range_keys(keys, since, until)]
+
+    def stats(self) -> Dict[str, Any]:
+        return self.counters.to_dict()
+
+    def max_id(self) -> int:
+        return self._max_id
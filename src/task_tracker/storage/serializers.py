@@ -0,0 +1,156 @@
+"""On-disk formats of the task file, picked by file extension or by name.
+
+Every serializer works on binary files and exposes ``dump(records, f)``,
+``load(f)`` and ``iter(f)``. Malformed data raises ``ValueError`` (of which
+``json.JSONDecodeError`` is a subclass), which storages treat as corruption.
+"""
+import io
+import json
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+from .json_stream import iter_json_array
+
+FORMAT_JSON = "json"                  # indented, as written historically
+FORMAT_JSON_COMPACT = "json-compact"  # same JSON without whitespace
+FORMAT_JSONL = "jsonl"                # one record per line
+FORMAT_BINARY = "binary"              # length-prefixed struct records
+
+SUFFIXES = {".jsonl": FORMAT_JSONL, ".tbin": FORMAT_BINARY}
+
+Record = Dict[str, Any]
+
+
+class JsonSerializer:
+    """A JSON array of records; ``indent=None`` writes it compact."""
+
+    def __init__(self, name: str, indent: Optional[int]) -> None:
+        self.name = name
+        self.indent = indent
+        self.separators = None if indent is not None else (",", ":")
+
+    def dump(self, records: Iterable[Record], f: BinaryIO) -> None:
+        if self.indent is None:
+            # dumps() runs the C encoder in one shot; dump() writes chunk by chunk
+            f.write(json.dumps(list(records), ensure_ascii=False, separators=self.separators).encode("utf-8"))
+            return
+        text = io.TextIOWrapper(f, encoding="utf-8", write_through=False)
+        try:
+            json.dump(list(records), text, ensure_ascii=False, indent=self.indent)
+            text.flush()
+        finally:
+            text.detach()
+
+    def load(self, f: BinaryIO) -> List[Record]:
+        data = json.load(f)
+        return data if isinstance(data, list) else []
+
+    def iter(self, f: BinaryIO) -> Iterator[Record]:
+        text = io.TextIOWrapper(f, encoding="utf-8")
+        try:
+            yield from iter_json_array(text)
+        finally:
+            text.detach()
+
+
+class JsonLinesSerializer:
+    """One JSON object per line; a torn last line reads as corruption."""
+
+    name = FORMAT_JSONL
+
+    def dump(self, records: Iterable[Record], f: BinaryIO) -> None:
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        f.write("".join(dumps(d) + "\n" for d in records).encode("utf-8"))
+
+    def load(self, f: BinaryIO) -> List[Record]:
+        # Parsed as one array: a single loads() call instead of one per line
+        lines = [line for line in f.read().split(b"\n") if line.strip()]
+        return json.loads(b"[" + b",".join(lines) + b"]")
+
+    def iter(self, f: BinaryIO) -> Iterator[Record]:
+        loads = json.loads
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+
+class BinarySerializer:
+    """``MAGIC`` followed by one record per task.
+
+    Each record is a fixed header (id, then the byte lengths of description,
+    status, createdAt and updatedAt) followed by those UTF-8 strings. Only
+    the five task fields are stored.
+    """
+
+    name = FORMAT_BINARY
+    MAGIC = b"TTB\x01"
+    HEADER = struct.Struct("<qIBBB")
+
+    def dump(self, records: Iterable[Record], f: BinaryIO) -> None:
+        pack = self.HEADER.pack
+        chunks = [self.MAGIC]
+        for d in records:
+            description = d["description"].encode("utf-8")
+            status = d["status"].encode("utf-8")
+            created = d["createdAt"].encode("utf-8")
+            updated = d["updatedAt"].encode("utf-8")
+            try:
+                header = pack(int(d["id"]), len(description), len(status), len(created), len(updated))
+            except struct.error as e:
+                raise ValueError(f"Task {d['id']} não cabe no formato binário: {e}") from e
+            chunks += (header, description, status, created, updated)
+        f.write(b"".join(chunks))
+
+    def load(self, f: BinaryIO) -> List[Record]:
+        data = f.read()
+        if data[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError("Arquivo binário de tasks inválido")
+        unpack_from = self.HEADER.unpack_from
+        size = self.HEADER.size
+        pos = len(self.MAGIC)
+        end = len(data)
+        records = []
+        append = records.append
+        try:
+            while pos < end:
+                task_id, n_desc, n_status, n_created, n_updated = unpack_from(data, pos)
+                start = pos + size
+                a = start + n_desc
+                b = a + n_status
+                c = b + n_created
+                pos = c + n_updated
+                if pos > end:
+                    raise ValueError("Registro truncado no arquivo binário de tasks")
+                append({
+                    "id": task_id,
+                    "description": data[start:a].decode("utf-8"),
+                    "status": data[a:b].decode("utf-8"),
+                    "createdAt": data[b:c].decode("utf-8"),
+                    "updatedAt": data[c:pos].decode("utf-8"),
+                })
+        except struct.error as e:
+            raise ValueError(f"Registro truncado no arquivo binário de tasks: {e}") from e
+        return records
+
+    def iter(self, f: BinaryIO) -> Iterator[Record]:
+        return iter(self.load(f))
+
+
+SERIALIZERS = {
+    FORMAT_JSON: JsonSerializer(FORMAT_JSON, indent=2),
+    FORMAT_JSON_COMPACT: JsonSerializer(FORMAT_JSON_COMPACT, indent=None),
+    FORMAT_JSONL: JsonLinesSerializer(),
+    FORMAT_BINARY: BinarySerializer(),
+}
+FORMATS = tuple(SERIALIZERS)
+
+
+def serializer_for(path: Path, name: Optional[str] = None):
+    """The serializer called ``name``, else the one for ``path``'s extension
+    (``.jsonl``, ``.tbin``), else indented JSON."""
+    if name is None:
+        name = SUFFIXES.get(path.suffix, FORMAT_JSON)
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f"Formato desconhecido: {name}") from None
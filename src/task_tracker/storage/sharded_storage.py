@@ -0,0 +1,404 @@
+import bisect
+import heapq
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from .cached_storage import CachedJsonStorage
+from .json_storage import DEFAULT_LOCK_TIMEOUT, Signature, stat_signature
+from .record_set import SortKey, sort_key
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run without the file lock
+    fcntl = None
+
+DEFAULT_DIR_NAME = "tasks.shards"
+MANIFEST_NAME = "manifest.json"
+DEFAULT_SHARD_SIZE = 10_000
+
+T = TypeVar("T")
+
+
+def _shard_name(number: int) -> str:
+    return f"shard-{number:04d}.json"
+
+
+def _shard_number(name: str) -> int:
+    return int(name[len("shard-"):-len(".json")])
+
+
+def _merge_counts(total: Dict[str, int], part: Dict[str, int]) -> None:
+    for key, n in part.items():
+        total[key] = total.get(key, 0) + n
+
+
+class ShardedStorage:
+    """Tasks partitioned by id range across JSON files in a directory.
+
+    ``manifest.json`` lists the shards in id order; shard ``i`` owns the ids
+    from its ``start`` up to the next shard's. ``get``/``patch``/``remove``
+    touch only the owning shard (a ``CachedJsonStorage`` with its own lock),
+    so a write rewrites at most ``shard_size`` records instead of the whole
+    tracker. New ids are allocated in the last shard.
+
+    ``iter``, ``page`` and ``stats`` run on every shard in a thread pool and
+    merge the results in id (or page) order. A shard that grows past
+    ``shard_size`` records is split in two at its median id; ``rebalance()``
+    also merges neighbours that shrank to a quarter of it.
+
+    Splits write the new shard first, then the manifest, then trim the old
+    shard, all under the manifest lock. Records outside a shard's range are
+    ignored, so a crash in between leaves a stale copy, never a loss.
+    Writers re-read the manifest after locking their shard and retry if a
+    split in another process moved the id.
+    """
+
+    def __init__(
+        self,
+        file_path: Path | None = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+        workers: Optional[int] = None,
+    ) -> None:
+        if shard_size < 2:
+            raise ValueError("shard_size deve ser pelo menos 2")
+        self.file_path = file_path or Path.cwd() / DEFAULT_DIR_NAME
+        self.file_path.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.file_path / MANIFEST_NAME
+        self.lock_path = self.file_path / (MANIFEST_NAME + ".lock")
+        self.shard_size = shard_size
+        self.lock_timeout = lock_timeout
+        self.splits = 0
+        self._lock = threading.RLock()
+        self._open: Dict[str, CachedJsonStorage] = {}
+        self._entries: List[Dict[str, Any]] = []
+        self._starts: List[int] = []
+        self._shards: List[CachedJsonStorage] = []
+        self._signature: Optional[Signature] = None
+        self._batch_depth = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers or min(8, os.cpu_count() or 1), thread_name_prefix="shard"
+        )
+        with self._manifest_lock():
+            if not self.manifest_path.exists():
+                self._write_manifest([{"start": 1, "file": _shard_name(1)}])
+            self._load_manifest()
+
+    # ---------- manifest ----------
+    @contextmanager
+    def _manifest_lock(self) -> Iterator[None]:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # also releases the flock
+
+    def _write_manifest(self, entries: List[Dict[str, Any]]) -> None:
+        tmp = self.manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        tmp.write_text(json.dumps({"version": 1, "shards": entries}, indent=2), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def _load_manifest(self) -> None:
+        signature = stat_signature(self.manifest_path)
+        data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        self._entries = data["shards"]
+        self._starts = [int(e["start"]) for e in self._entries]
+        self._shards = [self._shard(e["file"]) for e in self._entries]
+        self._signature = signature
+
+    def _refresh(self) -> bool:
+        """Reload the manifest if another process changed it."""
+        if stat_signature(self.manifest_path) == self._signature:
+            return False
+        self._load_manifest()
+        return True
+
+    def _shard(self, name: str) -> CachedJsonStorage:
+        storage = self._open.get(name)
+        if storage is None:
+            storage = CachedJsonStorage(file_path=self.file_path / name, lock_timeout=self.lock_timeout)
+            self._open[name] = storage
+        return storage
+
+    # ---------- routing ----------
+    def _index(self, task_id: int) -> int:
+        return max(0, bisect.bisect_right(self._starts, task_id) - 1)
+
+    def _range(self, i: int) -> Tuple[int, Optional[int]]:
+        end = self._starts[i + 1] if i + 1 < len(self._starts) else None
+        return self._starts[i], end
+
+    def _routed(self, task_id: int, fn: Callable[[CachedJsonStorage], T]) -> T:
+        """Run ``fn`` on the shard owning ``task_id`` while holding its lock."""
+        with self._lock:
+            while True:
+                self._refresh()
+                shard = self._shards[self._index(task_id)]
+                with shard.lock():
+                    # A split may have moved the id while we waited for the lock
+                    if self._refresh() and self._shards[self._index(task_id)] is not shard:
+                        continue
+                    result = fn(shard)
+                break
+        self._maybe_split(shard)
+        return result
+
+    @staticmethod
+    def _owned(bounds: Tuple[int, Optional[int]], records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        start, end = bounds
+        return [d for d in records if d["id"] >= start and (end is None or d["id"] < end)]
+
+    def _owned_page(
+        self,
+        bounds: Tuple[int, Optional[int]],
+        shard: CachedJsonStorage,
+        status: Optional[str],
+        sort_by: str,
+        descending: bool,
+        limit: Optional[int],
+        after: Optional[SortKey],
+    ) -> List[Dict[str, Any]]:
+        """Up to ``limit`` records of the shard's page that it owns: stale
+        copies are dropped before counting, fetching more until full."""
+        if limit is None:
+            return self._owned(bounds, shard.page(status, sort_by, descending, None, after))
+        owned: List[Dict[str, Any]] = []
+        while len(owned) < limit:
+            chunk = shard.page(status, sort_by, descending, limit, after)
+            owned.extend(self._owned(bounds, chunk))
+            if len(chunk) < limit:
+                break
+            after = sort_key(chunk[-1], sort_by)
+        return owned[:limit]
+
+    def _fan_out(self, fn: Callable[[Tuple[int, Optional[int]], CachedJsonStorage], T]) -> List[T]:
+        """``fn(bounds, shard)`` for every shard, in parallel, results in shard order."""
+        with self._lock:
+            self._refresh()
+            shards = [(self._range(i), shard) for i, shard in enumerate(self._shards)]
+        if len(shards) == 1 or self._batch_depth:
+            # Inside a batch this thread holds the shard locks the pool would wait on
+            return [fn(bounds, shard) for bounds, shard in shards]
+        return list(self._pool.map(lambda item: fn(*item), shards))
+
+    # ---------- splitting ----------
+    def _maybe_split(self, shard: CachedJsonStorage) -> None:
+        if self._batch_depth == 0 and shard.cache_info()["size"] > self.shard_size:
+            self.rebalance()
+
+    def _split(self, i: int) -> bool:
+        """Move the upper half of shard ``i`` to a new shard (manifest locked)."""
+        shard = self._shards[i]
+        with shard.lock():
+            records = sorted(self._owned(self._range(i), shard.list()), key=lambda d: d["id"])
+            if len(records) <= self.shard_size:
+                return False
+            middle = len(records) // 2
+            number = max(_shard_number(e["file"]) for e in self._entries) + 1
+            upper = self._shard(_shard_name(number))
+            upper.save_all(records[middle:])
+            entries = list(self._entries)
+            entries.insert(i + 1, {"start": records[middle]["id"], "file": _shard_name(number)})
+            self._write_manifest(entries)
+            shard.save_all(records[:middle])
+        self.splits += 1
+        self._load_manifest()
+        return True
+
+    def _merge(self, i: int) -> bool:
+        """Fold shard ``i + 1`` into shard ``i`` when both are small (manifest locked)."""
+        left, right = self._shards[i], self._shards[i + 1]
+        with left.lock(), right.lock():
+            lower = self._owned(self._range(i), left.list())
+            upper = self._owned(self._range(i + 1), right.list())
+            if len(lower) + len(upper) > self.shard_size // 4:
+                return False
+            left.save_all(lower + upper)
+            entries = list(self._entries)
+            removed = entries.pop(i + 1)
+            self._write_manifest(entries)
+        self._open.pop(removed["file"], None)
+        (self.file_path / removed["file"]).unlink(missing_ok=True)
+        self._load_manifest()
+        return True
+
+    def rebalance(self) -> None:
+        """Split shards above ``shard_size`` and merge small neighbours."""
+        with self._lock, self._manifest_lock():
+            self._refresh()
+            i = 0
+            while i < len(self._shards):
+                if not self._split(i):
+                    i += 1
+            i = 0
+            while i + 1 < len(self._shards):
+                if not self._merge(i):
+                    i += 1
+
+    def shard_sizes(self) -> List[int]:
+        return self._fan_out(lambda bounds, shard: len(self._owned(bounds, shard.list())))
+
+    # ---------- TaskStorage ----------
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return self._shards[self._index(task_id)].get(task_id)
+
+    def insert(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        if task.get("id") is not None:
+            return self._routed(int(task["id"]), lambda shard: shard.insert(task))
+        with self._lock:
+            while True:
+                self._refresh()
+                shard, start = self._shards[-1], self._starts[-1]
+                with shard.lock():
+                    if self._refresh() and self._shards[-1] is not shard:
+                        continue
+                    # Ids below ``start`` belong to earlier shards, even when this one is empty
+                    task_id = max(start - 1, shard.max_id()) + 1
+                    record = shard.insert({**task, "id": task_id})
+                break
+        self._maybe_split(shard)
+        return record
+
+    def patch(self, task_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self._routed(task_id, lambda shard: shard.patch(task_id, fields))
+
+    def remove(self, task_id: int) -> bool:
+        return self._routed(task_id, lambda shard: shard.remove(task_id))
+
+    def iter(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        chunks = self._fan_out(lambda bounds, shard: self._owned(bounds, list(shard.iter(status))))
+        return (d for chunk in chunks for d in chunk)
+
+    def page(
+        self,
+        status: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[SortKey] = None,
+    ) -> List[Dict[str, Any]]:
+        pages = self._fan_out(
+            lambda bounds, shard: self._owned_page(bounds, shard, status, sort_by, descending, limit, after)
+        )
+        merged = heapq.merge(*pages, key=lambda d: sort_key(d, sort_by), reverse=descending)
+        return list(islice(merged, limit))
+
+    def between(
+        self,
+        field: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        parts = self._fan_out(
+            lambda bounds, shard: self._owned(bounds, shard.between(field, since, until, status))
+        )
+        return list(heapq.merge(*parts, key=lambda d: sort_key(d, field)))
+
+    def stats(self) -> Dict[str, Any]:
+        total: Dict[str, Any] = {"total": 0, "by_status": {}, "created_per_day": {}, "completed_per_day": {}}
+        for part in self._fan_out(lambda bounds, shard: shard.stats()):
+            total["total"] += part["total"]
+            for key in ("by_status", "created_per_day", "completed_per_day"):
+                _merge_counts(total[key], part[key])
+        for key in ("created_per_day", "completed_per_day"):
+            total[key] = dict(sorted(total[key].items()))
+        return total
+
+    def max_id(self) -> int:
+        with self._lock:
+            self._refresh()
+            for shard in reversed(self._shards):
+                task_id = shard.max_id()
+                if task_id:
+                    return task_id
+            return 0
+
+    # ---------- optional protocol ----------
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Lock every shard and write each touched shard once at the end.
+
+        A failing batch rolls back every shard. Splits wait for the batch.
+        """
+        with self._lock:
+            with self._manifest_lock():
+                self._refresh()
+                shards = list(self._shards)
+            with ExitStack() as stack:
+                for shard in shards:
+                    stack.enter_context(shard.batch())
+                self._batch_depth += 1
+                try:
+                    yield
+                finally:
+                    self._batch_depth -= 1
+            if self._batch_depth == 0 and any(
+                shard.cache_info()["size"] > self.shard_size for shard in shards
+            ):
+                self.rebalance()
+
+    def signature(self) -> Tuple[Optional[Signature], Tuple[Any, ...]]:
+        with self._lock:
+            self._refresh()
+            return (self._signature, tuple(shard.signature() for shard in self._shards))
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    # Public API for service
+    def list(self) -> List[Dict[str, Any]]:
+        return list(self.iter())
+
+    def save_all(self, tasks: List[Dict[str, Any]]) -> None:
+        """Replace every task, then split shards that came out too large."""
+        with self._lock:
+            with self._manifest_lock():
+                self._refresh()
+                parts: List[List[Dict[str, Any]]] = [[] for _ in self._shards]
+                for d in tasks:
+                    parts[self._index(int(d["id"]))].append(d)
+                for shard, part in zip(self._shards, parts):
+                    shard.save_all(part)
+            if any(len(part) > self.shard_size for part in parts):
+                self.rebalance()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """``python -m task_tracker.storage.sharded_storage tasks.json tasks.shards``"""
+    from .serializers import serializer_for
+
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) not in (2, 3):
+        print("Uso: python -m task_tracker.storage.sharded_storage <tasks.json> <diretório> [tamanho]",
+              file=sys.stderr)
+        return 2
+    source = Path(argv[0])
+    with source.open("rb") as f:
+        tasks = serializer_for(source).load(f)
+    shard_size = int(argv[2]) if len(argv) == 3 else DEFAULT_SHARD_SIZE
+    storage = ShardedStorage(file_path=Path(argv[1]), shard_size=shard_size)
+    try:
+        if storage.max_id():
+            print(f"{argv[1]} já contém tasks; nada foi importado", file=sys.stderr)
+            return 1
+        storage.save_all(tasks)
+        shards = len(storage.shard_sizes())
+    finally:
+        storage.close()
+    print(f"{len(tasks)} tasks importadas para {argv[1]} em {shards} shards")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
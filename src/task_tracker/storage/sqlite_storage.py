@@ -0,0 +1,407 @@
+import json
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from ..constants import CODE_STATUSES, SORT_FIELDS, TIME_FIELDS
+from ..utils.time import sortable_micros
+from .record_set import key_after
+
+DEFAULT_FILE_NAME = "tasks.db"
+
+FETCH_SIZE = 500
+
+COLUMNS = ("id", "description", "status", "createdAt", "updatedAt")
+
+# Each timestamp is also stored as epoch microseconds (sortable_micros), so
+# instants written with other offsets or ``Z`` still sort and filter by time
+TIME_COLUMNS = {"createdAt": "createdUs", "updatedAt": "updatedUs"}
+
+INSERT_SQL = (
+    "INSERT INTO tasks (id, description, status, createdAt, updatedAt, createdUs, updatedUs) "
+    "VALUES (:id, :description, :status, :createdAt, :updatedAt, :createdUs, :updatedUs)"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    createdAt TEXT NOT NULL,
+    updatedAt TEXT NOT NULL,
+    createdUs INTEGER NOT NULL DEFAULT 0,
+    updatedUs INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+INDEX_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_updatedUs ON tasks(updatedUs);
+CREATE INDEX IF NOT EXISTS idx_tasks_createdUs ON tasks(createdUs);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_createdUs ON tasks(status, createdUs);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_updatedUs ON tasks(status, updatedUs);
+"""
+
+# Databases created before the micros columns indexed the text instead
+OLD_INDEXES = ("idx_tasks_updatedAt", "idx_tasks_createdAt",
+               "idx_tasks_status_createdAt", "idx_tasks_status_updatedAt")
+
+
+def _with_micros(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Row parameters: ``record`` plus the micros of the timestamps it has."""
+    row = dict(record)
+    for field, column in TIME_COLUMNS.items():
+        if field in record:
+            row[column] = sortable_micros(record[field])
+    return row
+
+# Counters behind stats(), kept by triggers; same definitions as TaskCounters.
+# Rows are decremented, never deleted, so an empty task_counts means the
+# tables are new and get backfilled from existing tasks (once, atomically).
+STATS_SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS task_counts (
+    status TEXT PRIMARY KEY,
+    n INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_days (
+    kind TEXT NOT NULL,
+    day TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (kind, day)
+);
+INSERT INTO task_days
+    SELECT 'created', substr(createdAt, 1, 10), COUNT(*) FROM tasks
+    WHERE NOT EXISTS (SELECT 1 FROM task_counts) GROUP BY 2;
+INSERT INTO task_days
+    SELECT 'completed', substr(updatedAt, 1, 10), COUNT(*) FROM tasks
+    WHERE status = 'done' AND NOT EXISTS (SELECT 1 FROM task_counts) GROUP BY 2;
+INSERT INTO task_counts
+    SELECT status, COUNT(*) FROM tasks
+    WHERE NOT EXISTS (SELECT 1 FROM task_counts) GROUP BY status;
+CREATE TRIGGER IF NOT EXISTS tasks_stats_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO task_counts VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET n = n + 1;
+    INSERT INTO task_days VALUES ('created', substr(NEW.createdAt, 1, 10), 1)
+        ON CONFLICT (kind, day) DO UPDATE SET n = n + 1;
+    INSERT INTO task_days SELECT 'completed', substr(NEW.updatedAt, 1, 10), 1
+        WHERE NEW.status = 'done'
+        ON CONFLICT (kind, day) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_stats_delete AFTER DELETE ON tasks BEGIN
+    UPDATE task_counts SET n = n - 1 WHERE status = OLD.status;
+    UPDATE task_days SET n = n - 1
+        WHERE kind = 'created' AND day = substr(OLD.createdAt, 1, 10);
+    UPDATE task_days SET n = n - 1
+        WHERE OLD.status = 'done' AND kind = 'completed' AND day = substr(OLD.updatedAt, 1, 10);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_stats_update AFTER UPDATE OF status, createdAt, updatedAt ON tasks BEGIN
+    UPDATE task_counts SET n = n - 1 WHERE status = OLD.status;
+    UPDATE task_days SET n = n - 1
+        WHERE kind = 'created' AND day = substr(OLD.createdAt, 1, 10);
+    UPDATE task_days SET n = n - 1
+        WHERE OLD.status = 'done' AND kind = 'completed' AND day = substr(OLD.updatedAt, 1, 10);
+    INSERT INTO task_counts VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET n = n + 1;
+    INSERT INTO task_days VALUES ('created', substr(NEW.createdAt, 1, 10), 1)
+        ON CONFLICT (kind, day) DO UPDATE SET n = n + 1;
+    INSERT INTO task_days SELECT 'completed', substr(NEW.updatedAt, 1, 10), 1
+        WHERE NEW.status = 'done'
+        ON CONFLICT (kind, day) DO UPDATE SET n = n + 1;
+END;
+COMMIT;
+"""
+
+
+class SqliteStorage:
+    """SQLite persistence (WAL mode) implementing ``TaskStorage`` natively.
+
+    ``id`` is an AUTOINCREMENT primary key, so ids are allocated by SQLite and
+    never reused. ``status`` and the timestamps are indexed, the latter
+    through the integer ``TIME_COLUMNS`` that ``page()`` and ``between()``
+    sort and filter on; the ISO text is returned as it was written.
+    """
+
+    def __init__(self, file_path: Path | None = None) -> None:
+        self.file_path = file_path or Path.cwd() / DEFAULT_FILE_NAME
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.file_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._add_time_columns()
+        self._conn.executescript(INDEX_SCHEMA)
+        self._conn.executescript(STATS_SCHEMA)
+        self._batch_depth = 0
+
+    # ---------- internals ----------
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {c: row[c] for c in COLUMNS}
+
+    def _time_columns_missing(self) -> List[str]:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        return [c for c in TIME_COLUMNS.values() if c not in columns]
+
+    def _add_time_columns(self) -> None:
+        """Add and backfill the micros columns of an older database (once,
+        atomically, even with several processes opening it)."""
+        if not self._time_columns_missing():
+            return
+        self._conn.create_function("sortable_micros", 1, sortable_micros, deterministic=True)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            missing = self._time_columns_missing()
+            for field, column in TIME_COLUMNS.items():
+                if column in missing:
+                    self._conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+                    self._conn.execute(f"UPDATE tasks SET {column} = sortable_micros({field})")
+            for name in OLD_INDEXES:
+                self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Commit per call, unless a ``batch()`` is already open."""
+        with self._lock:
+            if self._batch_depth:
+                yield
+            else:
+                with self._conn:
+                    yield
+
+    def _insert_rows(self, tasks: List[Dict[str, Any]]) -> None:
+        self._conn.executemany(INSERT_SQL, [_with_micros({c: d[c] for c in COLUMNS}) for d in tasks])
+
+    # ---------- TaskStorage ----------
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def insert(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        record = {c: task.get(c) for c in COLUMNS}
+        with self._transaction():
+            try:
+                cur = self._conn.execute(INSERT_SQL, _with_micros(record))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Task {record['id']} já existe") from None
+        record["id"] = cur.lastrowid
+        return record
+
+    def patch(self, task_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        unknown = set(fields) - set(COLUMNS[1:])
+        if unknown:
+            raise ValueError(f"Campos inválidos: {', '.join(sorted(unknown))}")
+        row = _with_micros(fields)
+        assignments = ", ".join(f"{c} = :{c}" for c in row)
+        with self._transaction():
+            cur = self._conn.execute(
+                f"UPDATE tasks SET {assignments} WHERE id = :_id", {**row, "_id": task_id}
+            )
+            if cur.rowcount == 0:
+                return None
+            row = self._conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._to_dict(row)
+
+    def remove(self, task_id: int) -> bool:
+        with self._transaction():
+            cur = self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        return cur.rowcount > 0
+
+    def iter(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            if status is None:
+                cur = self._conn.execute("SELECT * FROM tasks ORDER BY id")
+            else:
+                cur = self._conn.execute(
+                    "SELECT * FROM tasks WHERE status = ? ORDER BY id", (status,)
+                )
+        return self._stream(cur)
+
+    def _stream(self, cur: sqlite3.Cursor) -> Iterator[Dict[str, Any]]:
+        # Rows are fetched in chunks, so callers can print before the query ends
+        while True:
+            with self._lock:
+                rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            for r in rows:
+                yield self._to_dict(r)
+
+    def page(
+        self,
+        status: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[Any, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Keyset page served by the (status, field) indexes; timestamps sort
+        by their micros column, like the epoch microseconds in ``after``."""
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Campo de ordenação inválido: {sort_by}")
+        column = TIME_COLUMNS.get(sort_by, sort_by)
+        where, params = [], []
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        if after is not None:
+            where.append(f"({column}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend(key_after(after))
+        direction = "DESC" if descending else "ASC"
+        sql = "SELECT * FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {column} {direction}, id {direction}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def between(
+        self,
+        field: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Tasks with ``since <= field < until`` (epoch microseconds), served by
+        the same indexes as ``page()``."""
+        if field not in TIME_FIELDS:
+            raise ValueError(f"Campo de data inválido: {field}")
+        column = TIME_COLUMNS[field]
+        where, params = [], []
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        if since is not None:
+            where.append(f"{column} >= ?")
+            params.append(since)
+        if until is not None:
+            where.append(f"{column} < ?")
+            params.append(until)
+        sql = "SELECT * FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {column}, id"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Read the trigger-maintained counters (cost grows with days, not tasks)."""
+        with self._lock:
+            counts = self._conn.execute("SELECT status, n FROM task_counts WHERE n > 0").fetchall()
+            days = self._conn.execute(
+                "SELECT kind, day, n FROM task_days WHERE n > 0 ORDER BY day"
+            ).fetchall()
+        by_status = {s: 0 for s in CODE_STATUSES}
+        by_status.update((status, n) for status, n in counts)
+        return {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "created_per_day": {day: n for kind, day, n in days if kind == "created"},
+            "completed_per_day": {day: n for kind, day, n in days if kind == "completed"},
+        }
+
+    def max_id(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(id) FROM tasks").fetchone()
+        return row[0] or 0
+
+    # Public API for service (legacy)
+    def list(self) -> List[Dict[str, Any]]:
+        return list(self.iter())
+
+    def save_all(self, tasks: List[Dict[str, Any]]) -> None:
+        with self._transaction():
+            self._conn.execute("DELETE FROM tasks")
+            self._insert_rows(tasks)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Run every mutation inside one SQLite transaction."""
+        with self._lock:
+            if self._batch_depth:
+                self._batch_depth += 1
+                try:
+                    yield
+                finally:
+                    self._batch_depth -= 1
+                return
+            with self._conn:
+                self._batch_depth = 1
+                try:
+                    yield
+                finally:
+                    self._batch_depth = 0
+
+    # ---------- maintenance ----------
+    def import_json(self, json_path: Path) -> int:
+        """One-shot import of a ``tasks.json`` file, keeping its ids.
+
+        Nothing is imported if any id already exists in the database.
+        """
+        with Path(json_path).open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        tasks = data if isinstance(data, list) else []
+        with self._transaction():
+            ids = [int(d["id"]) for d in tasks]
+            existing = [
+                row[0]
+                for i in range(0, len(ids), 500)
+                for row in self._conn.execute(
+                    f"SELECT id FROM tasks WHERE id IN ({','.join('?' * len(ids[i:i + 500]))})",
+                    ids[i:i + 500],
+                )
+            ]
+            if existing:
+                shown = ", ".join(str(i) for i in sorted(existing)[:10])
+                raise ValueError(
+                    f"{len(existing)} ids já existem no banco (ex.: {shown}); nada foi importado"
+                )
+            self._insert_rows(tasks)
+        return len(tasks)
+
+    def signature(self) -> Tuple[int, int]:
+        """Changes on every commit: ``data_version`` covers other connections,
+        ``total_changes`` this one."""
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return (version, self._conn.total_changes)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """``python -m task_tracker.storage.sqlite_storage tasks.json tasks.db``"""
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        print("Uso: python -m task_tracker.storage.sqlite_storage <tasks.json> <tasks.db>",
+              file=sys.stderr)
+        return 2
+    storage = SqliteStorage(file_path=Path(argv[1]))
+    try:
+        count = storage.import_json(Path(argv[0]))
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        storage.close()
+    print(f"{count} tasks importadas para {argv[1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
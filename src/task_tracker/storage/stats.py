@@ -0,0 +1,52 @@
+from typing import Any, Dict, Iterable
+from ..constants import CODE_STATUSES, STATUS_DONE
+
+
+def _bump(counts: Dict[str, int], key: str, delta: int) -> None:
+    n = counts.get(key, 0) + delta
+    if n:
+        counts[key] = n
+    else:
+        counts.pop(key, None)
+
+
+class TaskCounters:
+    """Status counts and per-day histograms, updated one record at a time.
+
+    ``created`` counts tasks by the day (UTC, ``YYYY-MM-DD``) of ``createdAt``
+    and ``completed`` counts done tasks by the day of ``updatedAt``, i.e. when
+    they were last changed while done. Both describe the stored tasks, so they
+    can always be rebuilt from the data.
+    """
+
+    __slots__ = ("by_status", "created", "completed")
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()) -> None:
+        self.by_status: Dict[str, int] = {}
+        self.created: Dict[str, int] = {}
+        self.completed: Dict[str, int] = {}
+        for d in records:
+            self.add(d)
+
+    def _apply(self, record: Dict[str, Any], delta: int) -> None:
+        _bump(self.by_status, record["status"], delta)
+        _bump(self.created, record["createdAt"][:10], delta)
+        if record["status"] == STATUS_DONE:
+            _bump(self.completed, record["updatedAt"][:10], delta)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self._apply(record, 1)
+
+    def discard(self, record: Dict[str, Any]) -> None:
+        self._apply(record, -1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """``{"total", "by_status", "created_per_day", "completed_per_day"}``."""
+        by_status = {s: 0 for s in CODE_STATUSES}
+        by_status.update(self.by_status)
+        return {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "created_per_day": dict(sorted(self.created.items())),
+            "completed_per_day": dict(sorted(self.completed.items())),
+        }
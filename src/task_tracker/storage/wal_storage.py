@@ -0,0 +1,373 @@
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional
+from .json_storage import Signature, stat_signature
+from .record_set import RecordSet, SortKey
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run without the file lock
+    fcntl = None
+
+DEFAULT_FILE_NAME = "tasks.json"
+DEFAULT_COMPACT_THRESHOLD = 1000
+
+OP_PUT = "put"
+OP_DELETE = "delete"
+
+
+class WalStorage:
+    """Snapshot + append-only log persistence.
+
+    The snapshot keeps the same list format as ``JsonStorage`` (``tasks.json``);
+    every mutation is appended as one JSON line to ``tasks.json.log`` and the
+    log is replayed on open. Once the log grows past ``compact_threshold`` ops
+    it is folded into the snapshot by a background thread.
+
+    Log ops are full-record ``put`` and ``delete``, so replaying ops that are
+    already part of the snapshot is harmless (e.g. after a crash mid-compaction).
+
+    Several processes can share the files: every call takes an ``fcntl``
+    lock on ``tasks.json.log.lock`` (shared to read, exclusive to write) and
+    first applies the log tail other processes appended since its last call.
+    A snapshot or log replaced by another process's compaction is reloaded.
+    """
+
+    def __init__(
+        self,
+        file_path: Path | None = None,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+        background: bool = True,
+    ) -> None:
+        self.file_path = file_path or Path.cwd() / DEFAULT_FILE_NAME
+        self.log_path = self.file_path.with_name(self.file_path.name + ".log")
+        self.lock_path = self.file_path.with_name(self.file_path.name + ".log.lock")
+        self.compact_threshold = compact_threshold
+        self.background = background
+        self._lock = threading.RLock()
+        self._records = RecordSet()
+        self._log_ops = 0
+        self._compactor: Optional[threading.Thread] = None
+        self._batch_depth = 0
+        self._pending: List[Dict[str, Any]] = []
+        # what the in-memory state was built from
+        self._log_fd: Optional[int] = None
+        self._log_ino: Optional[int] = None
+        self._offset = 0  # log bytes applied
+        self._snapshot: Optional[Signature] = None
+        self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock_depth = 0
+        with self._writing():
+            if not self.file_path.exists():
+                self._write_snapshot([])
+        self._maybe_compact()
+
+    # ---------- internals ----------
+    @contextmanager
+    def _file_locked(self, exclusive: bool) -> Iterator[None]:
+        """Thread lock plus the cross-process lock (re-entrant), caught up
+        with the files on entry."""
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                self._sync()
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and fcntl is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _reading(self):
+        return self._file_locked(exclusive=False)
+
+    def _writing(self):
+        return self._file_locked(exclusive=True)
+
+    def _read_snapshot(self) -> List[Dict[str, Any]]:
+        try:
+            with self.file_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+                return data if isinstance(data, list) else []
+        except FileNotFoundError:
+            return []
+        except json.JSONDecodeError:
+            return []
+
+    def _write_tmp(self, path: Path, data: bytes) -> Path:
+        # Unique name per writer, in the same directory so replace() is atomic
+        fd, name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(name, 0o644)
+        except BaseException:
+            os.unlink(name)
+            raise
+        return Path(name)
+
+    def _snapshot_bytes(self, tasks: List[Dict[str, Any]]) -> bytes:
+        return json.dumps(tasks, ensure_ascii=False, indent=2).encode("utf-8")
+
+    def _write_snapshot(self, tasks: List[Dict[str, Any]]) -> None:
+        os.replace(self._write_tmp(self.file_path, self._snapshot_bytes(tasks)), self.file_path)
+        self._snapshot = stat_signature(self.file_path)
+
+    def _open_log(self) -> None:
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+        self._log_fd = os.open(self.log_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self._log_ino = os.fstat(self._log_fd).st_ino
+        self._offset = 0
+
+    def _reload(self) -> None:
+        """Rebuild the in-memory state from the snapshot and the whole log."""
+        self._records = RecordSet()
+        self._log_ops = 0
+        self._snapshot = stat_signature(self.file_path)
+        for d in self._read_snapshot():
+            self._records.put(d)
+        self._open_log()
+        self._apply_tail()
+
+    def _apply_tail(self) -> None:
+        """Apply the complete log lines past ``_offset``. A torn or corrupt
+        tail is left for the next writer to truncate (see ``_write_ops``)."""
+        size = os.fstat(self._log_fd).st_size
+        if size <= self._offset:
+            return
+        data = os.pread(self._log_fd, size - self._offset, self._offset)
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                op = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            self.apply(op)
+            self._log_ops += 1
+            self._offset += len(line)
+
+    def _sync(self) -> None:
+        """Catch up with other processes (file lock held)."""
+        if self._log_fd is None or stat_signature(self.file_path) != self._snapshot:
+            self._reload()
+            return
+        try:
+            ino = os.stat(self.log_path).st_ino
+        except FileNotFoundError:
+            ino = None
+        if ino != self._log_ino:
+            self._reload()  # compacted by another process
+        else:
+            self._apply_tail()
+
+    def _append(self, ops: List[Dict[str, Any]]) -> None:
+        if not ops:
+            return
+        with self._writing():
+            if self._batch_depth:
+                # Applied right away, written with the rest when the batch exits
+                for op in ops:
+                    self.apply(op)
+                self._pending.extend(ops)
+                return
+            self._write_ops(ops)
+            for op in ops:
+                self.apply(op)
+        self._maybe_compact()
+
+    def _log_put(self, record: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> None:
+        """Log a record already put in memory, undoing the put if the write fails."""
+        try:
+            self._append([{"op": OP_PUT, "task": record}])
+        except OSError:
+            if previous is None:
+                self._records.pop(int(record["id"]))
+            else:
+                self._records.put(previous)
+            raise
+
+    def _write_ops(self, ops: List[Dict[str, Any]]) -> None:
+        """Append ``ops`` (exclusive lock held, log caught up)."""
+        data = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops).encode("utf-8")
+        if os.fstat(self._log_fd).st_size != self._offset:
+            # Torn tail from an interrupted append; drop it so new ops start clean
+            os.ftruncate(self._log_fd, self._offset)
+        os.write(self._log_fd, data)
+        self._offset += len(data)
+        self._log_ops += len(ops)
+
+    def _maybe_compact(self) -> None:
+        with self._lock:
+            if self._log_ops < self.compact_threshold:
+                return
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            if not self.background:
+                self.compact()
+                return
+            self._compactor = threading.Thread(
+                target=self.compact, name="wal-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    # ---------- log API ----------
+    def apply(self, op: Dict[str, Any]) -> None:
+        """Apply a log op to the in-memory state without logging it."""
+        kind = op.get("op")
+        if kind == OP_PUT:
+            self._records.put(op["task"])
+        elif kind == OP_DELETE:
+            self._records.pop(int(op["id"]))
+        else:
+            raise ValueError(f"Operação de log desconhecida: {kind!r}")
+
+    def append_op(self, op: Dict[str, Any]) -> None:
+        """Append a single op to the log and apply it.
+
+        The op reaches the OS before this returns but is not fsynced.
+        """
+        if op.get("op") not in (OP_PUT, OP_DELETE):
+            raise ValueError(f"Operação de log desconhecida: {op.get('op')!r}")
+        self._append([op])
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Write all ops of the batch to the log in one append, holding the
+        write lock for the whole batch."""
+        with self._writing():
+            self._batch_depth += 1
+            try:
+                yield
+            except BaseException:
+                # Roll the in-memory state back to what is on disk
+                self._pending = []
+                self._reload()
+                raise
+            finally:
+                self._batch_depth -= 1
+            if self._batch_depth == 0 and self._pending:
+                ops, self._pending = self._pending, []
+                self._write_ops(ops)
+        self._maybe_compact()
+
+    def compact(self) -> None:
+        """Fold the log into the snapshot, keeping ops appended meanwhile."""
+        with self._writing():
+            tasks = list(self._records.iter())
+            offset, ino, snapshot = self._offset, self._log_ino, self._snapshot
+            ops_at_start = self._log_ops
+        # The expensive part (serializing every record) runs without the locks
+        tmp = self._write_tmp(self.file_path, self._snapshot_bytes(tasks))
+        with self._writing():
+            if (self._log_ino, self._snapshot) != (ino, snapshot):
+                # another process compacted meanwhile; its snapshot is newer
+                tmp.unlink()
+                return
+            tail = os.pread(self._log_fd, self._offset - offset, offset)
+            os.replace(tmp, self.file_path)
+            self._snapshot = stat_signature(self.file_path)
+            os.replace(self._write_tmp(self.log_path, tail), self.log_path)
+            self._open_log()
+            self._offset = len(tail)
+            self._log_ops -= ops_at_start
+
+    def signature(self) -> tuple:
+        """Changes with every append to the log (and every compaction)."""
+        with self._lock:
+            return (stat_signature(self.file_path), stat_signature(self.log_path))
+
+    def close(self) -> None:
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            if self._log_fd is not None:
+                os.close(self._log_fd)
+                self._log_fd = None
+            os.close(self._lock_fd)
+
+    # ---------- TaskStorage ----------
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        with self._reading():
+            return self._records.get(task_id)
+
+    def insert(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        with self._writing():
+            record = self._records.insert(task)
+            self._log_put(record, previous=None)
+            return dict(record)
+
+    def patch(self, task_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._writing():
+            previous = self._records.get(task_id)
+            record = self._records.patch(task_id, fields)
+            if record is None:
+                return None
+            self._log_put(record, previous=previous)
+            return dict(record)
+
+    def remove(self, task_id: int) -> bool:
+        with self._writing():
+            if task_id not in self._records:
+                return False
+            self._append([{"op": OP_DELETE, "id": task_id}])
+            return True
+
+    def iter(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with self._reading():
+            return iter(list(self._records.iter(status)))
+
+    def page(
+        self,
+        status: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[SortKey] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._reading():
+            return self._records.page(status, sort_by, descending, limit, after)
+
+    def between(
+        self,
+        field: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._reading():
+            return self._records.between(field, since, until, status)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._reading():
+            return self._records.stats()
+
+    def max_id(self) -> int:
+        with self._reading():
+            return self._records.max_id()
+
+    # Public API for service
+    def list(self) -> List[Dict[str, Any]]:
+        with self._reading():
+            return list(self._records.iter())
+
+    def save_all(self, tasks: List[Dict[str, Any]]) -> None:
+        """Persist ``tasks`` by logging only the records that differ."""
+        with self._writing():
+            seen = set()
+            ops: List[Dict[str, Any]] = []
+            for d in tasks:
+                task_id = int(d["id"])
+                seen.add(task_id)
+                if self._records.get(task_id) != d:
+                    ops.append({"op": OP_PUT, "task": dict(d)})
+            for task_id in set(self._records.ids()) - seen:
+                ops.append({"op": OP_DELETE, "id": task_id})
+            self._append(ops)
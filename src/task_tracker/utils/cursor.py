@@ -0,0 +1,23 @@
+import base64
+import binascii
+import json
+from typing import Any, Tuple
+from ..exceptions import InvalidCursor
+
+
+def encode_cursor(sort_by: str, key: Tuple[Any, int]) -> str:
+    """Opaque, URL-safe token for the keyset position ``key`` in a ``sort_by`` listing."""
+    raw = json.dumps([sort_by, key[0], key[1]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str, sort_by: str) -> Tuple[Any, int]:
+    """Inverse of ``encode_cursor``; the cursor must come from a ``sort_by`` listing."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        field, value, task_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor(f"Cursor inválido: {token}") from e
+    if field != sort_by or not isinstance(task_id, int):
+        raise InvalidCursor(f"Cursor inválido para ordenação por {sort_by}: {token}")
+    return (value, task_id)
@@ -0,0 +1,175 @@
+"""Per-phase timers and counters, reported to pluggable hooks.
+
+Code marks phases with ``phase("storage.parse")`` or ``@timed(...)`` and
+counts things with ``count("storage.bytes_read", n)``. Nothing is measured
+until a hook is installed with ``add_hook()``. Hooks receive each phase's
+self time, i.e. without the phases nested in it, so a breakdown adds up to
+the total. ``PhaseStats`` is the hook behind ``task-cli --profile``; a
+metrics exporter implements the same two methods.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Protocol, TypeVar
+
+F = TypeVar("F", bound=Callable)
+T = TypeVar("T")
+
+
+class Hook(Protocol):
+    def on_phase(self, name: str, seconds: float) -> None: ...
+
+    def on_count(self, name: str, n: int) -> None: ...
+
+
+# Replaced, never mutated, so phases ending in other threads iterate safely
+_hooks: List[Hook] = []
+_local = threading.local()
+
+
+def add_hook(hook: Hook) -> None:
+    global _hooks
+    _hooks = _hooks + [hook]
+
+
+def remove_hook(hook: Hook) -> None:
+    global _hooks
+    _hooks = [h for h in _hooks if h is not hook]
+
+
+@contextmanager
+def hooked(hook: Hook) -> Iterator[Hook]:
+    """Install ``hook`` for the duration of the block."""
+    add_hook(hook)
+    try:
+        yield hook
+    finally:
+        remove_hook(hook)
+
+
+def enabled() -> bool:
+    return bool(_hooks)
+
+
+def _stack() -> List[float]:
+    # Per thread: time spent in nested phases of each open phase
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def record(name: str, seconds: float) -> None:
+    """Report ``seconds`` measured by the caller (e.g. summed over a loop)."""
+    hooks = _hooks
+    if not hooks:
+        return
+    stack = _stack()
+    if stack:
+        stack[-1] += seconds
+    for hook in hooks:
+        hook.on_phase(name, seconds)
+
+
+def count(name: str, n: int = 1) -> None:
+    for hook in _hooks:
+        hook.on_count(name, n)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    hooks = _hooks
+    if not hooks:
+        yield
+        return
+    stack = _stack()
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        for hook in hooks:
+            hook.on_phase(name, elapsed - nested)
+
+
+def timed_iter(name: str, iterable: Iterable[T]) -> Iterator[T]:
+    """Time the work done producing each item of a lazy ``iterable``, but not
+    the consumer's work between items."""
+    if not _hooks:
+        return iter(iterable)
+    return _timed_iter(name, iter(iterable))
+
+
+def _timed_iter(name: str, it: Iterator[T]) -> Iterator[T]:
+    stack = _stack()
+    clock = time.perf_counter
+    total = 0.0
+    nested = 0.0
+    try:
+        while True:
+            stack.append(0.0)
+            start = clock()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                total += clock() - start
+                nested += stack.pop()
+            yield item
+    finally:
+        if stack:
+            stack[-1] += total
+        for hook in _hooks:
+            hook.on_phase(name, total - nested)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of ``phase``; costs one check per call while disabled."""
+    def decorate(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _hooks:
+                return fn(*args, **kwargs)
+            with phase(name):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorate
+
+
+class PhaseStats:
+    """Hook that sums calls and self time per phase, and counters."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def on_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def on_count(self, name: str, n: int) -> None:
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def format(self, total: float) -> str:
+        """Phases by self time, then what no phase covered, then counters."""
+        total = max(total, 1e-9)
+        rows = sorted(self.seconds.items(), key=lambda item: item[1], reverse=True)
+        rows.append(("(outros)", max(0.0, total - sum(self.seconds.values()))))
+        lines = [f"{'fase':<22} {'chamadas':>8} {'ms':>10} {'%':>6}"]
+        for name, seconds in rows:
+            calls = self.calls.get(name, "")
+            lines.append(f"{name:<22} {calls:>8} {seconds * 1000:>10.3f} {seconds / total:>6.1%}")
+        lines.append(f"{'total':<22} {'':>8} {total * 1000:>10.3f}")
+        for name, n in sorted(self.counts.items()):
+            lines.append(f"{name:<22} {n:>8}")
+        return "\n".join(lines)
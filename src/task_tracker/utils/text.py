@@ -0,0 +1,19 @@
+import re
+import unicodedata
+from typing import List
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents: ``"Ação"`` -> ``"acao"``."""
+    text = text.casefold()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split ``text`` into accent-folded word tokens."""
+    return TOKEN_RE.findall(fold(text))
@@ -1,5 +1,71 @@
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
 
 def now_iso() -> str:
     """Return current time in UTC as ISO-8601 string."""
     return datetime.now(timezone.utc).isoformat()
+
+
+def now_micros() -> int:
+    """Current time as integer microseconds since the epoch."""
+    return time.time_ns() // 1_000
+
+
+def iso_to_micros(value: str) -> int:
+    """Parse an ISO-8601 timestamp into integer microseconds since the epoch (UTC)."""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def sortable_micros(value: str) -> int:
+    """``iso_to_micros``, or 0 (sorts first) for a value that is not a timestamp."""
+    try:
+        return iso_to_micros(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def is_canonical_iso(value: str) -> bool:
+    """True if ``micros_to_iso(iso_to_micros(value)) == value`` (cheap shape check)."""
+    if not value.endswith("+00:00"):
+        return False
+    if len(value) == 32:
+        return value[19] == "." and value[20:26] != "000000"
+    return len(value) == 25
+
+
+def micros_to_iso(value: int) -> str:
+    """Inverse of ``iso_to_micros``, in the same format as ``now_iso``."""
+    return (EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3_600, "d": 86_400, "w": 604_800}
+
+
+def parse_duration(value: str) -> timedelta:
+    """Parse ``"30d"``, ``"12h"``, ``"2w"``... (units s, m, h, d, w)."""
+    number, unit = value[:-1], DURATION_UNITS.get(value[-1:])
+    if unit is None or not number.isdigit():
+        raise ValueError(f"Duração inválida: {value} (use por exemplo 30d, 12h ou 2w)")
+    return timedelta(seconds=int(number) * unit)
+
+
+def parse_instant(value: str, now_us: Optional[int] = None) -> int:
+    """Epoch microseconds for an ISO date or date-time (UTC when no offset is
+    given), or for a duration ago (``"7d"`` means 7 days before ``now_us``)."""
+    try:
+        return iso_to_micros(value)
+    except ValueError:
+        pass
+    try:
+        ago = parse_duration(value)
+    except ValueError:
+        raise ValueError(f"Data inválida: {value} (use ISO, ex. 2024-03-01T12:00, ou uma duração como 7d)") from None
+    return (now_micros() if now_us is None else now_us) - ago // timedelta(microseconds=1)
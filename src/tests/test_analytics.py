@@ -0,0 +1,70 @@
+import unittest
+
+from task_tracker import analytics
+from task_tracker.analytics import ENGINE_NUMPY, ENGINE_PYTHON, report
+from task_tracker.models.task_table import TaskTable
+
+NOW = "2024-03-10T12:00:00+00:00"
+
+
+def task(task_id, status, created, updated=None):
+    return {
+        "id": task_id,
+        "description": f"T{task_id}",
+        "status": status,
+        "createdAt": created,
+        "updatedAt": updated or created,
+    }
+
+
+RECORDS = [
+    task(1, "done", "2024-03-01T00:00:00+00:00", "2024-03-09T00:00:00+00:00"),   # 8 dias
+    task(2, "done", "2024-03-08T00:00:00+00:00", "2024-03-10T00:00:00+00:00"),   # 2 dias
+    task(3, "done", "2024-03-09T12:00:00+00:00", "2024-03-10T06:00:00+00:00"),   # 0,75 dia
+    task(4, "done", "2024-01-01T00:00:00+00:00", "2024-01-05T00:00:00+00:00"),   # fora da janela
+    task(5, "in-progress", "2024-03-10T00:00:00+00:00"),
+    task(6, "in-progress", "2023-11-01T00:00:00+00:00"),
+    task(7, "in-progress", "2024-02-20T00:00:00+00:00"),
+    task(8, "todo", "2024-03-05T00:00:00+00:00"),
+]
+
+
+class ReportTests(unittest.TestCase):
+    def build(self, records=RECORDS, engine=ENGINE_PYTHON, **kwargs):
+        return report(TaskTable.from_records(records), now=NOW, engine=engine, **kwargs)
+
+    def test_metrics(self):
+        r = self.build(days=3, oldest=2)
+        self.assertEqual(r.days, ["2024-03-08", "2024-03-09", "2024-03-10"])
+        self.assertEqual(r.throughput, [0, 1, 2])
+        # em aberto no fim de cada dia: criadas antes do fim menos concluídas antes
+        self.assertEqual(r.wip, [5, 5, 4])
+        self.assertEqual(r.cycle_time, {"p50": 2.0, "p85": 6.2, "p95": 7.4})
+        self.assertEqual(r.aging["todo"], [0, 1, 0, 0, 0])
+        self.assertEqual(r.aging["in-progress"], [1, 0, 1, 0, 1])
+        self.assertEqual([(i, age) for i, age, _ in r.oldest], [(6, 130.5), (7, 19.5)])
+
+    def test_empty(self):
+        r = self.build([], days=2)
+        self.assertEqual((r.throughput, r.wip, r.cycle_time, r.oldest), ([0, 0], [0, 0], {}, []))
+        self.assertEqual(r.to_dict()["aging"]["todo"][">=90d"], 0)
+
+    @unittest.skipUnless(analytics.np is not None, "NumPy não instalado")
+    def test_numpy_matches_python(self):
+        for days in (1, 3, 90):
+            with self.subTest(days=days):
+                fast = self.build(days=days, engine=ENGINE_NUMPY)
+                slow = self.build(days=days)
+                self.assertEqual(fast.engine, ENGINE_NUMPY)
+                fast.engine = slow.engine
+                self.assertEqual(fast, slow)
+
+    @unittest.skipIf(analytics.np is not None, "NumPy instalado")
+    def test_numpy_missing(self):
+        self.assertEqual(self.build(engine=None).engine, ENGINE_PYTHON)
+        with self.assertRaises(RuntimeError):
+            self.build(engine=ENGINE_NUMPY)
+
+
+if __name__ == "__main__":
+    unittest.main()
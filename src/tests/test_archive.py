@@ -0,0 +1,131 @@
+import gzip
+import io
+import json
+import lzma
+import unittest
+from datetime import timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.constants import STATUS_DONE, STATUS_TODO
+from task_tracker.services.task_service import TaskService
+from task_tracker.services.transfer import FORMAT_JSONL, import_tasks
+from task_tracker.storage.archive import CODEC_GZIP, CODEC_LZMA, Archive, archive_path
+from task_tracker.storage.json_storage import JsonStorage
+from task_tracker.storage.mmap_storage import MmapStorage
+from task_tracker.storage.sqlite_storage import SqliteStorage
+from task_tracker.utils.time import parse_duration
+
+OLD = "2024-01-01T00:00:00+00:00"
+
+
+def ids(tasks):
+    return [t.id for t in tasks]
+
+
+class ArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+
+    def test_segments_and_manifest(self):
+        archive = Archive(self.dir / "tasks.json.archive")
+        self.assertEqual((archive.max_id(), list(archive.iter())), (0, []))
+        self.assertIsNone(archive.write([]))
+        first = archive.write([{"id": 3, "status": STATUS_DONE}, {"id": 5, "status": STATUS_DONE}])
+        second = archive.write([{"id": 9, "status": STATUS_DONE}], CODEC_LZMA)
+        self.assertEqual((first["file"], second["file"]), ("segment-0001.jsonl.gz", "segment-0002.jsonl.xz"))
+        with gzip.open(archive.path / first["file"], "rt") as f:
+            self.assertEqual(len(f.readlines()), 2)
+        with lzma.open(archive.path / second["file"], "rt") as f:
+            self.assertEqual(json.loads(f.read())["id"], 9)
+
+        # outro processo vê o manifesto novo
+        other = Archive(archive.path)
+        self.assertEqual(other.max_id(), 9)
+        self.assertEqual([d["id"] for d in other.iter()], [9, 3, 5])  # segmento mais novo primeiro
+        self.assertEqual(other.get(5)["id"], 5)
+        self.assertIsNone(other.get(4))
+
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration("30d"), timedelta(days=30))
+        self.assertEqual(parse_duration("2w"), timedelta(weeks=2))
+        for value in ("", "d", "30", "3x", "-1d"):
+            with self.assertRaises(ValueError):
+                parse_duration(value)
+
+
+class ServiceArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+
+    def storages(self):
+        return [
+            JsonStorage(file_path=self.dir / "tasks.json"),
+            MmapStorage(file_path=self.dir / "tasks.rec"),
+            SqliteStorage(file_path=self.dir / "tasks.db"),
+        ]
+
+    def fill(self, service):
+        # 1 e 3 done há tempo, 2 done agora, 4 todo antiga
+        service.import_records([
+            {"id": i, "description": f"T{i}", "status": status, "createdAt": OLD, "updatedAt": OLD}
+            for i, status in ((1, STATUS_DONE), (2, STATUS_DONE), (3, STATUS_DONE), (4, STATUS_TODO))
+        ])
+        service.mark_done(2)
+
+    def test_archive_moves_old_done_tasks(self):
+        for storage in self.storages():
+            with self.subTest(storage=type(storage).__name__):
+                service = TaskService(storage)
+                self.addCleanup(getattr(storage, "close", lambda: None))
+                self.fill(service)
+                entry = service.archive_done(timedelta(days=30), codec=CODEC_LZMA)
+                self.assertEqual((entry["count"], entry["min_id"], entry["max_id"]), (2, 1, 3))
+                self.assertIsNone(service.archive_done(timedelta(days=30)))
+
+                self.assertEqual(ids(service.list()), [2, 4])
+                self.assertEqual(sorted(ids(service.list(include_archived=True))), [1, 2, 3, 4])
+                self.assertEqual(ids(service.list(STATUS_DONE, include_archived=True, sort_by="id")), [1, 2, 3])
+                page = service.page(include_archived=True, limit=3)
+                self.assertEqual(ids(page.tasks), [1, 2, 3])
+                self.assertEqual(len(service.history(1)), 1)  # o histórico continua
+                self.assertEqual(service.stats()["total"], 2)
+
+    def test_ids_stay_unique(self):
+        for storage in self.storages():
+            with self.subTest(storage=type(storage).__name__):
+                service = TaskService(storage)
+                self.addCleanup(getattr(storage, "close", lambda: None))
+                self.fill(service)
+                service.delete(4)
+                service.archive_done(timedelta(0))  # arquiva 1, 2 e 3: o armazenamento fica vazio
+                # o .rec nunca reusa ids (nem o 4, excluído); nos outros só os arquivados ficam de fora
+                first = 5 if isinstance(storage, MmapStorage) else 4
+                self.assertEqual(service.add("Nova").id, first)
+                self.assertEqual(service.add("Outra").id, first + 1)
+
+    def test_import_skips_archived_ids(self):
+        service = TaskService(JsonStorage(file_path=self.dir / "tasks.json"))
+        self.fill(service)
+        service.archive_done(timedelta(days=30), codec=CODEC_GZIP)
+        lines = [
+            {"id": 1, "description": "Outra", "status": STATUS_TODO, "createdAt": OLD, "updatedAt": OLD},
+            {"id": 3, "description": "T3", "status": STATUS_DONE, "createdAt": OLD, "updatedAt": OLD},
+        ]
+        stream = io.BytesIO("".join(json.dumps(d) + "\n" for d in lines).encode())
+        result = import_tasks(service, stream, FORMAT_JSONL)
+        self.assertEqual((result.imported, result.remapped, result.duplicates), (1, 1, 1))
+        self.assertEqual(ids(service.list()), [2, 4, 5])
+
+    def test_default_archive_next_to_tasks_file(self):
+        service = TaskService(JsonStorage(file_path=self.dir / "tasks.json"))
+        self.assertEqual(service.archive.path, archive_path(self.dir / "tasks.json"))
+        self.assertIsNone(TaskService([]).archive.path)  # sem arquivo: em memória
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.constants import STATUS_DONE
+from task_tracker.exceptions import ConcurrentModification, TaskNotFound
+from task_tracker.services import AsyncTaskService
+from task_tracker.storage.json_storage import JsonStorage
+
+
+class CountingJsonStorage(JsonStorage):
+    """JsonStorage que conta gravações e registra a thread que grava."""
+    def __init__(self, *args, delay=0.0, **kwargs):
+        self.writes = 0
+        self.threads = set()
+        self.delay = delay
+        super().__init__(*args, **kwargs)
+        self.writes = 0
+        self.threads.clear()
+
+    def _write_all(self, *args):
+        self.writes += 1
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        super()._write_all(*args)
+
+
+class AsyncTaskServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.storage = CountingJsonStorage(file_path=Path(self.tmp.name) / "tasks.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_async(self, coro_fn):
+        async def main():
+            async with AsyncTaskService(self.storage) as service:
+                return await coro_fn(service)
+        return asyncio.run(main())
+
+    def test_concurrent_adds_share_one_save(self):
+        async def scenario(service):
+            return await asyncio.gather(*(service.add(f"t{i}") for i in range(10)))
+
+        tasks = self.run_async(scenario)
+        self.assertEqual([t.id for t in tasks], list(range(1, 11)))
+        self.assertEqual(self.storage.writes, 1)
+        self.assertEqual(len(self.storage.list()), 10)
+
+    def test_sequential_awaits_save_each_time(self):
+        async def scenario(service):
+            await service.add("a")
+            await service.add("b")
+            return await service.list()
+
+        tasks = self.run_async(scenario)
+        self.assertEqual([t.description for t in tasks], ["a", "b"])
+        self.assertEqual(self.storage.writes, 2)
+
+    def test_errors_are_delivered_per_call(self):
+        async def scenario(service):
+            await service.add("a")
+            return await asyncio.gather(
+                service.mark_done(1), service.delete(99), service.add("b"),
+                return_exceptions=True,
+            )
+
+        done, missing, added = self.run_async(scenario)
+        self.assertEqual(done.status, STATUS_DONE)
+        self.assertIsInstance(missing, TaskNotFound)
+        self.assertEqual(added.id, 2)
+        self.assertEqual(len(self.storage.list()), 2)
+
+    def test_reads_see_writes_queued_before_them(self):
+        async def scenario(service):
+            _, tasks, stats = await asyncio.gather(
+                service.add("a"), service.list(), service.stats()
+            )
+            return tasks, stats
+
+        tasks, stats = self.run_async(scenario)
+        self.assertEqual([t.description for t in tasks], ["a"])
+        self.assertEqual(stats["total"], 1)
+
+    def test_disk_work_runs_off_the_loop(self):
+        self.storage.delay = 0.2
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def scenario(service):
+            await asyncio.gather(service.add("a"), ticker())
+
+        self.run_async(scenario)
+        # O loop continuou rodando enquanto a gravação dormia na outra thread
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[-1] - ticks[0], 0.15)
+        self.assertNotIn(threading.get_ident(), self.storage.threads)
+
+    def test_group_retries_on_conflict(self):
+        original = JsonStorage._write_all
+        conflicts = [1]
+
+        def flaky(storage, *args):
+            if conflicts:
+                conflicts.pop()
+                raise ConcurrentModification("outro processo gravou")
+            original(storage, *args)
+
+        self.storage._write_all = lambda *args: flaky(self.storage, *args)
+
+        async def scenario(service):
+            return await asyncio.gather(service.add("a"), service.add("b"))
+
+        tasks = self.run_async(scenario)
+        self.assertEqual([t.id for t in tasks], [1, 2])
+        self.assertEqual(len(self.storage.list()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
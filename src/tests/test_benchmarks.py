@@ -0,0 +1,44 @@
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.benchmarks.formats import measure
+from task_tracker.benchmarks.suite import BACKENDS, OPERATIONS, main, run
+from task_tracker.storage.serializers import FORMATS
+
+
+class BenchmarkSuiteTests(unittest.TestCase):
+    def test_run_covers_every_backend_and_op(self):
+        data = run(sizes=[30], backends=list(BACKENDS), ops=3)
+        seen = {(r["backend"], r["op"]) for r in data["results"]}
+        self.assertEqual(seen, {(b, op) for b in BACKENDS for op in OPERATIONS})
+        for r in data["results"]:
+            self.assertEqual(r["size"], 30)
+            self.assertLessEqual(r["p50_ms"], r["p99_ms"])
+
+    def test_json_output_file(self):
+        with TemporaryDirectory() as tmp:
+            out = Path(tmp) / "bench.json"
+            buf = io.StringIO()
+            with redirect_stdout(buf):
+                code = main(["--sizes", "20", "--backends", "sqlite", "--ops", "3",
+                             "--json", "--output", str(out)])
+            self.assertEqual(code, 0)
+            # stdout e arquivo trazem o mesmo documento
+            self.assertEqual(json.loads(buf.getvalue())["results"],
+                             json.loads(out.read_text(encoding="utf-8"))["results"])
+
+
+class FormatBenchmarkTests(unittest.TestCase):
+    def test_measures_every_format(self):
+        results = measure(50, list(FORMATS))
+        self.assertEqual([r["format"] for r in results], list(FORMATS))
+        sizes = {r["format"]: r["size_mb"] for r in results}
+        self.assertLessEqual(sizes["binary"], sizes["json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from task_tracker.exceptions import ConcurrentModification
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.cached_storage import CachedJsonStorage
+from task_tracker.storage.json_storage import JsonStorage
+
+
+class CachedJsonStorageTests(unittest.TestCase):
+    def test_reuses_parsed_records_until_file_changes(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = CachedJsonStorage(file_path=path)
+            service = TaskService(storage)
+
+            service.add("A")
+            misses = storage.misses
+            service.list()
+            service.list()
+            service.mark_done(1)
+            self.assertEqual(storage.misses, misses)
+            self.assertGreaterEqual(storage.hits, 3)
+
+            # outro processo (aqui: outro storage) altera o arquivo
+            other = JsonStorage(file_path=path)
+            other.save_all(other.list() + [{"id": 2, "description": "B", "status": "todo",
+                                            "createdAt": "x", "updatedAt": "x"}])
+
+            self.assertEqual([t.id for t in service.list()], [1, 2])
+            self.assertEqual(storage.misses, misses + 1)
+
+    def test_writes_are_visible_to_plain_json_storage(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            service = TaskService(CachedJsonStorage(file_path=path))
+            service.add("A")
+            service.update(1, "B")
+
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self.assertEqual([d["description"] for d in data], ["B"])
+
+    def test_batch_writes_file_once(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = CachedJsonStorage(file_path=path)
+            writes = []
+            original = JsonStorage._write_all
+            storage._write_all = lambda *args: (writes.append(1), original(storage, *args))
+            service = TaskService(storage)
+            service.apply_many([{"op": "add", "description": str(i)} for i in range(10)])
+            self.assertEqual(len(writes), 1)
+            self.assertEqual(len(json.loads(path.read_text(encoding="utf-8"))), 10)
+
+    def test_batch_holds_the_file_lock(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = CachedJsonStorage(file_path=path)
+            service = TaskService(storage)
+            with service.batch():
+                service.add("A")
+                service.add("B")
+                # outro escritor fica bloqueado até o fim do lote
+                with self.assertRaises(ConcurrentModification):
+                    JsonStorage(file_path=path, lock_timeout=0.05).save_all([])
+                service.add("C")
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self.assertEqual([d["description"] for d in data], ["A", "B", "C"])
+
+    def test_batch_fails_fast_on_unlocked_external_write(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            service = TaskService(CachedJsonStorage(file_path=path))
+            with self.assertRaises(ConcurrentModification):
+                with service.batch():
+                    service.add("A")
+                    path.write_text('[{"id": 5, "description": "ext", "status": "todo", '
+                                    '"createdAt": "x", "updatedAt": "x"}]', encoding="utf-8")
+            # a escrita externa é preservada e o cache volta a refletir o disco
+            self.assertEqual([t.id for t in service.list()], [5])
+
+    def test_signature_comes_from_our_own_write(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = CachedJsonStorage(file_path=path)
+            original_replace = Path.replace
+
+            def replace_then_external_write(self_path, target):
+                result = original_replace(self_path, target)
+                if self_path.parent == path.parent and self_path.suffix == ".tmp":
+                    Path.replace = original_replace
+                    # escritor que não respeita o lock, logo após o nosso replace()
+                    path.write_text(json.dumps([{"id": 9, "description": "ext", "status": "todo",
+                                                 "createdAt": "x", "updatedAt": "x"}]),
+                                    encoding="utf-8")
+                return result
+
+            Path.replace = replace_then_external_write
+            try:
+                TaskService(storage).add("A")
+            finally:
+                Path.replace = original_replace
+            self.assertEqual([d["id"] for d in storage.list()], [9])
+
+    def test_recovers_when_file_is_removed(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = CachedJsonStorage(file_path=path)
+            TaskService(storage).add("A")
+            path.unlink()
+            self.assertEqual(storage.list(), [])
+            self.assertTrue(path.exists())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.constants import STATUS_DONE, STATUS_TODO
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.cached_storage import CachedJsonStorage
+from task_tracker.storage.changes import ChangeFeed, changes_path
+from task_tracker.storage.json_storage import JsonStorage
+
+
+class ChangeFeedTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "tasks.json.changes"
+
+    def test_seq_shared_between_instances(self):
+        a, b = ChangeFeed(self.path), ChangeFeed(self.path)
+        self.assertEqual(a.since(None), (0, None))
+        self.assertEqual(a.record([1, 2]), 2)
+        self.assertEqual(b.record([1]), 3)
+        # cada id aparece uma vez, na ordem da última mudança
+        self.assertEqual(a.since(0), (3, [2, 1]))
+        self.assertEqual(b.since(2), (3, [1]))
+        self.assertEqual(a.since(3), (3, []))
+
+    def test_compaction_resets_stale_readers(self):
+        feed = ChangeFeed(self.path, max_entries=10)
+        for i in range(1, 200):
+            feed.record([i])
+        self.assertLess(len(self.path.read_bytes().splitlines()), 200)
+        latest, ids = feed.since(195)
+        self.assertEqual((latest, ids), (199, [196, 197, 198, 199]))
+        # quem ficou para trás da compactação precisa recarregar tudo
+        self.assertIsNone(ChangeFeed(self.path).since(3)[1])
+        # seq maior que o feed: arquivo recriado
+        self.assertIsNone(feed.since(500)[1])
+
+    def test_in_memory(self):
+        feed = ChangeFeed(max_entries=4)
+        for i in range(1, 6):
+            feed.record([i])
+        self.assertEqual(feed.since(4), (5, [5]))
+        self.assertIsNone(feed.since(1)[1])
+
+
+class ChangesSinceTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "tasks.json"
+
+    def test_delta_between_services(self):
+        writer = TaskService(JsonStorage(file_path=self.path))
+        reader = TaskService(CachedJsonStorage(file_path=self.path))
+        writer.add("A")
+        start = reader.changes_since(None)
+        self.assertTrue(start.reset)
+
+        writer.add("B")
+        writer.add("C")
+        writer.mark_done(1)
+        writer.update(2, "B2")
+        writer.delete(2)
+        changes = reader.changes_since(start.seq)
+        self.assertFalse(changes.reset)
+        self.assertEqual([(t.id, t.status) for t in changes.tasks], [(3, STATUS_TODO), (1, STATUS_DONE)])
+        self.assertEqual(changes.removed, [2])
+        self.assertTrue(changes_path(self.path).exists())
+        self.assertEqual(reader.changes_since(changes.seq).tasks, [])
+
+    def test_batch_records_after_commit(self):
+        service = TaskService(CachedJsonStorage(file_path=self.path))
+        seq = service.changes_since(None).seq
+        with service.batch():
+            service.add("A")
+            service.add("B")
+            # ainda não gravado: o feed não anuncia o que ninguém vê
+            self.assertEqual(service.feed.seq(), seq)
+        self.assertEqual([t.id for t in service.changes_since(seq).tasks], [1, 2])
+
+        seq = service.feed.seq()
+        with self.assertRaises(RuntimeError):
+            with service.batch():
+                service.mark_done(1)
+                raise RuntimeError("falhou")
+        self.assertEqual(service.feed.seq(), seq)
+
+
+if __name__ == "__main__":
+    unittest.main()
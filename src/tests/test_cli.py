@@ -1,7 +1,10 @@
+import csv
 import io
+import json
 import os
 import unittest
-from contextlib import redirect_stdout
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
@@ -77,6 +80,82 @@ class CliTests(unittest.TestCase):
             # list com status inválido é barrado pelo argparse antes de chamar main,
             # então não testamos aqui. Teste de status inválido é no service.
 
+    def test_file_option_selects_sqlite(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            code, out = run_cli(["--file", "board.db", "add", "Buy groceries"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertTrue((tmpdir / "board.db").exists())
+            self.assertFalse((tmpdir / "tasks.json").exists())
+
+            code, out = run_cli(["-f", "board.db", "list"], tmpdir)
+            self.assertIn("Buy groceries", out)
+
+    def test_backend_option_selects_wal(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            code, out = run_cli(["--backend", "wal", "add", "Buy groceries"], tmpdir)
+            self.assertEqual(code, 0)
+            run_cli(["--backend", "wal", "mark-done", "1"], tmpdir)
+
+            # a alteração foi para o log; o snapshot não foi reescrito
+            self.assertEqual(json.loads((tmpdir / "tasks.json").read_text(encoding="utf-8")), [])
+            self.assertEqual(len((tmpdir / "tasks.json.log").read_text(encoding="utf-8").splitlines()), 2)
+
+            code, out = run_cli(["--backend", "wal", "list", "done"], tmpdir)
+            self.assertIn("Buy groceries", out)
+
+    def test_batch_jsonl_reports_each_op(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            ops = "\n".join([
+                '{"op": "add", "description": "A"}',
+                '{"op": "add", "description": "B"}',
+                '{"op": "mark-done", "id": 1}',
+                '{"op": "delete", "id": 99}',
+                'not json',
+            ])
+            with mock.patch("sys.stdin", io.StringIO(ops)):
+                code, out = run_cli(["batch"], tmpdir)
+            self.assertEqual(code, 3)  # PARTIAL
+            results = [json.loads(line) for line in out.splitlines()]
+            self.assertEqual([r["ok"] for r in results], [True, True, True, False, False])
+            self.assertEqual(results[1]["id"], 2)
+            self.assertEqual([r["line"] for r in results], [1, 2, 3, 4, 5])
+
+            code, out = run_cli(["list", "done"], tmpdir)
+            self.assertIn("A", out)
+
+    def test_batch_csv(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            rows = "op,id,description,status\nadd,,Comprar pão,\nstatus,1,,in-progress\n"
+            with mock.patch("sys.stdin", io.StringIO(rows)):
+                code, out = run_cli(["batch", "--format", "csv"], tmpdir)
+            self.assertEqual(code, 0)
+            code, out = run_cli(["list", "in-progress"], tmpdir)
+            self.assertIn("Comprar pão", out)
+
+    def test_batch_reports_physical_lines_and_csv_errors(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            rows = "op,id,description,status\n\nadd,,A,\n"
+            with mock.patch("sys.stdin", io.StringIO(rows)):
+                code, out = run_cli(["batch", "--format", "csv"], tmpdir)
+            self.assertEqual(json.loads(out)["line"], 3)
+
+            bad = 'op,id,description,status\nadd,,"' + "x" * 200 + '",\nadd,,B,\n'
+            old = csv.field_size_limit(100)
+            try:
+                with mock.patch("sys.stdin", io.StringIO(bad)):
+                    code, out = run_cli(["batch", "--format", "csv"], tmpdir)
+            finally:
+                csv.field_size_limit(old)
+            results = [json.loads(line) for line in out.splitlines()]
+            self.assertEqual(code, 3)  # PARTIAL
+            self.assertEqual([(r["line"], r["ok"]) for r in results], [(2, False), (3, True)])
+            self.assertIn("CSV inválido", results[0]["error"])
+
     def test_not_found_exit_code(self):
         with TemporaryDirectory() as tmp:
             tmpdir = Path(tmp)
@@ -84,5 +163,254 @@ class CliTests(unittest.TestCase):
             self.assertEqual(code, 4)  # NOT_FOUND
             self.assertIn("não encontrada", out)
 
+class PagedListCliTests(unittest.TestCase):
+    def test_limit_sort_and_after(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            for name in ("A", "B", "C"):
+                run_cli(["add", name], tmpdir)
+
+            err = io.StringIO()
+            with mock.patch("sys.stderr", err):
+                code, out = run_cli(["list", "--sort", "id", "--order", "desc", "--limit", "2"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertEqual([line.split("\t")[0] for line in out.splitlines()], ["3", "2"])
+            cursor = err.getvalue().split("--after ")[1].strip()
+
+            with mock.patch("sys.stderr", io.StringIO()) as err:
+                code, out = run_cli(["list", "--order", "desc", "--limit", "2", "--after", cursor], tmpdir)
+            self.assertEqual([line.split("\t")[0] for line in out.splitlines()], ["1"])
+            self.assertEqual(err.getvalue(), "")  # última página: sem cursor
+
+            code, out = run_cli(["list", "--sort", "updatedAt", "--after", cursor], tmpdir)
+            self.assertEqual(code, 2)
+
+class StatsCliTests(unittest.TestCase):
+    def test_stats(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            run_cli(["add", "A"], tmpdir)
+            run_cli(["add", "B"], tmpdir)
+            run_cli(["mark-done", "2"], tmpdir)
+
+            code, out = run_cli(["stats", "--days", "2"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertIn("todo: 1", out)
+            self.assertIn("done: 1", out)
+            self.assertIn("total: 2", out)
+            # última linha = hoje: 2 criadas, 1 concluída
+            self.assertTrue(out.rstrip().endswith("\t2\t1"))
+            code, out = run_cli(["stats", "--json"], tmpdir)
+            self.assertEqual(json.loads(out)["by_status"]["done"], 1)
+
+class SearchCliTests(unittest.TestCase):
+    def test_search_ranks_and_persists_index(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            run_cli(["add", "Revisar relatório"], tmpdir)
+            run_cli(["add", "Comprar café"], tmpdir)
+            run_cli(["mark-done", "2"], tmpdir)
+
+            code, out = run_cli(["search", "cafe"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertIn("Comprar café", out)
+            self.assertTrue((tmpdir / "tasks.json.idx").exists())
+
+            code, out = run_cli(["search", "rev", "rel", "--status", "todo"], tmpdir)
+            self.assertIn("Revisar relatório", out)
+            code, out = run_cli(["search", "cafe", "--status", "todo"], tmpdir)
+            self.assertIn("No tasks found", out)
+
+            # alteração feita sem o índice aparece na próxima busca
+            run_cli(["update", "1", "Revisar orçamento"], tmpdir)
+            code, out = run_cli(["search", "orcamento"], tmpdir)
+            self.assertIn("Revisar orçamento", out)
+
+class ConvertCliTests(unittest.TestCase):
+    def test_convert_round_trip(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            run_cli(["add", "Comprar pão"], tmpdir)
+            run_cli(["mark-done", "1"], tmpdir)
+
+            code, out = run_cli(["convert", "tasks.json", "tasks.tbin"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertIn("1 tasks convertidas", out)
+            self.assertIn("binary", out)
+            code, out = run_cli(["-f", "tasks.tbin", "list", "done"], tmpdir)
+            self.assertIn("Comprar pão", out)
+
+            code, _ = run_cli(["convert", "tasks.tbin", "back.json", "--to", "json-compact"], tmpdir)
+            self.assertEqual(code, 0)
+            text = (tmpdir / "back.json").read_text(encoding="utf-8")
+            self.assertNotIn("\n", text)
+            self.assertEqual(json.loads(text), json.loads((tmpdir / "tasks.json").read_text(encoding="utf-8")))
+
+    def test_convert_errors(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            code, _ = run_cli(["convert", "missing.json", "out.tbin"], tmpdir)
+            self.assertEqual(code, 4)
+            (tmpdir / "bad.tbin").write_bytes(b"lixo")
+            code, out = run_cli(["convert", "bad.tbin", "out.json"], tmpdir)
+            self.assertEqual(code, 2)
+            self.assertFalse((tmpdir / "out.json").exists())
+
+class BenchCliTests(unittest.TestCase):
+    def test_bench_does_not_touch_task_file(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            code, out = run_cli(["bench", "--sizes", "10", "--backends", "json", "--ops", "2"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertIn("set_status", out)
+            self.assertFalse((tmpdir / "tasks.json").exists())
+
+class ProfileCliTests(unittest.TestCase):
+    def test_profile_prints_phases_on_stderr(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            run_cli(["add", "A"], tmpdir)
+            err = io.StringIO()
+            with redirect_stderr(err):
+                code, out = run_cli(["--profile", "mark-done", "1"], tmpdir)
+            self.assertEqual(code, 0)
+            # stdout continua igual; o relatório vai só para o stderr
+            self.assertEqual(out, "Task 1 marked as done\n")
+            for phase in ("service.set_status", "storage.parse", "storage.serialize", "storage.replace"):
+                self.assertIn(phase, err.getvalue())
+
+    def test_trace_env_saves_cprofile(self):
+        import pstats
+
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            target = tmpdir / "trace.prof"
+            err = io.StringIO()
+            with mock.patch.dict(os.environ, {"TASK_TRACKER_TRACE": str(target)}), redirect_stderr(err):
+                code, _ = run_cli(["add", "A"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertIn("run_command", str(pstats.Stats(str(target)).stats))
+
+class ReportCliTests(unittest.TestCase):
+    def test_report(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            run_cli(["add", "A"], tmpdir)
+            run_cli(["add", "B"], tmpdir)
+            run_cli(["mark-done", "1"], tmpdir)
+            run_cli(["mark-in-progress", "2"], tmpdir)
+            code, out = run_cli(["report", "--days", "7"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertIn("concluídas nos últimos 7 dias: 1", out)
+            self.assertIn("in-progress mais antigas:", out)
+            code, out = run_cli(["report", "--json"], tmpdir)
+            data = json.loads(out)
+            self.assertEqual(len(data["days"]), 30)
+            self.assertEqual(data["wip"][-1], 1)
+            self.assertEqual(data["oldest_in_progress"][0]["id"], 2)
+
+class HistoryCliTests(unittest.TestCase):
+    def test_history(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            run_cli(["add", "A"], tmpdir)
+            run_cli(["mark-in-progress", "1"], tmpdir)
+            run_cli(["mark-done", "1"], tmpdir)
+            code, out = run_cli(["history", "1"], tmpdir)
+            self.assertEqual(code, 0)
+            lines = out.splitlines()
+            self.assertEqual([line.split("\t")[1] for line in lines],
+                             ["(criada) -> todo", "todo -> in-progress", "in-progress -> done"])
+            code, out = run_cli(["history", "2"], tmpdir)
+            self.assertEqual(code, 4)
+
+class ArchiveCliTests(unittest.TestCase):
+    def test_archive_and_list(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            run_cli(["add", "A"], tmpdir)
+            run_cli(["add", "B"], tmpdir)
+            run_cli(["mark-done", "2"], tmpdir)
+            code, out = run_cli(["archive", "--older-than", "30d"], tmpdir)
+            self.assertEqual((code, out.strip()), (0, "Nenhuma task done para arquivar"))
+
+            code, out = run_cli(["archive", "--older-than", "0s", "--codec", "lzma"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertIn("1 tasks arquivadas em", out)
+            self.assertTrue(out.strip().endswith("segment-0001.jsonl.xz"))
+
+            code, out = run_cli(["list"], tmpdir)
+            self.assertEqual(len(out.splitlines()), 1)
+            code, out = run_cli(["list", "--archived"], tmpdir)
+            self.assertEqual(len(out.splitlines()), 2)
+            code, out = run_cli(["list", "done", "--archived", "--limit", "5"], tmpdir)
+            self.assertIn("B", out)
+
+            # o id 2 continua reservado
+            code, out = run_cli(["add", "C"], tmpdir)
+            self.assertIn("(ID: 3)", out)
+
+            with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                run_cli(["archive", "--older-than", "30"], tmpdir)
+
+class TimeRangeCliTests(unittest.TestCase):
+    def test_since_until(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            run_cli(["add", "A"], tmpdir)
+            run_cli(["add", "B"], tmpdir)
+            code, out = run_cli(["list", "--since", "1h"], tmpdir)
+            self.assertEqual((code, len(out.splitlines())), (0, 2))
+            code, out = run_cli(["list", "--until", "2020-01-01", "--time-field", "createdAt"], tmpdir)
+            self.assertEqual(out.strip(), "No tasks found")
+            code, out = run_cli(["list", "--since", "2020-01-01T00:00", "--sort", "id", "--order", "desc"], tmpdir)
+            self.assertTrue(out.startswith("2\t"))
+
+            with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                run_cli(["list", "--since", "ontem"], tmpdir)
+
+class ExportImportCliTests(unittest.TestCase):
+    def test_export_then_import(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            run_cli(["add", "Comprar pão"], tmpdir)
+            run_cli(["add", "Pagar contas"], tmpdir)
+            run_cli(["mark-done", "2"], tmpdir)
+
+            err = io.StringIO()
+            with redirect_stderr(err):
+                code, _ = run_cli(["export", "-o", "out.csv", "--status", "done"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertIn("1 tasks exportadas", err.getvalue())
+            rows = list(csv.DictReader((tmpdir / "out.csv").open(encoding="utf-8", newline="")))
+            self.assertEqual([r["description"] for r in rows], ["Pagar contas"])
+
+            code, out = run_cli(["export", "--format", "jsonl"], tmpdir)
+            self.assertEqual(len(out.splitlines()), 2)  # uma linha por task
+            (tmpdir / "all.jsonl").write_text(out, encoding="utf-8")
+            code, out = run_cli(["-f", "copy.json", "import", "all.jsonl"], tmpdir)
+            self.assertEqual(code, 0)
+            self.assertIn("2 tasks importadas", out)
+            self.assertEqual(
+                json.loads((tmpdir / "copy.json").read_text(encoding="utf-8")),
+                json.loads((tmpdir / "tasks.json").read_text(encoding="utf-8")),
+            )
+
+            # reimportar: tudo duplicado
+            code, out = run_cli(["-f", "copy.json", "import", "all.jsonl"], tmpdir)
+            self.assertIn("0 tasks importadas", out)
+            self.assertIn("2 duplicadas ignoradas", out)
+
+    def test_import_errors(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            code, _ = run_cli(["import", "missing.jsonl"], tmpdir)
+            self.assertEqual(code, 4)
+            (tmpdir / "in.jsonl").write_text('{"description": "ok"}\n{ruim\n', encoding="utf-8")
+            code, out = run_cli(["import", "in.jsonl"], tmpdir)
+            self.assertEqual(code, 3)  # PARTIAL
+            self.assertIn("linha 2:", out)
+            self.assertIn("1 tasks importadas", out)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,63 @@
+import json
+import multiprocessing
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.cached_storage import CachedJsonStorage
+from task_tracker.storage.json_storage import JsonStorage
+
+WORKERS = 8
+TASKS_PER_WORKER = 15
+
+
+def add_worker(path: str, worker: int) -> None:
+    service = TaskService(JsonStorage(file_path=Path(path)))
+    for i in range(TASKS_PER_WORKER):
+        service.add(f"w{worker}-{i}")
+
+
+def done_worker(path: str, ids: list) -> None:
+    # cada worker abre o próprio storage com cache, como o board faria
+    service = TaskService(CachedJsonStorage(file_path=Path(path)))
+    for task_id in ids:
+        service.mark_done(task_id)
+
+
+def run_workers(target, args_list) -> None:
+    procs = [multiprocessing.Process(target=target, args=args) for args in args_list]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0, f"worker terminou com código {p.exitcode}"
+
+
+class ConcurrentWritersTests(unittest.TestCase):
+    def test_parallel_adds_lose_nothing(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            JsonStorage(file_path=path)
+            run_workers(add_worker, [(str(path), w) for w in range(WORKERS)])
+
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self.assertEqual(len(data), WORKERS * TASKS_PER_WORKER)
+            self.assertEqual(sorted(d["id"] for d in data),
+                             list(range(1, WORKERS * TASKS_PER_WORKER + 1)))
+            # nenhum arquivo temporário esquecido
+            self.assertEqual(list(Path(tmp).glob("*.tmp")), [])
+
+    def test_parallel_status_updates_lose_nothing(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            service = TaskService(JsonStorage(file_path=path))
+            total = WORKERS * TASKS_PER_WORKER
+            service.apply_many([{"op": "add", "description": str(i)} for i in range(total)])
+
+            chunks = [(str(path), list(range(w + 1, total + 1, WORKERS))) for w in range(WORKERS)]
+            run_workers(done_worker, chunks)
+
+            self.assertEqual(len(service.list("done")), total)
+
+if __name__ == "__main__":
+    unittest.main()
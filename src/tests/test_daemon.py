@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from task_tracker.cli.daemon import NO_DAEMON_ENV, SOCKET_ENV, TaskDaemon, forward
+from tests.test_cli import run_cli
+
+
+class DaemonTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.tmpdir = Path(self.tmp.name)
+        self.socket = self.tmpdir / "d.sock"
+        self.server = TaskDaemon(self.socket)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        env = mock.patch.dict(os.environ, {SOCKET_ENV: str(self.socket)})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.tmp.cleanup()
+
+    def test_cli_forwards_to_daemon(self):
+        code, out = run_cli(["add", "Via daemon"], self.tmpdir)
+        self.assertEqual(code, 0)
+        self.assertIn("Task added successfully (ID: 1)", out)
+
+        # o daemon mantém o arquivo aberto (em cache) entre os comandos
+        storage = self.server.storage_for(self.tmpdir / "tasks.json", None)
+        code, out = run_cli(["list"], self.tmpdir)
+        self.assertIn("Via daemon", out)
+        self.assertGreaterEqual(storage.hits, 1)
+
+        # erros mantêm o mesmo código de saída de uma execução direta
+        code, out = run_cli(["mark-done", "99"], self.tmpdir)
+        self.assertEqual(code, 4)
+        self.assertIn("99", out)
+
+    def test_daemon_sees_direct_writes(self):
+        run_cli(["add", "A"], self.tmpdir)
+        with mock.patch.dict(os.environ, {NO_DAEMON_ENV: "1"}):
+            run_cli(["add", "B"], self.tmpdir)
+        self.assertEqual(len(self.server._storages), 1)
+
+        code, out = run_cli(["list"], self.tmpdir)
+        self.assertIn("A", out)
+        self.assertIn("B", out)
+
+    def test_service_is_reused_and_closed(self):
+        server = TaskDaemon(self.tmpdir / "d2.sock")
+        file_path = self.tmpdir / "tasks.json"
+        server.run(["add", "A"], file_path)
+        server.run(["mark-done", "1"], file_path)
+        # um service por storage: o log de eventos fica com um único fd aberto
+        self.assertEqual(len(server._services), 1)
+        service = next(iter(server._services.values()))
+        self.assertIsNotNone(service.events._log_fd)
+
+        server.server_close()
+        self.assertIsNone(service.events._log_fd)
+
+    def test_parse_errors_are_returned(self):
+        code, out, err = forward(["mark-done", "x"], self.tmpdir / "tasks.json", path=self.socket)
+        self.assertEqual(code, 2)
+        self.assertIn("invalid int value", err)
+
+    def test_falls_back_without_daemon(self):
+        self.assertIsNone(forward(["list"], self.tmpdir / "tasks.json",
+                                  path=self.tmpdir / "missing.sock"))
+
+
+class LazyImportTests(unittest.TestCase):
+    def test_help_does_not_load_service_or_storages(self):
+        code = (
+            "import sys\n"
+            "from task_tracker.cli.main import main\n"
+            "try:\n"
+            "    main(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "mods = [m for m in sys.modules if m.startswith('task_tracker.')]\n"
+            "print(__import__('json').dumps(mods))\n"
+        )
+        src = Path(__file__).resolve().parent.parent
+        out = subprocess.run([sys.executable, "-c", code], cwd=src, capture_output=True,
+                             text=True, check=True).stdout
+        loaded = json.loads(out.splitlines()[-1])
+        self.assertNotIn("task_tracker.services.task_service", loaded)
+        self.assertNotIn("task_tracker.storage.sqlite_storage", loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.constants import STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
+from task_tracker.exceptions import TaskNotFound
+from task_tracker.models.transition import STATUS_UNKNOWN
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.cached_storage import CachedJsonStorage
+from task_tracker.storage.events import EVENT, EventStore, events_path
+from task_tracker.storage.mmap_storage import MmapStorage
+
+
+def steps(transitions):
+    return [(t.from_status, t.to_status) for t in transitions]
+
+
+class EventStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "tasks.json.events"
+
+    def open(self):
+        store = EventStore(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def test_history_in_file_and_memory(self):
+        changes = [
+            (1, STATUS_TODO, 1, True),
+            (2, STATUS_TODO, 2, True),
+            (1, STATUS_TODO, 3, False),  # sem mudança: ignorada
+            (1, STATUS_DONE, 4, False),
+            (1, None, 5, False),
+            (3, STATUS_DONE, 6, False),  # task anterior ao histórico
+        ]
+        for store in (EventStore(), self.open()):
+            with self.subTest(path=store.path):
+                store.append(changes[:3])
+                store.append(changes[3:])
+                self.assertEqual(
+                    steps(store.history(1)),
+                    [(None, STATUS_TODO), (STATUS_TODO, STATUS_DONE), (STATUS_DONE, None)],
+                )
+                self.assertEqual(store.history(1)[-1].at, "1970-01-01T00:00:00.000005+00:00")
+                self.assertEqual(steps(store.history(3)), [(STATUS_UNKNOWN, STATUS_DONE)])
+                self.assertEqual(store.history(99), [])
+        self.assertEqual(self.path.stat().st_size, 6 * EVENT.size)
+
+    def test_index_follows_other_writers(self):
+        reader, writer = self.open(), self.open()
+        self.assertEqual(reader.history(1), [])
+        writer.append([(1, STATUS_TODO, 1, True)])
+        self.assertEqual(len(reader.history(1)), 1)
+        writer.append([(1, STATUS_IN_PROGRESS, 2, False)])
+        # só o que foi anexado depois da última leitura é indexado
+        self.assertEqual(steps(reader.history(1))[-1], (STATUS_TODO, STATUS_IN_PROGRESS))
+        self.assertEqual(len(self.open().history(1)), 2)
+
+    def test_rebuilds_index(self):
+        store = self.open()
+        store.append([(1, STATUS_TODO, 1, True), (1, STATUS_DONE, 2, False)])
+        expected = store.history(1)
+        store.close()
+        os.remove(store.index_path)
+        self.assertEqual(self.open().history(1), expected)
+
+        # log recriado: o índice antigo não vale mais
+        self.path.unlink()
+        EventStore(self.path).append([(1, STATUS_IN_PROGRESS, 3, False)])
+        self.assertEqual(steps(self.open().history(1)), [(STATUS_UNKNOWN, STATUS_IN_PROGRESS)])
+
+    def test_torn_event_is_dropped(self):
+        self.open().append([(1, STATUS_TODO, 1, True)])
+        with self.path.open("ab") as f:
+            f.write(b"\x01\x02\x03")  # escrita interrompida por uma queda
+        self.open().append([(1, STATUS_DONE, 2, False)])
+        self.assertEqual(self.path.stat().st_size, 2 * EVENT.size)
+        self.assertEqual(steps(self.open().history(1)), [(None, STATUS_TODO), (STATUS_TODO, STATUS_DONE)])
+
+
+class ServiceHistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+
+    def test_transitions_are_recorded(self):
+        for storage in (CachedJsonStorage(file_path=self.dir / "tasks.json"),
+                        MmapStorage(file_path=self.dir / "tasks.rec")):
+            with self.subTest(storage=type(storage).__name__):
+                service = TaskService(storage)
+                task = service.add("A")
+                service.mark_in_progress(task.id)
+                service.update(task.id, "A2")  # não muda o status
+                done = service.mark_done(task.id)
+                history = service.history(task.id)
+                self.assertEqual(
+                    steps(history),
+                    [(None, STATUS_TODO), (STATUS_TODO, STATUS_IN_PROGRESS), (STATUS_IN_PROGRESS, STATUS_DONE)],
+                )
+                self.assertEqual(history[-1].at, done.updatedAt)
+                self.assertTrue(events_path(storage.file_path).exists())
+
+                service.delete(task.id)
+                self.assertEqual(service.history(task.id)[-1].to_status, None)
+                with self.assertRaises(TaskNotFound):
+                    service.history(999)
+
+    def test_batch_records_after_commit(self):
+        service = TaskService(CachedJsonStorage(file_path=self.dir / "tasks.json"))
+        with service.batch():
+            service.add("A")
+            service.mark_done(1)
+            self.assertEqual(service.events.history(1), [])
+        self.assertEqual(len(service.history(1)), 2)
+
+        with self.assertRaises(RuntimeError):
+            with service.batch():
+                service.mark_in_progress(1)
+                raise RuntimeError("falhou")
+        self.assertEqual(len(service.history(1)), 2)
+
+    def test_reused_id_starts_a_new_history(self):
+        service = TaskService(CachedJsonStorage(file_path=self.dir / "tasks.json"))
+        old = service.add("old")
+        service.mark_done(old.id)
+        service.delete(old.id)
+        new = service.add("new")
+        self.assertEqual(new.id, old.id)  # o id volta a ficar livre
+        # a história da task excluída não aparece na da nova
+        self.assertEqual(steps(service.history(1)), [(None, STATUS_TODO)])
+
+        store = EventStore()  # o mesmo em memória
+        store.append([(1, STATUS_TODO, 1, True), (1, None, 2, False), (1, STATUS_DONE, 3, True)])
+        self.assertEqual(steps(store.history(1)), [(None, STATUS_DONE)])
+
+    def test_import_records_creation(self):
+        service = TaskService(CachedJsonStorage(file_path=self.dir / "tasks.json"))
+        created = "2024-01-01T00:00:00+00:00"
+        service.import_records([{
+            "id": 7, "description": "X", "status": STATUS_DONE, "createdAt": created, "updatedAt": created,
+        }])
+        self.assertEqual(steps(service.history(7)), [(None, STATUS_DONE)])
+        self.assertEqual(service.history(7)[0].at, created)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from task_tracker.constants import STATUS_DONE
+from task_tracker.exceptions import ConcurrentModification
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.group_commit import GroupCommitStorage
+from task_tracker.storage.json_storage import DURABILITY_FSYNC, DURABILITY_NONE, JsonStorage
+
+
+def read_file(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class GroupCommitStorageTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "tasks.json"
+
+    def open(self, **kwargs):
+        kwargs.setdefault("interval", 60)
+        storage = GroupCommitStorage(file_path=self.path, **kwargs)
+        self.addCleanup(storage.close)
+        return storage
+
+    def test_burst_is_written_once_on_flush(self):
+        storage = self.open()
+        service = TaskService(storage)
+        for i in range(20):
+            service.add(f"t{i}")
+        for i in range(1, 21):
+            service.set_status(i, STATUS_DONE)
+
+        # nada gravado ainda, mas as leituras já veem as alterações
+        self.assertEqual(read_file(self.path), [])
+        self.assertEqual(service.stats()["by_status"][STATUS_DONE], 20)
+        self.assertEqual(storage.pending, 40)
+
+        storage.flush()
+        self.assertEqual(storage.commits, 1)
+        self.assertEqual([d["status"] for d in read_file(self.path)], [STATUS_DONE] * 20)
+
+    def test_size_threshold_commits(self):
+        storage = self.open(max_pending=5)
+        service = TaskService(storage)
+        for i in range(12):
+            service.add(f"t{i}")
+        self.assertEqual(storage.commits, 2)
+        self.assertEqual(len(read_file(self.path)), 10)
+        self.assertEqual(storage.pending, 2)
+
+    def test_interval_commits_in_background(self):
+        storage = self.open(interval=0.02)
+        TaskService(storage).add("A")
+        deadline = time.monotonic() + 5
+        while storage.commits == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([d["description"] for d in read_file(self.path)], ["A"])
+
+    def test_other_writers_wait_for_the_group(self):
+        storage = self.open()
+        TaskService(storage).add("A")
+        other = JsonStorage(file_path=self.path, lock_timeout=0.05)
+        with self.assertRaises(ConcurrentModification):
+            other.save_all([])
+
+        storage.flush()
+        other.save_all(other.list() + [{"id": 2, "description": "B", "status": "todo",
+                                        "createdAt": "x", "updatedAt": "x"}])
+        self.assertEqual([t.id for t in TaskService(storage).list()], [1, 2])
+
+    def test_failed_batch_keeps_earlier_mutations(self):
+        storage = self.open()
+        service = TaskService(storage)
+        service.add("A")
+        with self.assertRaises(RuntimeError):
+            with service.batch():
+                service.add("B")
+                raise RuntimeError("falha no meio do lote")
+        self.assertEqual([t.description for t in service.list()], ["A"])
+        storage.flush()
+        self.assertEqual([d["description"] for d in read_file(self.path)], ["A"])
+
+    def test_signature_changes_before_commit(self):
+        storage = self.open()
+        before = storage.signature()
+        TaskService(storage).add("A")
+        self.assertNotEqual(storage.signature(), before)
+
+
+class DurabilityTests(unittest.TestCase):
+    def test_levels(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            with mock.patch("os.fsync") as fsync:
+                JsonStorage(file_path=path, durability=DURABILITY_NONE).save_all([])
+                self.assertEqual(fsync.call_count, 0)
+                # arquivo temporário + diretório
+                JsonStorage(file_path=path, durability=DURABILITY_FSYNC).save_all([])
+                self.assertEqual(fsync.call_count, 2)
+
+    def test_unknown_level(self):
+        with TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                JsonStorage(file_path=Path(tmp) / "tasks.json", durability="always")
+
+
+if __name__ == "__main__":
+    unittest.main()
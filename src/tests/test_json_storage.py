@@ -4,6 +4,7 @@ import os
 import unittest
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from task_tracker.exceptions import ConcurrentModification
 from task_tracker.storage.json_storage import JsonStorage
 
 class JsonStorageTests(unittest.TestCase):
@@ -39,5 +40,31 @@ class JsonStorageTests(unittest.TestCase):
             # JsonStorage por padrão cria no __init__, mas se removermos depois,
             # a leitura deve tolerar e retornar [] sem quebrar.
 
+    def test_save_all_detects_concurrent_modification(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            mine = JsonStorage(file_path=path)
+            other = JsonStorage(file_path=path)
+            mine.list()
+            other.list()
+            other.save_all([{"id": 1, "description": "B", "status": "todo",
+                             "createdAt": "x", "updatedAt": "x"}])
+
+            with self.assertRaises(ConcurrentModification):
+                mine.save_all([])
+            # depois de reler, a escrita volta a ser aceita
+            mine.list()
+            mine.save_all([])
+            self.assertEqual(other.list(), [])
+
+    def test_lock_times_out_with_conflict(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            holder = JsonStorage(file_path=path)
+            waiter = JsonStorage(file_path=path, lock_timeout=0.05)
+            with holder.lock():
+                with self.assertRaises(ConcurrentModification):
+                    waiter.save_all([])
+
 if __name__ == "__main__":
     unittest.main()
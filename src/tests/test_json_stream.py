@@ -0,0 +1,53 @@
+import io
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from task_tracker.storage.json_stream import iter_json_array
+from task_tracker.storage.json_storage import JsonStorage
+
+
+class IterJsonArrayTests(unittest.TestCase):
+    def test_matches_json_load_for_any_chunk_size(self):
+        data = [
+            {"id": 1, "description": "colchetes ] e vírgulas, no texto", "status": "todo"},
+            {"id": 2, "description": 'aspas " escapadas e \\ barra', "status": "done"},
+            12345, "texto", [1, [2]], None,
+        ]
+        for text in (json.dumps(data), json.dumps(data, indent=2, ensure_ascii=False)):
+            for chunk_size in (1, 2, 7, 64, 65536):
+                items = list(iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+                self.assertEqual(items, data, (chunk_size, text[:20]))
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(list(iter_json_array(io.StringIO("  [ ]  "))), [])
+        for bad in ("", "{ invalid json", "[1, 2", "[1 2]", '{"a": 1}'):
+            with self.assertRaises(json.JSONDecodeError):
+                list(iter_json_array(io.StringIO(bad), chunk_size=3))
+
+    def test_yields_before_reading_everything(self):
+        text = json.dumps([{"id": i, "description": "x" * 50} for i in range(2000)])
+        f = io.StringIO(text)
+        first = next(iter_json_array(f, chunk_size=1024))
+        self.assertEqual(first["id"], 0)
+        self.assertLess(f.tell(), len(text) // 10)
+
+
+class JsonStorageStreamingTests(unittest.TestCase):
+    def test_iter_records_filters_and_tolerates_errors(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = JsonStorage(file_path=path)
+            payload = [{"id": i, "description": "A", "status": s, "createdAt": "x", "updatedAt": "x"}
+                       for i, s in enumerate(["todo", "done", "done"], start=1)]
+            storage.save_all(payload)
+            self.assertEqual([d["id"] for d in storage.iter_records("done")], [2, 3])
+
+            path.write_text("{ invalid json", encoding="utf-8")
+            self.assertEqual(list(storage.iter_records()), [])
+            path.unlink()
+            self.assertEqual(list(storage.iter_records()), [])
+            self.assertTrue(path.exists())
+
+if __name__ == "__main__":
+    unittest.main()
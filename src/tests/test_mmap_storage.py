@@ -0,0 +1,125 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.constants import STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
+from task_tracker.exceptions import TaskNotFound
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.factory import open_storage
+from task_tracker.storage.mmap_storage import INITIAL_SLOTS, MmapStorage, main
+
+
+def make_task(task_id, status=STATUS_TODO, description="x"):
+    return {"id": task_id, "description": description, "status": status,
+            "createdAt": "2024-01-01T10:00:00+00:00",
+            "updatedAt": "2024-01-02T10:00:00.500000+00:00"}
+
+
+class MmapStorageTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "tasks.rec"
+
+    def open(self):
+        storage = MmapStorage(file_path=self.path)
+        self.addCleanup(storage.close)
+        return storage
+
+    def test_service_round_trip(self):
+        service = TaskService(self.open())
+        a = service.add("Comprar pão")
+        service.add("Revisar relatório 🚀")
+        service.mark_in_progress(2)
+        done = service.mark_done(1)
+        service.update(2, "Revisar orçamento")
+
+        self.assertEqual(done.status, STATUS_DONE)
+        self.assertEqual(done.createdAt, a.createdAt)
+        self.assertEqual([t.description for t in service.list()], ["Comprar pão", "Revisar orçamento"])
+        self.assertEqual([t.id for t in service.list(STATUS_IN_PROGRESS)], [2])
+
+        service.delete(1)
+        with self.assertRaises(TaskNotFound):
+            service.get(1)
+        # ids de tasks excluídas não são reutilizados
+        self.assertEqual(service.add("C").id, 3)
+
+    def test_persists_across_instances(self):
+        storage = self.open()
+        storage.insert(make_task(None, description="A"))
+        storage.insert(make_task(5, STATUS_DONE, "B"))
+        other = self.open()
+        self.assertEqual(other.get(5), make_task(5, STATUS_DONE, "B"))
+        self.assertIsNone(other.get(3))
+        self.assertEqual(other.max_id(), 5)
+        # a outra instância vê alterações no lugar sem reabrir
+        storage.patch(1, {"status": STATUS_DONE})
+        self.assertEqual(other.get(1)["status"], STATUS_DONE)
+        self.assertNotEqual(other.signature(), 0)
+
+    def test_grows_past_initial_capacity(self):
+        storage = self.open()
+        other = self.open()
+        last = INITIAL_SLOTS * 3
+        storage.insert(make_task(last))
+        self.assertEqual(other.get(last)["id"], last)
+        self.assertEqual(other.max_id(), last)
+
+    def test_duplicate_and_invalid_input(self):
+        storage = self.open()
+        storage.insert(make_task(1))
+        with self.assertRaises(ValueError):
+            storage.insert(make_task(1))
+        with self.assertRaises(ValueError):
+            storage.insert(make_task(2, status="blocked"))
+        with self.assertRaises(ValueError):
+            storage.patch(1, {"priority": 1})
+        self.assertIsNone(storage.patch(9, {"status": STATUS_DONE}))
+        self.assertFalse(storage.remove(9))
+        # ids muito acima do maior fariam o arquivo crescer gigabytes
+        with self.assertRaises(ValueError):
+            storage.insert(make_task(10 ** 12))
+
+    def test_max_id_is_the_high_water_mark(self):
+        storage = self.open()
+        for _ in range(3):
+            storage.insert(make_task(None))
+        storage.remove(3)
+        # o id 3 não volta: nem o storage nem o serviço o reutilizam
+        self.assertEqual(storage.max_id(), 3)
+        self.assertEqual(TaskService(storage).add("D").id, 4)
+
+    def test_page_stats_and_iter(self):
+        storage = self.open()
+        for i in range(1, 8):
+            storage.insert(make_task(i, STATUS_DONE if i % 2 else STATUS_TODO))
+        storage.remove(3)
+        page = storage.page(STATUS_DONE, "id", descending=True, limit=2, after=(7, 7))
+        self.assertEqual([d["id"] for d in page], [5, 1])
+        self.assertEqual([d["id"] for d in storage.iter(STATUS_TODO)], [2, 4, 6])
+        stats = storage.stats()
+        self.assertEqual(stats["by_status"], {"todo": 3, "in-progress": 0, "done": 3})
+        self.assertEqual(stats["created_per_day"], {"2024-01-01": 6})
+        self.assertEqual(stats["completed_per_day"], {"2024-01-02": 3})
+
+    def test_rejects_foreign_file(self):
+        self.path.write_bytes(b"[]" * 40)
+        with self.assertRaises(ValueError):
+            MmapStorage(file_path=self.path)
+
+    def test_factory_and_import(self):
+        source = Path(self.tmp.name) / "tasks.json"
+        source.write_text('[{"id": 2, "description": "A", "status": "todo", '
+                          '"createdAt": "2024-01-01T10:00:00+00:00", '
+                          '"updatedAt": "2024-01-01T10:00:00+00:00"}]', encoding="utf-8")
+        self.assertEqual(main([str(source), str(self.path)]), 0)
+        storage = open_storage(self.path)
+        self.addCleanup(storage.close)
+        self.assertIsInstance(storage, MmapStorage)
+        self.assertEqual(storage.get(2)["description"], "A")
+        self.assertEqual(main([str(source), str(self.path)]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
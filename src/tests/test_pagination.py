@@ -0,0 +1,123 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.exceptions import InvalidCursor
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.base import page_records
+from task_tracker.storage.cached_storage import CachedJsonStorage
+from task_tracker.storage.json_storage import JsonStorage
+from task_tracker.storage.record_set import RecordSet
+from task_tracker.storage.sqlite_storage import SqliteStorage
+from task_tracker.storage.wal_storage import WalStorage
+from task_tracker.utils.cursor import decode_cursor, encode_cursor
+
+
+def make_task(task_id, updated, status="todo"):
+    return {"id": task_id, "description": f"T{task_id}", "status": status,
+            "createdAt": f"2024-01-{task_id:02d}T00:00:00+00:00", "updatedAt": updated}
+
+
+# updatedAt repetido em 2/3 e 5/6 para exercitar o desempate por id
+RECORDS = [
+    make_task(1, "2024-02-05T00:00:00+00:00"),
+    make_task(2, "2024-02-01T00:00:00+00:00", "done"),
+    make_task(3, "2024-02-01T00:00:00+00:00"),
+    make_task(4, "2024-02-09T00:00:00+00:00"),
+    make_task(5, "2024-02-03T00:00:00+00:00", "done"),
+    make_task(6, "2024-02-03T00:00:00+00:00"),
+]
+
+
+def walk(service, **kwargs):
+    """Percorre todas as páginas e devolve os ids por página."""
+    pages, cursor = [], None
+    while True:
+        page = service.page(cursor=cursor, **kwargs)
+        pages.append([t.id for t in page.tasks])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+class RecordSetPageTests(unittest.TestCase):
+    def test_sorted_keys_follow_mutations(self):
+        records = RecordSet(RECORDS)
+        self.assertEqual([d["id"] for d in records.page(sort_by="updatedAt", limit=3)], [2, 3, 5])
+        self.assertEqual([d["id"] for d in records.page("todo", "updatedAt", descending=True)],
+                         [4, 1, 6, 3])
+
+        records.patch(4, {"updatedAt": "2024-01-01T00:00:00+00:00", "status": "done"})
+        records.pop(2)
+        records.insert({**make_task(7, "2024-03-01T00:00:00+00:00"), "id": None})
+        self.assertEqual([d["id"] for d in records.page(sort_by="updatedAt")], [4, 3, 5, 6, 1, 7])
+        self.assertEqual([d["id"] for d in records.page("todo", "updatedAt")], [3, 6, 1, 7])
+        # índices mantidos batem com uma ordenação do zero
+        self.assertEqual(records.page(sort_by="updatedAt"),
+                         page_records(records.iter(), "updatedAt"))
+
+
+class ServicePageTests(unittest.TestCase):
+    def backends(self, tmpdir: Path):
+        yield "json", JsonStorage(file_path=tmpdir / "a.json")
+        yield "cached", CachedJsonStorage(file_path=tmpdir / "b.json")
+        yield "wal", WalStorage(file_path=tmpdir / "c.json")
+        yield "sqlite", SqliteStorage(file_path=tmpdir / "d.db")
+
+    def test_backends_agree(self):
+        with TemporaryDirectory() as tmp:
+            for name, storage in self.backends(Path(tmp)):
+                with self.subTest(backend=name):
+                    storage.save_all([dict(d) for d in RECORDS])
+                    service = TaskService(storage)
+                    self.assertEqual(walk(service, sort_by="updatedAt", limit=2),
+                                     [[2, 3], [5, 6], [1, 4]])
+                    self.assertEqual(walk(service, sort_by="updatedAt", order="desc", limit=4),
+                                     [[4, 1, 6, 5], [3, 2]])
+                    self.assertEqual(walk(service, status="done", limit=1), [[2], [5]])
+                    self.assertEqual([t.id for t in service.list(sort_by="createdAt", order="desc", limit=2)],
+                                     [6, 5])
+                    close = getattr(storage, "close", None)
+                    if close is not None:
+                        close()
+
+    def test_cursor_survives_deletes_and_inserts(self):
+        service = TaskService(RecordSetStorage())
+        for _ in range(5):
+            service.add("x")
+        first = service.page(limit=2)
+        service.delete(2)   # último item da página já entregue
+        service.add("y")    # entra no fim
+        self.assertEqual([t.id for t in service.page(limit=10, cursor=first.next_cursor).tasks],
+                         [3, 4, 5, 6])
+
+    def test_bad_cursor(self):
+        service = TaskService(RecordSetStorage())
+        with self.assertRaises(InvalidCursor):
+            service.page(cursor="não-é-cursor")
+        token = encode_cursor("id", (3, 3))
+        self.assertEqual(decode_cursor(token, "id"), (3, 3))
+        with self.assertRaises(InvalidCursor):
+            service.page(sort_by="updatedAt", cursor=token)
+
+
+class RecordSetStorage:
+    """Storage granular mínimo sem ``page()``: o serviço usa ``page_records``."""
+    def __init__(self):
+        self.records = RecordSet()
+    def get(self, task_id):
+        return self.records.get(task_id)
+    def insert(self, task):
+        return self.records.insert(task)
+    def patch(self, task_id, fields):
+        return self.records.patch(task_id, fields)
+    def remove(self, task_id):
+        return self.records.pop(task_id) is not None
+    def iter(self, status=None):
+        return self.records.iter(status)
+    def max_id(self):
+        return self.records.max_id()
+
+
+if __name__ == "__main__":
+    unittest.main()
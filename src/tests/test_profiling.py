@@ -0,0 +1,67 @@
+import time
+import unittest
+
+from task_tracker.services.task_service import TaskService
+from task_tracker.utils import profiling
+
+
+class MemoryStorage:
+    def __init__(self):
+        self._data = []
+
+    def list(self):
+        return self._data
+
+    def save_all(self, tasks):
+        self._data = tasks
+
+
+class ProfilingTests(unittest.TestCase):
+    def test_nested_phases_report_self_time(self):
+        stats = profiling.PhaseStats()
+        with profiling.hooked(stats):
+            with profiling.phase("outer"):
+                with profiling.phase("inner"):
+                    sum(range(100_000))
+                start = time.perf_counter()
+                sum(range(100_000))
+                profiling.record("loop", time.perf_counter() - start)
+                profiling.count("items", 3)
+        self.assertEqual(stats.calls, {"inner": 1, "loop": 1, "outer": 1})
+        # o tempo das fases internas não entra no da externa
+        self.assertLess(stats.seconds["outer"], stats.seconds["inner"])
+        self.assertGreaterEqual(stats.seconds["outer"], 0)
+        self.assertEqual(stats.counts, {"items": 3})
+
+    def test_timed_iter_excludes_consumer(self):
+        stats = profiling.PhaseStats()
+        with profiling.hooked(stats):
+            for _ in profiling.timed_iter("produce", iter(range(3))):
+                with profiling.phase("consume"):
+                    pass
+        self.assertEqual(stats.calls, {"consume": 3, "produce": 1})
+
+    def test_disabled_without_hooks(self):
+        stats = profiling.PhaseStats()
+        with profiling.hooked(stats):
+            pass
+        service = TaskService(MemoryStorage())
+        service.add("A")
+        self.assertFalse(profiling.enabled())
+        self.assertEqual(stats.calls, {})
+
+    def test_service_phases(self):
+        service = TaskService(MemoryStorage())
+        service.add("A")
+        stats = profiling.PhaseStats()
+        with profiling.hooked(stats):
+            service.mark_done(1)
+            service.list()
+        self.assertIn("service.set_status", stats.calls)
+        self.assertIn("service.list", stats.calls)
+        self.assertEqual(stats.counts["tasks.converted"], 1)
+        self.assertIn("(outros)", stats.format(1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
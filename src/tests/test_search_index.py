@@ -0,0 +1,122 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.services.search_index import SearchIndex, index_path
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.cached_storage import CachedJsonStorage
+from task_tracker.storage.json_storage import JsonStorage
+from task_tracker.storage.sqlite_storage import SqliteStorage
+from task_tracker.utils.text import fold, tokenize
+
+
+def make_task(task_id, description, status="todo"):
+    return {"id": task_id, "description": description, "status": status,
+            "createdAt": "x", "updatedAt": "x"}
+
+
+class TextTests(unittest.TestCase):
+    def test_fold_and_tokenize(self):
+        self.assertEqual(fold("AÇÃO Você"), "acao voce")
+        self.assertEqual(tokenize("Revisar relatório, já!"), ["revisar", "relatorio", "ja"])
+
+
+class SearchIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.sync([
+            make_task(1, "Revisar relatório mensal"),
+            make_task(2, "Relatório de vendas", "done"),
+            make_task(3, "Comprar pão"),
+            make_task(4, "Relatar bug do relatório relatório"),
+        ])
+
+    def ids(self, query, **kwargs):
+        return [task_id for task_id, _ in self.index.search(query, **kwargs)]
+
+    def test_accents_prefixes_and_all_words(self):
+        self.assertEqual(self.ids("PAO"), [3])
+        self.assertEqual(sorted(self.ids("relat")), [1, 2, 4])
+        self.assertEqual(self.ids("rev relat"), [1])
+        self.assertEqual(self.ids("relatorio inexistente"), [])
+        self.assertEqual(self.ids("   "), [])
+
+    def test_ranking_status_and_limit(self):
+        # termo repetido pesa mais; match exato vence prefixo
+        self.assertEqual(self.ids("relatorio")[0], 4)
+        self.assertEqual(self.ids("relatorio", status="done"), [2])
+        self.assertEqual(len(self.ids("relat", limit=2)), 2)
+
+    def test_sync_reindexes_only_changes(self):
+        changed = self.index.sync([
+            make_task(1, "Revisar relatório mensal"),
+            make_task(2, "Relatório de vendas", "todo"),
+            make_task(3, "Comprar leite"),
+        ])
+        self.assertEqual(changed, 3)  # 2 (status), 3 (texto) e 4 (removida)
+        self.assertEqual(self.ids("pao"), [])
+        self.assertEqual(self.ids("leite"), [3])
+        self.assertEqual(self.ids("relatorio", status="todo"), [1, 2])
+
+    def test_save_and_load(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json.idx"
+            self.index.path = path
+            self.index.save()
+            loaded = SearchIndex.load(path)
+            self.assertEqual(len(loaded), 4)
+            self.assertFalse(loaded.dirty)
+            self.assertEqual(loaded.search("rev"), self.index.search("rev"))
+
+            path.write_text("{corrompido", encoding="utf-8")
+            self.assertEqual(len(SearchIndex.load(path)), 0)
+
+
+class ServiceSearchTests(unittest.TestCase):
+    def check_backend(self, storage):
+        index = SearchIndex()
+        service = TaskService(storage, index=index)
+        a = service.add("Estudar Python")
+        b = service.add("Estudar álgebra")
+        service.mark_done(a.id)
+        self.assertEqual([t.id for t in service.search("estud", status="done")], [a.id])
+        service.update(b.id, "Ler livro")
+        self.assertEqual([t.id for t in service.search("estudar")], [a.id])
+        service.delete(a.id)
+        self.assertEqual(service.search("estudar"), [])
+
+        # sem mudanças no storage, a busca não relê os registros
+        signature = index.signature
+        self.assertIsNotNone(signature)
+        service.search("ler")
+        self.assertEqual(index.signature, signature)
+        return service
+
+    def test_json_cached_and_sqlite(self):
+        with TemporaryDirectory() as tmp:
+            tmpdir = Path(tmp)
+            self.check_backend(JsonStorage(file_path=tmpdir / "a.json"))
+            self.check_backend(CachedJsonStorage(file_path=tmpdir / "b.json"))
+            storage = SqliteStorage(file_path=tmpdir / "c.db")
+            self.check_backend(storage)
+            storage.close()
+
+    def test_picks_up_writes_from_other_processes(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            service = TaskService(CachedJsonStorage(file_path=path), index=SearchIndex())
+            service.add("Pagar conta")
+            self.assertEqual(len(service.search("pagar")), 1)
+            # outro processo reescreve o arquivo diretamente
+            path.write_text(json.dumps([make_task(1, "Pagar aluguel"), make_task(2, "Pagar luz")]),
+                            encoding="utf-8")
+            self.assertEqual([t.description for t in service.search("pagar")],
+                             ["Pagar aluguel", "Pagar luz"])
+
+    def test_index_path(self):
+        self.assertEqual(index_path(Path("/x/tasks.json")), Path("/x/tasks.json.idx"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import io
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.constants import STATUS_DONE
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.json_storage import JsonStorage
+from task_tracker.storage.serializers import (
+    FORMAT_BINARY,
+    FORMAT_JSON,
+    FORMAT_JSON_COMPACT,
+    FORMAT_JSONL,
+    FORMATS,
+    SERIALIZERS,
+    serializer_for,
+)
+
+RECORDS = [
+    {"id": 1, "description": "Comprar pão", "status": "todo",
+     "createdAt": "2024-01-01T10:00:00+00:00", "updatedAt": "2024-01-01T10:00:00+00:00"},
+    {"id": 2, "description": "linha\nquebrada \"aspas\" 🚀", "status": "done",
+     "createdAt": "2024-01-02T10:00:00+00:00", "updatedAt": "2024-01-03T10:00:00+00:00"},
+]
+
+
+def dump(name, records):
+    buf = io.BytesIO()
+    SERIALIZERS[name].dump(records, buf)
+    return buf.getvalue()
+
+
+class SerializerTests(unittest.TestCase):
+    def test_round_trip_every_format(self):
+        for name in FORMATS:
+            with self.subTest(name):
+                data = dump(name, RECORDS)
+                self.assertEqual(SERIALIZERS[name].load(io.BytesIO(data)), RECORDS)
+                self.assertEqual(list(SERIALIZERS[name].iter(io.BytesIO(data))), RECORDS)
+                self.assertEqual(SERIALIZERS[name].load(io.BytesIO(dump(name, []))), [])
+
+    def test_compact_formats_are_smaller(self):
+        indented = len(dump(FORMAT_JSON, RECORDS))
+        for name in (FORMAT_JSON_COMPACT, FORMAT_JSONL, FORMAT_BINARY):
+            self.assertLess(len(dump(name, RECORDS)), indented)
+
+    def test_corrupted_data_raises_value_error(self):
+        binary = dump(FORMAT_BINARY, RECORDS)
+        for name, data in [(FORMAT_BINARY, binary[:-3]), (FORMAT_BINARY, b"nope"),
+                           (FORMAT_JSONL, dump(FORMAT_JSONL, RECORDS)[:-5])]:
+            with self.subTest(name):
+                with self.assertRaises(ValueError):
+                    SERIALIZERS[name].load(io.BytesIO(data))
+
+    def test_picked_by_extension_or_name(self):
+        self.assertEqual(serializer_for(Path("t.json")).name, FORMAT_JSON)
+        self.assertEqual(serializer_for(Path("t.jsonl")).name, FORMAT_JSONL)
+        self.assertEqual(serializer_for(Path("t.tbin")).name, FORMAT_BINARY)
+        self.assertEqual(serializer_for(Path("t.json"), FORMAT_JSON_COMPACT).name, FORMAT_JSON_COMPACT)
+        with self.assertRaises(ValueError):
+            serializer_for(Path("t.json"), "xml")
+
+
+class StorageFormatTests(unittest.TestCase):
+    def test_service_over_each_format(self):
+        with TemporaryDirectory() as tmp:
+            for name in ("tasks.jsonl", "tasks.tbin"):
+                with self.subTest(name):
+                    path = Path(tmp) / name
+                    service = TaskService(JsonStorage(file_path=path))
+                    service.add("A")
+                    service.add("B")
+                    service.mark_done(2)
+
+                    # outra instância lê o mesmo arquivo pelo formato da extensão
+                    storage = JsonStorage(file_path=path)
+                    self.assertEqual([d["id"] for d in storage.iter_records(STATUS_DONE)], [2])
+                    self.assertEqual(storage.stats()["total"], 2)
+                    self.assertNotEqual(path.read_bytes()[:1], b"[")
+
+    def test_corrupted_file_reads_as_empty(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.tbin"
+            path.write_bytes(b"lixo")
+            self.assertEqual(JsonStorage(file_path=path).list(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.constants import STATUS_DONE, STATUS_IN_PROGRESS, STATUS_TODO
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.factory import open_storage
+from task_tracker.storage.sharded_storage import MANIFEST_NAME, ShardedStorage, main
+
+
+def make_task(task_id, status=STATUS_TODO, created="2024-01-01T10:00:00+00:00"):
+    return {"id": task_id, "description": f"Task {task_id}", "status": status,
+            "createdAt": created, "updatedAt": created}
+
+
+class ShardedStorageTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "tasks.shards"
+
+    def open(self, shard_size=4):
+        storage = ShardedStorage(file_path=self.path, shard_size=shard_size, workers=4)
+        self.addCleanup(storage.close)
+        return storage
+
+    def manifest(self):
+        return json.loads((self.path / MANIFEST_NAME).read_text(encoding="utf-8"))["shards"]
+
+    def test_splits_and_routes_by_id(self):
+        storage = self.open()
+        service = TaskService(storage)
+        for i in range(1, 11):
+            service.add(f"T{i}")
+        service.mark_done(3)
+        service.mark_in_progress(9)
+
+        # nenhum shard passa do limite e as faixas cobrem todos os ids
+        self.assertGreater(len(self.manifest()), 1)
+        self.assertTrue(all(n <= 4 for n in storage.shard_sizes()))
+        self.assertEqual([t.id for t in service.list()], list(range(1, 11)))
+        self.assertEqual([t.id for t in service.list(STATUS_DONE)], [3])
+        self.assertEqual(storage.stats()["by_status"],
+                         {STATUS_TODO: 8, STATUS_DONE: 1, STATUS_IN_PROGRESS: 1})
+        # cada task está gravada em um único arquivo
+        on_disk = [d["id"] for f in self.path.glob("shard-*.json")
+                   for d in json.loads(f.read_text(encoding="utf-8"))]
+        self.assertEqual(sorted(on_disk), list(range(1, 11)))
+
+    def test_other_instance_follows_splits(self):
+        storage = self.open()
+        other = self.open()
+        for i in range(1, 4):
+            storage.insert(make_task(None))
+        self.assertEqual(other.get(2)["id"], 2)
+        for i in range(4, 12):
+            storage.insert(make_task(None))
+        # a outra instância relê o manifesto e grava no shard certo
+        other.patch(10, {"status": STATUS_DONE})
+        self.assertEqual(storage.get(10)["status"], STATUS_DONE)
+        self.assertEqual(other.insert(make_task(None))["id"], 12)
+        self.assertEqual(storage.max_id(), 12)
+
+    def test_page_merges_shards(self):
+        storage = self.open()
+        tasks = [make_task(i, created=f"2024-01-{31 - i:02d}T10:00:00+00:00") for i in range(1, 21)]
+        storage.save_all(tasks)
+        self.assertGreater(len(self.manifest()), 1)
+        first = storage.page(sort_by="createdAt", limit=5)
+        self.assertEqual([d["id"] for d in first], [20, 19, 18, 17, 16])
+        after = (first[-1]["createdAt"], first[-1]["id"])
+        self.assertEqual([d["id"] for d in storage.page(sort_by="createdAt", limit=3, after=after)],
+                         [15, 14, 13])
+        self.assertEqual([d["id"] for d in storage.page(descending=True, limit=2)], [20, 19])
+
+    def test_page_skips_stale_copies_before_the_limit(self):
+        storage = self.open()
+        storage.save_all([make_task(i) for i in range(1, 9)])
+        first, second = self.manifest()[:2]
+        # cópia antiga deixada por um split interrompido: ids do segundo shard no primeiro
+        stale = self.path / first["file"]
+        records = json.loads(stale.read_text(encoding="utf-8"))
+        records += [make_task(i, created="2023-01-01T10:00:00+00:00")
+                    for i in range(second["start"], second["start"] + 2)]
+        stale.write_text(json.dumps(records), encoding="utf-8")
+
+        page = storage.page(sort_by="createdAt", limit=3)
+        self.assertEqual([d["id"] for d in page], [1, 2, 3])
+
+    def test_batch_rolls_back_every_shard(self):
+        storage = self.open()
+        storage.save_all([make_task(i) for i in range(1, 13)])
+        with self.assertRaises(RuntimeError):
+            with storage.batch():
+                storage.remove(1)
+                storage.patch(12, {"status": STATUS_DONE})
+                raise RuntimeError("falhou")
+        self.assertIsNotNone(storage.get(1))
+        self.assertEqual(storage.get(12)["status"], STATUS_TODO)
+
+    def test_rebalance_merges_small_shards(self):
+        storage = self.open(shard_size=8)
+        storage.save_all([make_task(i) for i in range(1, 31)])
+        shards = len(self.manifest())
+        for i in range(3, 31):
+            storage.remove(i)
+        storage.rebalance()
+        self.assertLess(len(self.manifest()), shards)
+        self.assertEqual(len(list(self.path.glob("shard-*.json"))), len(self.manifest()))
+        self.assertEqual([d["id"] for d in storage.list()], [1, 2])
+        # ids novos continuam depois do maior id já usado na última faixa
+        self.assertGreater(storage.insert(make_task(None))["id"], 2)
+
+    def test_factory_and_import(self):
+        source = Path(self.tmp.name) / "tasks.json"
+        source.write_text(json.dumps([make_task(i) for i in range(1, 10)]), encoding="utf-8")
+        self.assertEqual(main([str(source), str(self.path), "3"]), 0)
+        # um diretório com tasks não é sobrescrito
+        self.assertEqual(main([str(source), str(self.path)]), 1)
+        storage = open_storage(self.path)
+        self.addCleanup(storage.close)
+        self.assertIsInstance(storage, ShardedStorage)
+        self.assertEqual(len(storage.list()), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import json
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from task_tracker.constants import STATUS_DONE
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.sqlite_storage import SqliteStorage
+from task_tracker.utils.time import iso_to_micros
+
+
+class SqliteStorageTests(unittest.TestCase):
+    def test_schema_indexes_and_wal_mode(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.db"
+            storage = SqliteStorage(file_path=path)
+            storage.close()
+
+            conn = sqlite3.connect(str(path))
+            indexes = {r[1] for r in conn.execute("PRAGMA index_list(tasks)")}
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            conn.close()
+            self.assertTrue({"idx_tasks_status", "idx_tasks_updatedUs"} <= indexes)
+            self.assertEqual(mode, "wal")
+
+    def test_service_roundtrip(self):
+        with TemporaryDirectory() as tmp:
+            storage = SqliteStorage(file_path=Path(tmp) / "tasks.db")
+            service = TaskService(storage)
+            a = service.add("A")
+            b = service.add("B")
+            service.mark_done(b.id)
+            service.update(a.id, "A2")
+
+            self.assertEqual([t.id for t in service.list(STATUS_DONE)], [b.id])
+            self.assertEqual(service.get(a.id).description, "A2")
+
+            # AUTOINCREMENT: ids removidos não são reutilizados
+            service.delete(b.id)
+            self.assertEqual(service.add("C").id, 3)
+            storage.close()
+
+    def test_patch_rejects_unknown_fields(self):
+        with TemporaryDirectory() as tmp:
+            storage = SqliteStorage(file_path=Path(tmp) / "tasks.db")
+            with self.assertRaises(ValueError):
+                storage.patch(1, {"status; DROP TABLE tasks": "x"})
+            self.assertIsNone(storage.patch(1, {"status": "done"}))
+            storage.close()
+
+    def test_batch_is_one_transaction(self):
+        with TemporaryDirectory() as tmp:
+            storage = SqliteStorage(file_path=Path(tmp) / "tasks.db")
+            service = TaskService(storage)
+            with self.assertRaises(RuntimeError):
+                with service.batch():
+                    service.add("A")
+                    raise RuntimeError("boom")
+            self.assertEqual(service.list(), [])
+
+            # o rollback também desfaz o sqlite_sequence: o id 1 é alocado de novo
+            results = service.apply_many([{"op": "add", "description": "A"},
+                                          {"op": "mark-done", "id": 1}])
+            self.assertEqual([r["ok"] for r in results], [True, True])
+            self.assertEqual(results[0]["id"], 1)
+            storage.close()
+
+    def test_import_json(self):
+        with TemporaryDirectory() as tmp:
+            src = Path(tmp) / "tasks.json"
+            payload = [{"id": 7, "description": "A", "status": "todo",
+                        "createdAt": "x", "updatedAt": "x"}]
+            src.write_text(json.dumps(payload), encoding="utf-8")
+
+            storage = SqliteStorage(file_path=Path(tmp) / "tasks.db")
+            self.assertEqual(storage.import_json(src), 1)
+            self.assertEqual(storage.list(), payload)
+            self.assertEqual(storage.insert({**payload[0], "id": None})["id"], 8)
+
+            # importar de novo não sobrescreve: recusa tudo
+            storage.patch(7, {"description": "editada"})
+            with self.assertRaises(ValueError):
+                storage.import_json(src)
+            self.assertEqual(storage.get(7)["description"], "editada")
+            self.assertEqual(len(storage.list()), 2)
+            storage.close()
+
+    def test_mixed_offsets_filter_and_sort_by_time(self):
+        with TemporaryDirectory() as tmp:
+            src = Path(tmp) / "tasks.json"
+            times = ["2024-03-03T12:00:00+00:00",  # 12:00 UTC
+                     "2024-03-03T13:00:00+03:00",  # 10:00 UTC
+                     "2024-03-03T11:00:00Z",       # 11:00 UTC
+                     "2024-03-02T23:30:00-02:00"]  # 01:30 UTC do dia 3
+            payload = [{"id": i, "description": "A", "status": "todo", "createdAt": at, "updatedAt": at}
+                       for i, at in enumerate(times, 1)]
+            src.write_text(json.dumps(payload), encoding="utf-8")
+
+            storage = SqliteStorage(file_path=Path(tmp) / "tasks.db")
+            storage.import_json(src)
+            since = iso_to_micros("2024-03-03T10:30:00+00:00")
+            self.assertEqual([d["id"] for d in storage.between("updatedAt", since=since)], [3, 1])
+            self.assertEqual([d["id"] for d in storage.page(sort_by="createdAt")], [4, 2, 3, 1])
+            after = (iso_to_micros(times[1]), 2)
+            self.assertEqual([d["id"] for d in storage.page(sort_by="createdAt", after=after)], [3, 1])
+            # o texto original é devolvido sem alteração
+            self.assertEqual(storage.get(2)["createdAt"], times[1])
+
+            storage.patch(1, {"updatedAt": "2024-03-03T09:00:00+00:00"})
+            self.assertEqual([d["id"] for d in storage.between("updatedAt", since=since)], [3])
+            storage.close()
+
+    def test_adds_micros_columns_to_old_database(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.db"
+            conn = sqlite3.connect(str(path))
+            conn.executescript("""
+                CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, description TEXT NOT NULL,
+                    status TEXT NOT NULL, createdAt TEXT NOT NULL, updatedAt TEXT NOT NULL);
+                CREATE INDEX idx_tasks_updatedAt ON tasks(updatedAt);
+                INSERT INTO tasks VALUES (1, 'A', 'todo', '2024-03-03T13:00:00+03:00', '2024-03-03T13:00:00+03:00');
+                INSERT INTO tasks VALUES (2, 'B', 'todo', '2024-03-03T11:00:00Z', '2024-03-03T11:00:00Z');
+            """)
+            conn.close()
+
+            storage = SqliteStorage(file_path=path)
+            self.assertEqual([d["id"] for d in storage.page(sort_by="updatedAt")], [1, 2])
+            storage.close()
+            conn = sqlite3.connect(str(path))
+            indexes = {r[1] for r in conn.execute("PRAGMA index_list(tasks)")}
+            conn.close()
+            self.assertNotIn("idx_tasks_updatedAt", indexes)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import json
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.cached_storage import CachedJsonStorage
+from task_tracker.storage.json_storage import JsonStorage
+from task_tracker.storage.sqlite_storage import SqliteStorage
+from task_tracker.storage.stats import TaskCounters
+from task_tracker.storage.wal_storage import WalStorage
+
+
+def make_task(task_id, status="todo", created="2024-01-01T10:00:00+00:00",
+              updated="2024-01-02T10:00:00+00:00"):
+    return {"id": task_id, "description": "x", "status": status,
+            "createdAt": created, "updatedAt": updated}
+
+
+class TaskCountersTests(unittest.TestCase):
+    def test_add_and_discard(self):
+        counters = TaskCounters([make_task(1), make_task(2, "done")])
+        counters.discard(make_task(2, "done"))
+        counters.add(make_task(3, "done", updated="2024-01-05T00:00:00+00:00"))
+        self.assertEqual(counters.to_dict(), {
+            "total": 2,
+            "by_status": {"todo": 1, "in-progress": 0, "done": 1},
+            "created_per_day": {"2024-01-01": 2},
+            "completed_per_day": {"2024-01-05": 1},
+        })
+
+
+class ServiceStatsTests(unittest.TestCase):
+    def backends(self, tmpdir: Path):
+        yield "json", JsonStorage(file_path=tmpdir / "a.json")
+        yield "cached", CachedJsonStorage(file_path=tmpdir / "b.json")
+        yield "wal", WalStorage(file_path=tmpdir / "c.json")
+        yield "sqlite", SqliteStorage(file_path=tmpdir / "d.db")
+
+    def test_counters_follow_mutations_on_every_backend(self):
+        with TemporaryDirectory() as tmp:
+            for name, storage in self.backends(Path(tmp)):
+                with self.subTest(backend=name):
+                    service = TaskService(storage)
+                    a = service.add("A")
+                    b = service.add("B")
+                    c = service.add("C")
+                    service.mark_in_progress(a.id)
+                    service.mark_done(b.id)
+                    service.mark_done(c.id)
+                    service.delete(c.id)
+                    service.update(b.id, "B2")
+
+                    stats = service.stats()
+                    expected = TaskCounters(storage.iter() if hasattr(storage, "iter")
+                                            else storage.iter_records()).to_dict()
+                    self.assertEqual(stats, expected)
+                    self.assertEqual(stats["by_status"], {"todo": 0, "in-progress": 1, "done": 1})
+                    self.assertEqual(stats["total"], 2)
+                    self.assertEqual(sum(stats["completed_per_day"].values()), 1)
+                    close = getattr(storage, "close", None)
+                    if close is not None:
+                        close()
+
+    def test_json_stats_file_tracks_the_data(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = JsonStorage(file_path=path)
+            storage.save_all([make_task(1), make_task(2, "done")])
+            self.assertTrue(storage.stats_path.exists())
+            self.assertEqual(storage.stats()["by_status"]["done"], 1)
+
+            # escrita externa: o arquivo .stats fica velho e é recalculado
+            path.write_text(json.dumps([make_task(1, "done"), make_task(2, "done"),
+                                        make_task(3, "done")]), encoding="utf-8")
+            self.assertEqual(storage.stats()["by_status"]["done"], 3)
+            saved = json.loads(storage.stats_path.read_text(encoding="utf-8"))
+            self.assertEqual(saved["stats"]["total"], 3)
+
+    def test_sqlite_backfills_existing_database(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.db"
+            storage = SqliteStorage(file_path=path)
+            storage.save_all([make_task(1), make_task(2, "done"), make_task(3, "done")])
+            storage.close()
+            # simula um banco criado antes dos contadores
+            conn = sqlite3.connect(path)
+            conn.executescript("DROP TABLE task_counts; DROP TABLE task_days;"
+                               "DROP TRIGGER tasks_stats_insert; DROP TRIGGER tasks_stats_delete;"
+                               "DROP TRIGGER tasks_stats_update;")
+            conn.close()
+
+            reopened = SqliteStorage(file_path=path)
+            self.assertEqual(reopened.stats(), TaskCounters(reopened.iter()).to_dict())
+            reopened.close()
+            # reabrir de novo não conta em dobro
+            again = SqliteStorage(file_path=path)
+            self.assertEqual(again.stats()["total"], 3)
+            again.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from task_tracker.storage.base import ListStorageAdapter, TaskStorage, as_task_storage
+from task_tracker.storage.record_set import RecordSet
+
+
+class ListOnlyStorage:
+    """Storage legado: só list()/save_all()."""
+    def __init__(self):
+        self._data = []
+        self.saves = 0
+    def list(self):
+        return [dict(d) for d in self._data]
+    def save_all(self, tasks):
+        self._data = tasks
+        self.saves += 1
+
+
+def make_task(task_id, status="todo"):
+    return {"id": task_id, "description": f"T{task_id}", "status": status,
+            "createdAt": "x", "updatedAt": "x"}
+
+
+class ListStorageAdapterTests(unittest.TestCase):
+    def setUp(self):
+        self.legacy = ListOnlyStorage()
+        self.storage = as_task_storage(self.legacy)
+
+    def test_wraps_only_legacy_storages(self):
+        self.assertIsInstance(self.storage, ListStorageAdapter)
+        self.assertIsInstance(self.storage, TaskStorage)
+        self.assertIs(as_task_storage(self.storage), self.storage)
+
+    def test_insert_allocates_ids(self):
+        a = self.storage.insert({**make_task(None)})
+        b = self.storage.insert({**make_task(None)})
+        self.assertEqual((a["id"], b["id"]), (1, 2))
+        self.assertEqual(self.storage.max_id(), 2)
+        with self.assertRaises(ValueError):
+            self.storage.insert(make_task(1))
+
+    def test_point_operations(self):
+        self.storage.insert(make_task(1))
+        self.storage.insert(make_task(2))
+
+        patched = self.storage.patch(2, {"status": "done"})
+        self.assertEqual(patched["status"], "done")
+        self.assertEqual(self.storage.get(2)["status"], "done")
+        self.assertIsNone(self.storage.patch(99, {"status": "done"}))
+
+        self.assertEqual([d["id"] for d in self.storage.iter("done")], [2])
+        self.assertTrue(self.storage.remove(1))
+        self.assertFalse(self.storage.remove(1))
+        self.assertIsNone(self.storage.get(1))
+
+
+class RecordSetTests(unittest.TestCase):
+    def test_tracks_max_id_and_returns_copies(self):
+        records = RecordSet([make_task(1), make_task(3)])
+        self.assertEqual(records.max_id(), 3)
+
+        records.get(1)["status"] = "done"
+        self.assertEqual(records.get(1)["status"], "todo")
+
+        records.pop(3)
+        self.assertEqual(records.max_id(), 1)
+        self.assertEqual(len(records), 1)
+
+if __name__ == "__main__":
+    unittest.main()
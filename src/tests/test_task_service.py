@@ -4,6 +4,7 @@ from datetime import datetime
 from task_tracker.services.task_service import TaskService
 from task_tracker.constants import STATUS_TODO, STATUS_IN_PROGRESS, STATUS_DONE
 from task_tracker.exceptions import TaskNotFound, InvalidStatus
+from task_tracker.storage.record_set import RecordSet
 
 class MemoryStorage:
     """Storage em memória para testes do serviço (não toca filesystem)."""
@@ -14,6 +15,33 @@ class MemoryStorage:
     def save_all(self, tasks):
         self._data = tasks
 
+class PointOnlyStorage:
+    """Storage granular que falha se o serviço tentar carregar tudo."""
+    def __init__(self):
+        self.records = RecordSet()
+    def get(self, task_id):
+        return self.records.get(task_id)
+    def insert(self, task):
+        task = {**task, "id": self.records.max_id() + 1}
+        self.records.put(task)
+        return dict(task)
+    def patch(self, task_id, fields):
+        current = self.records.get(task_id)
+        if current is None:
+            return None
+        self.records.put({**current, **fields})
+        return self.records.get(task_id)
+    def remove(self, task_id):
+        return self.records.pop(task_id) is not None
+    def iter(self, status=None):
+        return self.records.iter(status)
+    def max_id(self):
+        return self.records.max_id()
+    def list(self):
+        raise AssertionError("list() não deve ser usado")
+    def save_all(self, tasks):
+        raise AssertionError("save_all() não deve ser usado")
+
 class TaskServiceTests(unittest.TestCase):
     def setUp(self):
         self.storage = MemoryStorage()
@@ -69,5 +97,58 @@ class TaskServiceTests(unittest.TestCase):
         with self.assertRaises(TaskNotFound):
             self.service.update(999, "X")
 
+class BatchTests(unittest.TestCase):
+    def setUp(self):
+        self.service = TaskService(MemoryStorage())
+
+    def test_apply_many_saves_once(self):
+        storage = MemoryStorage()
+        saves = []
+        storage.save_all = lambda tasks: saves.append(tasks)
+        service = TaskService(storage)
+
+        results = service.apply_many([
+            {"op": "add", "description": "A"},
+            {"op": "add", "description": "B"},
+            {"op": "update", "id": 2, "description": "B2"},
+            {"op": "status", "id": 1, "status": "invalid"},
+            {"op": "mark-done", "id": 7},
+            {"op": "explode"},
+        ])
+
+        self.assertEqual([r["ok"] for r in results], [True, True, True, False, False, False])
+        self.assertEqual(len(saves), 1)
+        self.assertEqual([d["description"] for d in saves[0]], ["A", "B2"])
+
+    def test_apply_rejects_non_text_fields(self):
+        results = self.service.apply_many([
+            {"op": "add", "description": None},
+            {"op": "add"},
+            {"op": "add", "description": "A"},
+            {"op": "status", "id": 1, "status": 3},
+        ])
+        self.assertEqual([r["ok"] for r in results], [False, False, True, False])
+        self.assertIn("Operação inválida", results[0]["error"])
+        self.assertEqual([t.description for t in self.service.list()], ["A"])
+
+    def test_batch_without_storage_support(self):
+        service = TaskService(PointOnlyStorage())
+        with service.batch():
+            service.add("A")
+        self.assertEqual(len(service.list()), 1)
+
+class GranularStorageTests(unittest.TestCase):
+    def test_mutations_use_point_operations(self):
+        service = TaskService(PointOnlyStorage())
+        a = service.add("A")
+        service.add("B")
+        service.update(a.id, "A2")
+        service.mark_done(a.id)
+        service.delete(2)
+        self.assertEqual(service.get(a.id).description, "A2")
+        self.assertEqual([t.id for t in service.list(STATUS_DONE)], [a.id])
+        with self.assertRaises(TaskNotFound):
+            service.get(2)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from task_tracker.constants import STATUS_DONE, STATUS_TODO
+from task_tracker.models.task import Task
+from task_tracker.models.task_table import TaskTable
+from task_tracker.services.task_service import TaskService
+from task_tracker.utils.time import iso_to_micros, micros_to_iso
+from task_tracker.benchmarks.memory import synthetic_records
+from tests.test_task_service import MemoryStorage
+
+
+class TaskTableTests(unittest.TestCase):
+    def test_roundtrips_records_exactly(self):
+        records = synthetic_records(30)
+        # formatos não canônicos são preservados como estão
+        records[0]["createdAt"] = "2024-01-15T10:30:00Z"
+        records[1]["updatedAt"] = "x"
+        table = TaskTable.from_records(records)
+
+        self.assertEqual(len(table), 30)
+        self.assertEqual([t.to_dict() for t in table], records)
+        self.assertEqual(table[-1].id, 30)
+        self.assertEqual([t.to_dict() for t in table[:2]], records[:2])
+        with self.assertRaises(IndexError):
+            table[30]
+
+    def test_columns_and_filter(self):
+        table = TaskTable.from_records(synthetic_records(9))
+        self.assertEqual(table.ids.typecode, "q")
+        self.assertEqual(list(table.status_codes), [1, 2, 0] * 3)
+        self.assertEqual([t.id for t in table.filter(STATUS_TODO)], [3, 6, 9])
+        self.assertEqual(table.created_us[0], iso_to_micros(table[0].createdAt))
+
+    def test_service_lazy_list(self):
+        service = TaskService(MemoryStorage())
+        service.add("A")
+        service.mark_done(service.add("B").id)
+        table = service.list(STATUS_DONE, lazy=True)
+        self.assertIsInstance(table, TaskTable)
+        self.assertEqual([t.description for t in table], ["B"])
+
+
+class TaskSlotsTests(unittest.TestCase):
+    def test_task_has_no_instance_dict(self):
+        task = Task(1, "A", STATUS_TODO, "x", "x")
+        self.assertFalse(hasattr(task, "__dict__"))
+
+    def test_micros_roundtrip(self):
+        for value in ("2025-09-14T17:52:34.183403+00:00", "2025-09-14T17:52:34+00:00"):
+            self.assertEqual(micros_to_iso(iso_to_micros(value)), value)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from task_tracker.services.task_service import TaskService
+from task_tracker.storage.cached_storage import CachedJsonStorage
+from task_tracker.storage.json_storage import JsonStorage
+from task_tracker.storage.mmap_storage import MmapStorage
+from task_tracker.storage.record_set import RecordSet
+from task_tracker.storage.sharded_storage import ShardedStorage
+from task_tracker.storage.sqlite_storage import SqliteStorage
+from task_tracker.storage.wal_storage import WalStorage
+from task_tracker.utils.cursor import encode_cursor
+from task_tracker.utils.time import iso_to_micros, parse_instant, sortable_micros
+
+from tests.test_pagination import RecordSetStorage
+
+
+def make_task(task_id, day, status="todo"):
+    at = f"2024-03-{day:02d}T12:00:00+00:00"
+    return {"id": task_id, "description": f"T{task_id}", "status": status, "createdAt": at, "updatedAt": at}
+
+
+# dias fora de ordem e repetidos (3 e 5) para exercitar o desempate por id
+RECORDS = [
+    make_task(1, 9),
+    make_task(2, 3, "done"),
+    make_task(3, 3),
+    make_task(4, 20),
+    make_task(5, 1, "done"),
+    make_task(6, 12),
+    make_task(7, 15, "done"),
+]
+
+MAR_3 = iso_to_micros("2024-03-03")
+MAR_15 = iso_to_micros("2024-03-15")
+
+
+def ids(tasks):
+    return [t.id for t in tasks]
+
+
+class TimeParsingTests(unittest.TestCase):
+    def test_parse_instant(self):
+        now = iso_to_micros("2024-03-10T00:00:00+00:00")
+        self.assertEqual(parse_instant("2024-03-03", now), MAR_3)
+        self.assertEqual(parse_instant("2024-03-03T02:00+02:00", now), MAR_3)
+        self.assertEqual(parse_instant("7d", now), MAR_3)
+        with self.assertRaises(ValueError):
+            parse_instant("ontem", now)
+
+    def test_instants_sort_by_time(self):
+        # mesma ordem de strings não é mesma ordem no tempo
+        records = RecordSet([
+            {**make_task(1, 3), "updatedAt": "2024-03-03T12:00:00+00:00"},
+            {**make_task(2, 3), "updatedAt": "2024-03-03T13:00:00+03:00"},  # 10:00 UTC
+            {**make_task(3, 3), "updatedAt": "2024-03-03T11:00:00Z"},
+        ])
+        self.assertEqual([d["id"] for d in records.page(sort_by="updatedAt")], [2, 3, 1])
+        self.assertEqual(sortable_micros("x"), 0)
+
+
+class TimeRangeTests(unittest.TestCase):
+    def backends(self, tmpdir: Path):
+        yield "json", JsonStorage(file_path=tmpdir / "a.json")
+        yield "cached", CachedJsonStorage(file_path=tmpdir / "b.json")
+        yield "wal", WalStorage(file_path=tmpdir / "c.json")
+        yield "sqlite", SqliteStorage(file_path=tmpdir / "d.db")
+        yield "mmap", MmapStorage(file_path=tmpdir / "e.rec")
+        yield "sharded", ShardedStorage(file_path=tmpdir / "f.shards", shard_size=3)
+        yield "sem between", RecordSetStorage()
+
+    def test_backends_agree(self):
+        with TemporaryDirectory() as tmp:
+            for name, storage in self.backends(Path(tmp)):
+                with self.subTest(backend=name):
+                    service = TaskService(storage)
+                    service.import_records(dict(d) for d in RECORDS)
+                    # ordenadas pela data filtrada; until é exclusivo
+                    self.assertEqual(ids(service.list(since=MAR_3, until=MAR_15)), [2, 3, 1, 6])
+                    self.assertEqual(ids(service.list(since=MAR_15)), [7, 4])
+                    self.assertEqual(ids(service.list("done", until=MAR_15, time_field="createdAt")), [5, 2])
+                    self.assertEqual(ids(service.list(since=MAR_3, sort_by="id", limit=3)), [1, 2, 3])
+                    page = service.page(since=MAR_3, sort_by="updatedAt", order="desc", limit=2)
+                    self.assertEqual(ids(page.tasks), [4, 7])
+                    rest = service.page(since=MAR_3, sort_by="updatedAt", order="desc", cursor=page.next_cursor)
+                    self.assertEqual(ids(rest.tasks), [6, 1, 3, 2])
+                    # a página por updatedAt (sem filtro) usa o mesmo índice
+                    self.assertEqual(ids(service.page(sort_by="updatedAt", limit=3).tasks), [5, 2, 3])
+                    with self.assertRaises(ValueError):
+                        service.list(since=MAR_3, time_field="description")
+                    close = getattr(storage, "close", None)
+                    if close is not None:
+                        close()
+
+    def test_index_follows_mutations(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        service = TaskService(CachedJsonStorage(file_path=Path(tmp.name) / "tasks.json"))
+        service.import_records(dict(d) for d in RECORDS)
+        self.assertEqual(ids(service.list(until=MAR_3)), [5])
+        service.mark_done(1)  # updatedAt vira agora
+        service.delete(5)
+        self.assertEqual(ids(service.list(until=MAR_15)), [2, 3, 6])
+        self.assertEqual(ids(service.list(since=MAR_15)), [7, 4, 1])
+
+    def test_cursor_with_iso_value(self):
+        # cursores de antes dos timestamps inteiros guardam o texto ISO
+        service = TaskService(RecordSetStorage())
+        service.import_records(dict(d) for d in RECORDS)
+        token = encode_cursor("updatedAt", ("2024-03-03T12:00:00+00:00", 3))
+        self.assertEqual(ids(service.page(sort_by="updatedAt", cursor=token).tasks), [1, 6, 7, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
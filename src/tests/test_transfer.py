@@ -0,0 +1,124 @@
+import io
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from task_tracker.constants import STATUS_DONE
+from task_tracker.services.task_service import TaskService
+from task_tracker.services.transfer import (
+    FORMAT_CSV,
+    FORMAT_JSONL,
+    FORMAT_NATIVE,
+    IDS_RENUMBER,
+    _chunks,
+    export_tasks,
+    import_tasks,
+    read_items,
+    validated,
+)
+from task_tracker.storage.cached_storage import CachedJsonStorage
+
+
+def exported(records, fmt):
+    buf = io.StringIO()
+    export_tasks(records, buf, fmt)
+    return buf.getvalue().encode("utf-8")
+
+
+class TransferTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = self.new_service("tasks.json")
+        self.service.add("Comprar pão")
+        self.service.add('Ligar, "urgente"\nsegunda linha')
+        self.service.mark_done(2)
+
+    def new_service(self, name):
+        return TaskService(CachedJsonStorage(file_path=Path(self.tmp.name) / name))
+
+    def test_round_trip_every_format(self):
+        records = list(self.service.storage.iter())
+        for fmt in (FORMAT_CSV, FORMAT_JSONL, FORMAT_NATIVE):
+            with self.subTest(fmt=fmt):
+                target = self.new_service(f"copy-{fmt}.json")
+                result = import_tasks(target, io.BytesIO(exported(records, fmt)), fmt)
+                self.assertEqual((result.imported, result.remapped, result.errors), (2, 0, []))
+                self.assertEqual(list(target.storage.iter()), records)
+
+    def test_native_export_matches_task_file(self):
+        data = exported(self.service.storage.iter(), FORMAT_NATIVE)
+        path = Path(self.tmp.name) / "tasks.json"
+        self.assertEqual(data, path.read_bytes())
+        self.assertEqual(exported([], FORMAT_NATIVE), b"[]")
+
+    def test_duplicates_and_id_conflicts(self):
+        lines = [
+            {"id": 1, "description": "Nova", "status": STATUS_DONE},
+            {"description": "Sem id"},
+            dict(self.service.storage.get(2)),  # já existe: ignorada
+        ]
+        data = "".join(json.dumps(d) + "\n" for d in lines).encode("utf-8")
+        result = import_tasks(self.service, io.BytesIO(data), FORMAT_JSONL)
+        self.assertEqual((result.imported, result.remapped, result.duplicates), (2, 1, 1))
+        self.assertEqual(self.service.get(3).description, "Nova")
+        self.assertEqual(self.service.get(3).status, STATUS_DONE)
+        self.assertEqual(self.service.get(4).description, "Sem id")
+        # a busca e o feed enxergam as tasks importadas
+        self.assertEqual([t.id for t in self.service.search("nova")], [3])
+
+    def test_ids_are_picked_inside_the_batch(self):
+        other = self.new_service("tasks.json")
+        batch = self.service.batch
+
+        def racing_batch():
+            other.add("Outro processo")  # grava antes de o import travar o arquivo
+            return batch()
+
+        data = b'{"id": 3, "description": "Importada"}\n'
+        with mock.patch.object(self.service, "batch", racing_batch):
+            result = import_tasks(self.service, io.BytesIO(data), FORMAT_JSONL)
+        self.assertEqual((result.imported, result.remapped), (1, 1))
+        self.assertEqual(self.service.get(3).description, "Outro processo")
+        self.assertEqual(self.service.get(4).description, "Importada")
+
+    def test_renumber(self):
+        data = b'{"id": 50, "description": "X"}\n'
+        result = import_tasks(self.service, io.BytesIO(data), FORMAT_JSONL, mode=IDS_RENUMBER)
+        self.assertEqual((result.imported, result.remapped), (1, 1))
+        self.assertEqual(self.service.storage.max_id(), 3)
+
+    def test_invalid_records_are_reported(self):
+        data = b"\n".join([
+            b'{"id": 10, "description": "ok"}',
+            b"{quebrado",
+            b'{"id": 11, "description": "x", "status": "talvez"}',
+            b'{"id": 12}',
+            b'{"id": 13, "description": "x", "createdAt": "ontem"}',
+            b"[1, 2]",
+        ])
+        result = import_tasks(self.service, io.BytesIO(data), FORMAT_JSONL)
+        self.assertEqual(result.imported, 1)
+        self.assertEqual([n for n, _ in result.errors], [2, 3, 4, 5, 6])
+        self.assertIn("JSON inválido", result.errors[0][1])
+        self.assertIn("talvez", result.errors[1][1])
+        self.assertIn("description", result.errors[2][1])
+
+    def test_parallel_validation_keeps_order(self):
+        records = [{"id": i, "description": f"t{i}"} for i in range(1, 301)]
+        records[150]["status"] = "errado"
+        data = exported(records, FORMAT_JSONL)
+
+        def run(workers):
+            chunks = _chunks(read_items(io.BytesIO(data), FORMAT_JSONL), 40)
+            return [(n, r and r["id"], e) for chunk in validated(chunks, workers) for n, r, e in chunk]
+
+        serial = run(1)
+        self.assertEqual(len(serial), 300)
+        self.assertEqual(run(2), serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
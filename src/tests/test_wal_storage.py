@@ -0,0 +1,149 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from task_tracker.storage.wal_storage import WalStorage
+
+
+def make_task(task_id, description="A", status="todo"):
+    return {"id": task_id, "description": description, "status": status,
+            "createdAt": "x", "updatedAt": "x"}
+
+
+class WalStorageTests(unittest.TestCase):
+    def test_replays_log_on_open(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = WalStorage(file_path=path)
+            storage.save_all([make_task(1), make_task(2)])
+            storage.save_all([make_task(1, "B")])
+            storage.close()
+
+            # snapshot ainda vazio: tudo está no log
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8")), [])
+
+            reopened = WalStorage(file_path=path)
+            self.assertEqual(reopened.list(), [make_task(1, "B")])
+            reopened.close()
+
+    def test_save_all_logs_only_the_diff(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = WalStorage(file_path=path)
+            storage.save_all([make_task(i) for i in range(1, 51)])
+            before = len(storage.log_path.read_text(encoding="utf-8").splitlines())
+
+            tasks = storage.list()
+            tasks[9]["status"] = "done"
+            storage.save_all(tasks)
+
+            lines = storage.log_path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines) - before, 1)
+            self.assertEqual(json.loads(lines[-1])["task"]["id"], 10)
+            storage.close()
+
+    def test_append_op_and_apply(self):
+        with TemporaryDirectory() as tmp:
+            storage = WalStorage(file_path=Path(tmp) / "tasks.json")
+            storage.append_op({"op": "put", "task": make_task(1)})
+            storage.append_op({"op": "delete", "id": 1})
+            self.assertEqual(storage.list(), [])
+            with self.assertRaises(ValueError):
+                storage.append_op({"op": "truncate"})
+            storage.close()
+
+    def test_batch_appends_once_and_rolls_back_on_error(self):
+        with TemporaryDirectory() as tmp:
+            storage = WalStorage(file_path=Path(tmp) / "tasks.json")
+            with storage.batch():
+                storage.insert(make_task(None))
+                storage.insert(make_task(None))
+                # nada escrito até o fim do lote
+                self.assertEqual(storage.log_path.read_text(encoding="utf-8"), "")
+            self.assertEqual(len(storage.log_path.read_text(encoding="utf-8").splitlines()), 2)
+
+            with self.assertRaises(RuntimeError):
+                with storage.batch():
+                    storage.remove(1)
+                    raise RuntimeError("boom")
+            self.assertEqual([d["id"] for d in storage.list()], [1, 2])
+            storage.close()
+
+    def test_compaction_folds_log_into_snapshot(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = WalStorage(file_path=path, compact_threshold=5, background=False)
+            for i in range(1, 6):
+                storage.append_op({"op": "put", "task": make_task(i)})
+
+            # atingiu o limite: snapshot contém tudo e o log foi truncado
+            snapshot = json.loads(path.read_text(encoding="utf-8"))
+            self.assertEqual([d["id"] for d in snapshot], [1, 2, 3, 4, 5])
+            self.assertEqual(storage.log_path.read_text(encoding="utf-8"), "")
+            storage.close()
+
+    def test_background_compaction(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = WalStorage(file_path=path, compact_threshold=3)
+            for i in range(1, 4):
+                storage.append_op({"op": "put", "task": make_task(i)})
+            storage.close()  # aguarda a thread de compactação
+
+            reopened = WalStorage(file_path=path)
+            self.assertEqual([d["id"] for d in reopened.list()], [1, 2, 3])
+            reopened.close()
+
+    def test_ignores_torn_log_line(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = WalStorage(file_path=path)
+            storage.append_op({"op": "put", "task": make_task(1)})
+            storage.close()
+            with storage.log_path.open("a", encoding="utf-8") as f:
+                f.write('{"op": "put", "task": {"id": 2')
+
+            reopened = WalStorage(file_path=path)
+            self.assertEqual(reopened.list(), [make_task(1)])
+            reopened.close()
+
+    def test_two_writers_see_each_others_appends(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            # quadro e CLI abertos sobre os mesmos arquivos
+            board = WalStorage(file_path=path, background=False)
+            cli = WalStorage(file_path=path, background=False)
+
+            first = board.insert({"description": "quadro", "status": "todo",
+                                  "createdAt": "x", "updatedAt": "x"})
+            second = cli.insert({"description": "cli", "status": "todo",
+                                 "createdAt": "x", "updatedAt": "x"})
+            self.assertNotEqual(first["id"], second["id"])
+
+            # a compactação do quadro não pode perder o append da CLI
+            board.compact()
+            third = cli.insert({"description": "depois", "status": "todo",
+                                "createdAt": "x", "updatedAt": "x"})
+            self.assertEqual([d["id"] for d in board.list()],
+                             [first["id"], second["id"], third["id"]])
+            board.close()
+            cli.close()
+
+            reopened = WalStorage(file_path=path)
+            self.assertEqual([d["description"] for d in reopened.list()],
+                             ["quadro", "cli", "depois"])
+            reopened.close()
+
+    def test_compaction_leaves_no_temp_files(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tasks.json"
+            storage = WalStorage(file_path=path, background=False)
+            storage.append_op({"op": "put", "task": make_task(1)})
+            storage.compact()
+            storage.close()
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()),
+                             ["tasks.json", "tasks.json.log", "tasks.json.log.lock"])
+
+
+if __name__ == "__main__":
+    unittest.main()
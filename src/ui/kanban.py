@@ -1,4 +1,3 @@
-# src/task_tracker/ui/kanban_app.py
 from __future__ import annotations
 
 from pathlib import Path
@@ -11,17 +10,60 @@ from task_tracker.constants import (
     STATUS_IN_PROGRESS,
     STATUS_DONE,
     ALL_STATUSES,
+    ORDER_ASC,
+    ORDER_DESC,
+    SORT_FIELDS,
 )
+from task_tracker.services.search_index import SearchIndex, index_path
 from task_tracker.services.task_service import TaskService
-from task_tracker.storage.json_storage import JsonStorage
-from task_tracker.exceptions import TaskNotFound, InvalidStatus
+from task_tracker.storage.changes import ChangeFeed, changes_path
+from task_tracker.storage.cached_storage import CachedJsonStorage
+from task_tracker.storage.group_commit import GroupCommitStorage
+from task_tracker.storage.wal_storage import WalStorage
+from task_tracker.exceptions import TaskNotFound, InvalidCursor, InvalidStatus
 
 
-def get_service(file_path: Optional[Path]) -> TaskService:
-    """Instancia o service usando um tasks.json escolhido na sidebar ou o cwd."""
-    path = Path(file_path) if file_path else Path.cwd() / "tasks.json"
-    storage = JsonStorage(file_path=path)
-    return TaskService(storage)
+BACKEND_CACHED = "json (cache)"
+BACKEND_WAL = "wal (log)"
+BACKEND_GROUP = "json (group commit)"
+
+PAGE_SIZE = 20
+
+
+@st.cache_resource
+def get_storage(path: str, backend: str = BACKEND_CACHED):
+    """Storage em memória, compartilhado entre reruns (um por arquivo e backend)."""
+    if backend == BACKEND_WAL:
+        return WalStorage(file_path=Path(path))
+    if backend == BACKEND_GROUP:
+        # Cliques seguidos viram uma única gravação a cada 100 ms
+        return GroupCommitStorage(file_path=Path(path))
+    return CachedJsonStorage(file_path=Path(path))
+
+
+@st.cache_resource
+def get_index(path: str) -> SearchIndex:
+    """Índice de busca em memória, compartilhado entre reruns (um por arquivo)."""
+    return SearchIndex.load(index_path(Path(path)))
+
+
+@st.cache_resource
+def get_feed(path: str) -> ChangeFeed:
+    """Feed de mudanças do arquivo, lido só no trecho novo a cada rerun."""
+    return ChangeFeed(changes_path(Path(path)))
+
+
+@st.cache_resource
+def get_cached_service(path: str, backend: str = BACKEND_CACHED) -> TaskService:
+    """Service compartilhado entre reruns (um por storage): eventos, feed e
+    arquivo morto são abertos uma vez só."""
+    return TaskService(get_storage(path, backend), index=get_index(path), feed=get_feed(path))
+
+
+def get_service(file_path: Optional[Path], backend: str = BACKEND_CACHED) -> TaskService:
+    """Service do tasks.json escolhido na sidebar ou do cwd."""
+    path = str((Path(file_path) if file_path else Path.cwd() / "tasks.json").resolve())
+    return get_cached_service(path, backend)
 
 
 def render_header():
@@ -65,12 +107,13 @@ def sidebar_controls() -> TaskService:
     st.sidebar.header("⚙️ Configurações")
     default_path = str(Path.cwd() / "tasks.json")
     file_path = st.sidebar.text_input("Caminho do tasks.json", value=default_path)
+    backend = st.sidebar.selectbox("Backend", [BACKEND_CACHED, BACKEND_GROUP, BACKEND_WAL])
 
     with st.sidebar.expander("➕ Nova tarefa"):
         desc = st.text_input("Descrição", key="new_desc")
         if st.button("Adicionar", use_container_width=True):
             if desc.strip():
-                service = get_service(file_path)
+                service = get_service(file_path, backend)
                 service.add(desc.strip())
                 st.success("Tarefa adicionada!")
                 st.rerun()
@@ -80,7 +123,13 @@ def sidebar_controls() -> TaskService:
     st.sidebar.markdown("---")
     st.sidebar.caption("Dica: você pode apontar para diferentes arquivos `tasks.json`.")
 
-    return get_service(file_path)
+    service = get_service(file_path, backend)
+    if isinstance(service.storage, CachedJsonStorage):
+        info = service.storage.cache_info()
+        st.sidebar.caption(
+            f"Cache: {info['hits']} hits / {info['misses']} misses ({info['size']} tasks)"
+        )
+    return service
 
 
 def task_card(t, service: TaskService, column_label: str):
@@ -166,52 +215,115 @@ def task_card(t, service: TaskService, column_label: str):
                     st.rerun()
 
 
+def _sort_value(t, sort_by: str):
+    return t.id if sort_by == "id" else getattr(t, sort_by)
+
+
+def cached_board(service: TaskService) -> dict:
+    """Páginas exibidas, guardadas na sessão e corrigidas só pelo que mudou.
+
+    A cada rerun busca apenas o delta desde a última visita
+    (``changes_since``). Uma edição que não muda a posição troca o card no
+    lugar; uma task que entra, sai ou muda de posição numa coluna descarta
+    só a página daquela coluna.
+    """
+    board = st.session_state.get("board")
+    if board is None or board["storage"] != id(service.storage):
+        board = st.session_state["board"] = {"storage": id(service.storage), "seq": None, "pages": {}}
+    changes = service.changes_since(board["seq"])
+    board["seq"] = changes.seq
+    if changes.reset:
+        board["pages"].clear()
+        return board
+    removed = set(changes.removed)
+    for status, ((sort_by, _, _), page) in list(board["pages"].items()):
+        positions = {t.id: i for i, t in enumerate(page.tasks)}
+        stale = any(task_id in positions for task_id in removed)
+        for t in changes.tasks:
+            i = positions.get(t.id)
+            if i is None:
+                stale = stale or t.status == status
+            elif t.status == status and _sort_value(t, sort_by) == _sort_value(page.tasks[i], sort_by):
+                page.tasks[i] = t
+            else:
+                stale = True
+        if stale:
+            del board["pages"][status]
+    return board
+
+
+def paged_column(service: TaskService, pages: dict, status: str, sort_by: str, order: str, column_label: str):
+    """Uma página da coluna; a pilha de cursores na sessão permite voltar."""
+    cursors = st.session_state.setdefault(f"cursors_{column_label}", [None])
+    key = (sort_by, order, cursors[-1])
+    cached = pages.get(status)
+    if cached is not None and cached[0] == key:
+        page = cached[1]
+    else:
+        page = service.page(status, sort_by=sort_by, order=order, limit=PAGE_SIZE, cursor=cursors[-1])
+        pages[status] = (key, page)
+    for t in page.tasks:
+        task_card(t, service, column_label)
+
+    prev_col, next_col = st.columns(2)
+    with prev_col:
+        if len(cursors) > 1 and st.button("◀ Anterior", key=f"prev_{column_label}", use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with next_col:
+        if page.next_cursor and st.button("Próxima ▶", key=f"next_{column_label}", use_container_width=True):
+            cursors.append(page.next_cursor)
+            st.rerun()
+
+
 def render_board(service: TaskService):
     # Filtros simples
     with st.container():
-        c1, c2, c3 = st.columns([2, 2, 1])
+        c1, c2, c3, c4 = st.columns([2, 2, 1, 1])
         with c1:
-            q = st.text_input("🔎 Buscar por texto (descrição)", value="")
+            q = st.text_input("🔎 Buscar por palavras (ignora acentos; aceita prefixos)", value="")
         with c2:
-            sort_by = st.selectbox("Ordenar por", ["id", "createdAt", "updatedAt"])
+            sort_by = st.selectbox("Ordenar por", list(SORT_FIELDS))
         with c3:
+            order = st.selectbox("Ordem", [ORDER_ASC, ORDER_DESC])
+        with c4:
             if st.button("🔄 Atualizar", use_container_width=True):
+                # Descarta as páginas em cache (ex.: tasks.json editado à mão)
+                st.session_state.pop("board", None)
                 st.rerun()
 
-    # Carrega tasks
-    all_tasks = service.list()
-    # filtro por texto
-    if q.strip():
-        ql = q.strip().lower()
-        all_tasks = [t for t in all_tasks if ql in t.description.lower()]
+    # Mudou a ordenação: as colunas voltam para a primeira página
+    if st.session_state.get("board_sort") != (sort_by, order):
+        st.session_state["board_sort"] = (sort_by, order)
+        for label in ("todo", "inprog", "done"):
+            st.session_state[f"cursors_{label}"] = [None]
 
-    # ordenação simples
-    if sort_by == "id":
-        all_tasks.sort(key=lambda t: t.id)
-    else:
-        all_tasks.sort(key=lambda t: getattr(t, sort_by))
+    columns = [
+        (STATUS_TODO, "🧩 To Do", "todo"),
+        (STATUS_IN_PROGRESS, "🛠️ In Progress", "inprog"),
+        (STATUS_DONE, "✅ Done", "done"),
+    ]
 
-    todo = [t for t in all_tasks if t.status == STATUS_TODO]
-    inprog = [t for t in all_tasks if t.status == STATUS_IN_PROGRESS]
-    done = [t for t in all_tasks if t.status == STATUS_DONE]
+    # Busca pelo índice invertido quando há texto (resultados já são poucos)
+    found = None
+    if q.strip():
+        found = service.search(q, limit=None)
+        found.sort(key=lambda t: (t.id if sort_by == "id" else getattr(t, sort_by), t.id),
+                   reverse=order == ORDER_DESC)
 
     st.header('📌 Quadro Kanban', divider=True, help="Visualize e gerencie suas tarefas em um quadro Kanban simples.")
-    col_todo, col_inprog, col_done = st.columns(3, gap="large")
-
-    with col_todo:
-        st.subheader("🧩 To Do", divider=True)
-        for t in todo:
-            task_card(t, service, "todo")
-
-    with col_inprog:
-        st.subheader("🛠️ In Progress", divider=True)
-        for t in inprog:
-            task_card(t, service, "inprog")
-
-    with col_done:
-        st.subheader("✅ Done", divider=True)
-        for t in done:
-            task_card(t, service, "done")
+    # Contadores mantidos pelo backend: não exigem carregar as tasks
+    counts = service.stats()["by_status"]
+    pages = cached_board(service)["pages"]
+    for (status, title, label), col in zip(columns, st.columns(3, gap="large")):
+        with col:
+            st.subheader(f"{title} ({counts[status]})", divider=True)
+            if found is None:
+                paged_column(service, pages, status, sort_by, order, label)
+            else:
+                for t in found:
+                    if t.status == status:
+                        task_card(t, service, label)
 
 
 def main():
@@ -219,7 +331,7 @@ def main():
     service = sidebar_controls()
     try:
         render_board(service)
-    except (TaskNotFound, InvalidStatus) as e:
+    except (TaskNotFound, InvalidStatus, InvalidCursor) as e:
         st.error(str(e))
     except Exception as e:
         st.error(f"Unexpected error: {e}")